@@ -22,6 +22,20 @@ def extract_args(default_port: int, default_target_port: int) -> tuple[str, int,
 
     return target_ip, target_port, simulated_hardware, port
 
+def extract_replay_args() -> tuple[str | None, float]:
+    """
+    the capture to replay (if any), and how fast (0 means as fast as possible)
+    """
+
+    replay = None
+    speed = 1.0
+
+    for idx, arg in enumerate(sys.argv):
+        if arg == '--replay': replay = sys.argv[idx + 1]
+        if arg == '--speed': speed = float(sys.argv[idx + 1])
+
+    return replay, speed
+
 if __name__ == "__main__":
     print(consts.IMPROVISE_ASCII_ART_STRING)
     print(" -=- ASTRID -=- ")
@@ -38,12 +52,14 @@ if __name__ == "__main__":
     if poolside:
         print("[poolside]")
         target_ip, target_port, _, port = extract_args(8080, 8081)
-        poolside_main(target_ip, target_port, port)
+        replay, speed = extract_replay_args()
+        poolside_main(target_ip, target_port, port, replay, speed)
         exit()
     if rov:
         print("[rov]")
         target_ip, target_port, simulated_gpio, port = extract_args(8081, 8080)
-        rov_main(target_ip, target_port, simulated_gpio, port)
+        replay, speed = extract_replay_args()
+        rov_main(target_ip, target_port, simulated_gpio, port, replay, speed)
         exit()
 
     print("please use --poolside for the poolside xor --rov for the rov.")
@@ -12,6 +12,9 @@ WINDOW_WIDTH: int = 1920
 WINDOW_HEIGHT: int = 1080
 SCREEN_WIDTH: int = 1280 //2
 SCREEN_HEIGHT: int = 720 //2
+UI_RETAINED_MODE: bool = True # if true, only the parts of the ui that changed are redrawn each frame (see UiContainer)
+PRESENT_MODE: str = 'nearest' # how the ui is scaled to the window: 'integer' (cheapest, black bars), 'nearest' or 'smooth' (nicest, dearest). see Presenter
+PRESENT_SKIP_SAME_SIZE: bool = True # if true, the ui isnt scaled at all when the window is the same size as it
 
 # ascii art
 IMPROVISE_ASCII_ART_STRING: str = """  _                 ____   _____     ___          
@@ -50,6 +53,21 @@ ADDRESS_SERVO_CAMERA_ANGLE: int     = 15
 
 # networking
 PACKET_SIZE: int = 1024*32
+PACKET_FRAGMENT_SIZE: int = 1400 # big packets (camera frames) are split into datagrams this size. under the ethernet MTU, so IP never splits them again
+PACKET_REASSEMBLY_TIMEOUT: float = 0.5 # seconds to wait for the rest of a split packet before giving up on it
+PACKET_REASSEMBLY_MAX_BYTES: int = 1024*1024*4 # most memory half-received split packets can use, per packet type
+PING_INTERVAL: float = 0.5 # seconds between the poolside pinging the rov, to measure the round trip time
+LINK_STATS_LOG_INTERVAL: float = 30.0 # seconds between the rov printing how the link is doing
+LINK_STATS_UI_INTERVAL: float = 0.5 # seconds between the poolside working out the link stats it shows
+CONTROL_CHANNEL_PORT_OFFSET: int = 100 # controls, kill and pings have a socket of their own, this far past the normal ports (on both ends)
+CONTROL_CHANNEL_BUFFER: int = 1024*64 # bytes. plenty for controls, which are tiny
+CAMERA_CHANNEL_PORT_OFFSET: int = 200 # so do camera frames
+CAMERA_CHANNEL_BUFFER: int = 1024*1024*4 # bytes. a few whole frames, so a burst doesnt overflow it. linux caps it at net.core.rmem_max / wmem_max
+CAPTURE_TRAFFIC: bool = False # if true, the poolside records everything it sends and receives, to look at (or replay) after the run (see src/common/net/capture.py)
+CAPTURE_DIRECTORY: str = "captures" # off by default, as each capture reserves CAPTURE_PREALLOCATE bytes in here straight away
+CAPTURE_PREALLOCATE: int = 1024*1024*256 # bytes. the capture file starts this big, and grows by this much when it fills up
+CAPTURE_MAX_BYTES: int = 1024*1024*1024*16 # bytes. nothing more is recorded past this
+REPLAY_SEEK_STEP: float = 10.0 # seconds page up / page down skip when replaying a capture
 
 # byte quantities
 ESC_BYTE_MOTOR_SPEED_MIN: int = 0
@@ -83,10 +101,17 @@ PWM_TOOL_SERVO_NEUTRAL: int = 1500
 PWM_TOOL_SERVO_MAXIMUM: int = 2500
 PWM_FREQUENCY: int = 50
 
+# control loop
+ROV_TICK_RATE: float = 100.0 # times per second the rov runs its control loop
+TELEMETRY_RATE: float = 10.0 # times per second the rov reports what it's actually doing
+
 # motors
 LIMIT_MOTOR_COUNT: bool = False
 SPEED_LIMIT: float = 0.8
 MOTOR_ACCEL: float = 0.1
+CONTROL_SEND_RATE: float = 30.0 # times per second the controls are sent to the rov while they're changing
+CONTROL_KEEPALIVE_INTERVAL: float = 0.5 # seconds between sends while the controls aren't changing
+CONTROL_SEND_THRESHOLD: float = 0.1 # a control changing by more than this (of its -1..1 range) is sent straight away
 
 # tooling
 TOOL_LOW_LIMIT: int = 0
@@ -101,10 +126,30 @@ CAMERA_COMPRESSION_VALUE: int = 65
 CAMERA_IMAGE_WIDTH: int = 85 * 4
 CAMERA_IMAGE_HEIGHT: int = 64 * 4
 CAMERA_ROTATE: int = 1 # 0 = 0 ; 1 = 90cw ; 2 = 90ccw ; 3 = 180
+CAMERA_TARGET_FPS: float = 30.0
+CAMERA_BANDWIDTH_BUDGET: int = 1024*1024*2 # bytes per second the camera is allowed to send
+CAMERA_QUALITY_MIN: int = 20 # the bitrate controller keeps jpeg quality between these
+CAMERA_QUALITY_MAX: int = 90
+CAMERA_QUALITY_STEP: int = 5
+CAMERA_SCALES: tuple[float, ...] = (1.0, 0.75, 0.5) # downscales the bitrate controller can pick from, once quality is as low as it goes
+CAMERA_FEEDBACK_INTERVAL: float = 1.0 # seconds between the poolside telling the rov how the camera feed is arriving
+CAMERA_DELTA_MODE: bool = False # if true, only the parts of the picture that changed are sent (see src/common/tiles.py)
+CAMERA_TILE_COLUMNS: int = 4 # delta mode splits the picture into this grid
+CAMERA_TILE_ROWS: int = 4
+CAMERA_TILE_THRESHOLD: float = 4.0 # mean difference per pixel (0..255) before a tile counts as changed
+CAMERA_KEYFRAME_INTERVAL: int = 30 # most frames between whole pictures in delta mode
+VIDEO_RECORDING: bool = False # if true, the poolside saves the camera feed as it arrives, to watch the dive back (see src/poolside/recorder.py)
+VIDEO_DIRECTORY: str = "recordings" # off by default, as a whole dive is a lot of disk
+VIDEO_SEGMENT_SECONDS: float = 60.0 # a new file every minute, so a crash only loses the end of one
+VIDEO_QUEUE_LENGTH: int = 120 # frames waiting to be written (4 seconds worth) before any are dropped
 
 # competition
 POOL_RUN_TIME_SECONDS: int = 15 * 60
 
+# history
+HISTORY_SECONDS: int = POOL_RUN_TIME_SECONDS # how far back the poolside keeps what the rov has been doing
+HISTORY_RATE: float = 30.0 # samples per second kept of things that change every frame (like the controls)
+
 # float
 FLOAT_IP: str = "192.168.4.1"
 FLOAT_PORT: int = 8090
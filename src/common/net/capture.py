@@ -0,0 +1,351 @@
+import os
+import sys
+import mmap
+import time
+import array
+import bisect
+import heapq
+import socket
+import struct
+import threading
+import typing
+
+# a recording of every datagram a networker sends and receives, for looking at (or replaying) after a run.
+#
+# the file is made big up front and memory mapped, and records are copied straight into the map one after another, so writing one
+# is a struct pack and a memcpy, not a system call. before it fills up, a thread of its own sets aside another chunk of the file and
+# maps it, and the map is swapped over. setting aside disk space can take a while, and whoever is writing is sending or receiving,
+# so if the next chunk isnt ready in time the record is dropped (and counted) rather than waited for.
+#
+# <file header> <record> <record> ... <index>
+# every record is <record header> <the datagram, exactly as it went down the wire>
+# the file header keeps track of where the records end as they're written, so a capture that was never closed (the program crashed)
+# can still be read up to the last record. the index (record offsets per packet type, and every so often the offset for a time)
+# is only written on close; without it, the reader works it out by going through the records once.
+# like the rest of this folder, nothing from the rest of the project is imported here
+
+type _Addr = tuple[str, int] # ip, port
+type _Record = tuple[float, int, int, _Addr, bytes] # seconds since the capture started, direction, packet id, who it was from (or to), the datagram
+
+MAGIC: bytes = b"ROVCAP\0\0"
+VERSION: int = 1
+FILE_HEADER: struct.Struct = struct.Struct(">8sHHdQQ") # magic, version, unused, when it started (unix time), where the records end, where the index is (0 if not written)
+FILE_HEADER_SIZE: int = 64 # the header, and room for it to grow
+_END_AT: int = 20 # where in the file header the end of the records goes (followed by the index offset)
+RECORD_HEADER: struct.Struct = struct.Struct(">dBBH4sHI") # time, direction, unused, packet id, ip, port, datagram length
+INDEX_COUNT: struct.Struct = struct.Struct(">I")
+INDEX_TYPE: struct.Struct = struct.Struct(">HI") # packet id, how many records
+
+IN: int = 0 # received
+OUT: int = 1 # sent
+
+def _big_endian(values: array.array) -> bytes:
+    if sys.byteorder == 'little':
+        values = array.array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+def _from_big_endian(typecode: str, data: bytes | memoryview) -> array.array:
+    values = array.array(typecode, data)
+    if sys.byteorder == 'little':
+        values.byteswap()
+    return values
+
+
+class Capture():
+    """
+    Writes every datagram handed to it into a capture file. Any thread can write, so the networker can hand it what it sends and receives.
+    """
+
+    TIME_INDEX_INTERVAL: float = 1.0 # seconds between entries in the time index, which is how the reader seeks
+    GROW_AHEAD: float = 0.5 # the next chunk is set aside once less than this much of a chunk is left
+
+    def __init__(self, path: str, preallocate: int = 1024*1024*64, max_bytes: int = 1024*1024*1024*16) -> None:
+        self.path = path
+        self.chunk = preallocate # the file starts this big, and grows by this much when it fills up
+        self.max_bytes = max_bytes # records that would make the file bigger than this are dropped
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._file = open(path, 'w+b')
+        self._allocate(0, self.chunk)
+        self._map = mmap.mmap(self._file.fileno(), self.chunk)
+        self._lock = threading.Lock()
+        self.open = True
+
+        self.started = time.perf_counter()
+        self.offset = FILE_HEADER_SIZE # where the next record goes
+        FILE_HEADER.pack_into(self._map, 0, MAGIC, VERSION, 0, time.time(), self.offset, 0)
+
+        self.offsets: dict[int, array.array] = {} # packet id -> offsets of its records
+        self.times = array.array('d') # the time index: a record time every so often..
+        self.time_offsets = array.array('Q') # ..and its offset
+        self._next_time_index = 0.0
+
+        self._addr: _Addr | None = None # the last address packed, and what it packs to. its almost always the same one
+        self._addr_bytes = (bytes(4), 0)
+
+        # counters
+        self.records = 0
+        self.bytes = 0 # datagram bytes, not counting the record headers
+        self.dropped = 0 # records not written because the next chunk wasnt ready, the file was at max_bytes (or closed), or that the networker couldnt write
+        self.grows = 0 # times the file was made bigger
+        self.grow_max = 0.0 # longest making it bigger took, seconds
+
+        self._grow_wanted = threading.Event()
+        self._grower = threading.Thread(name="CaptureGrowThread", target=self._grow_thread, daemon=True)
+        self._grower.start()
+
+    def write(self, direction: int, pkt_id: int, addr: _Addr, datagram: bytes | bytearray | memoryview):
+        """
+        appends a record of a datagram going `direction` (IN or OUT).
+        """
+        with self._lock:
+            if not self.open:
+                self.dropped += 1
+                return
+            size = RECORD_HEADER.size + len(datagram)
+            if self.offset + size > len(self._map): # the next chunk isnt ready (or theres no more allowed). growing here would hold up the link
+                self.dropped += 1
+                self._grow_wanted.set()
+                return
+
+            if addr != self._addr:
+                self._addr_bytes = (socket.inet_aton(addr[0]), addr[1]) # raises for anything that isnt an ipv4 address
+                self._addr = addr
+
+            offset = self.offset
+            now = time.perf_counter() - self.started
+            RECORD_HEADER.pack_into(self._map, offset, now, direction, 0, pkt_id, self._addr_bytes[0], self._addr_bytes[1], len(datagram))
+            self._map[offset + RECORD_HEADER.size:offset + size] = datagram
+            self.offset = offset + size
+            struct.pack_into(">Q", self._map, _END_AT, self.offset)
+
+            offsets = self.offsets.get(pkt_id)
+            if offsets is None:
+                offsets = self.offsets[pkt_id] = array.array('Q')
+            offsets.append(offset)
+            if now >= self._next_time_index:
+                self.times.append(now)
+                self.time_offsets.append(offset)
+                self._next_time_index = now + Capture.TIME_INDEX_INTERVAL
+
+            self.records += 1
+            self.bytes += len(datagram)
+            if len(self._map) - self.offset < self.chunk * Capture.GROW_AHEAD and not self._grow_wanted.is_set():
+                self._grow_wanted.set()
+
+    def close(self):
+        """
+        writes the index, and cuts the file down to what was used.
+        """
+        with self._lock:
+            if not self.open:
+                return
+            self.open = False
+        self._grow_wanted.set()
+        self._grower.join() # it could be part way through growing the file
+
+        with self._lock:
+            index = bytearray()
+            index += INDEX_COUNT.pack(len(self.offsets))
+            for pkt_id, offsets in sorted(self.offsets.items()):
+                index += INDEX_TYPE.pack(pkt_id, len(offsets))
+                index += _big_endian(offsets)
+            index += INDEX_COUNT.pack(len(self.times))
+            index += _big_endian(self.times)
+            index += _big_endian(self.time_offsets)
+
+            end = self.offset + len(index)
+            if end > len(self._map):
+                self._resize(end)
+            self._map[self.offset:end] = index
+            struct.pack_into(">QQ", self._map, _END_AT, self.offset, self.offset)
+
+            self._map.flush()
+            self._map.close()
+            self._file.truncate(end)
+            self._file.close()
+
+    def _grow_thread(self):
+        """
+        makes the file another chunk bigger whenever write asks, maps the whole of it again, and swaps the new map in.
+        the old map and the new one are views of the same file, so anything written into the old one while this was going on is in the new one too.
+        """
+        while True:
+            self._grow_wanted.wait()
+            self._grow_wanted.clear()
+            if not self.open:
+                return
+
+            start = time.perf_counter()
+            size = len(self._map) # only this thread changes it
+            new_size = min(size + self.chunk, self.max_bytes)
+            if new_size <= size: # as big as it's allowed to get
+                return
+            self._allocate(size, new_size)
+            new_map = mmap.mmap(self._file.fileno(), new_size)
+
+            with self._lock:
+                if not self.open:
+                    new_map.close()
+                    return
+                old_map, self._map = self._map, new_map
+                self.grows += 1
+            old_map.close() # not flushed first. the os writes it out in its own time
+            self.grow_max = max(self.grow_max, time.perf_counter() - start)
+
+    def _resize(self, size: int):
+        """
+        makes the file (and map) `size` bytes, there and then. only for close, once nothing else is being written.
+        """
+        old_size = len(self._map)
+        self._map.close()
+        self._allocate(old_size, size)
+        self._map = mmap.mmap(self._file.fileno(), size)
+
+    def _allocate(self, start: int, end: int):
+        """
+        makes the file `end` bytes, with the disk space from `start` on actually set aside where the os can, so writing into it never finds the disk full.
+        """
+        self._file.truncate(end)
+        if hasattr(os, 'posix_fallocate'): # not on windows, where truncate sets it aside anyway
+            try:
+                os.posix_fallocate(self._file.fileno(), start, end - start)
+            except OSError: # the filesystem cant. it'll be allocated as it's written instead
+                pass
+
+
+class CaptureReader():
+    """
+    Reads a capture file a record at a time, straight out of a read only memory map, so the file is never loaded all at once.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, _, self.started, self.end, self._index_offset = FILE_HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} isnt a capture file")
+        if version != VERSION:
+            raise ValueError(f"{path} is capture version {version}, this reads version {VERSION}")
+        self.end = min(self.end, len(self._map)) # in case it was cut short
+
+        self._offsets: dict[int, array.array] | None = None # loaded (or worked out) the first time they're needed
+        self._times = array.array('d')
+        self._time_offsets = array.array('Q')
+
+    def records(self, start: float = 0.0, types: typing.Iterable[int] | None = None) -> typing.Iterator[_Record]:
+        """
+        every record from `start` seconds in, in the order they were written. only packet ids in `types`, if given.
+        """
+        offset = self.seek(start)
+        if types is None:
+            while offset < self.end:
+                record, offset = self._read(offset)
+                yield record
+            return
+
+        offsets = self.offsets()
+        wanted = [offsets.get(pkt_id, array.array('Q')) for pkt_id in types]
+        starts = [bisect.bisect_left(o, offset) for o in wanted]
+        for record_offset in heapq.merge(*(o[s:] for o, s in zip(wanted, starts))):
+            yield self._read(record_offset)[0]
+
+    def seek(self, start: float) -> int:
+        """
+        offset of the first record at or after `start` seconds in.
+        """
+        if start <= 0.0:
+            return FILE_HEADER_SIZE
+        self.offsets()
+        i = bisect.bisect_right(self._times, start) - 1
+        offset = self._time_offsets[i] if i >= 0 else FILE_HEADER_SIZE
+        while offset < self.end:
+            when = RECORD_HEADER.unpack_from(self._map, offset)[0]
+            if when >= start:
+                break
+            offset = self._next(offset)
+        return offset
+
+    def offsets(self) -> dict[int, array.array]:
+        """
+        offsets of every record, per packet id.
+        """
+        if self._offsets is None:
+            if self._index_offset:
+                self._load_index()
+            else:
+                self._build_index()
+        return self._offsets # type: ignore # set by either of those
+
+    def duration(self) -> float:
+        """
+        seconds from the start of the capture to the last record.
+        """
+        self.offsets()
+        offset = self._time_offsets[-1] if len(self._time_offsets) > 0 else FILE_HEADER_SIZE
+        last = 0.0
+        while offset < self.end:
+            last = RECORD_HEADER.unpack_from(self._map, offset)[0]
+            offset = self._next(offset)
+        return last
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self) -> 'CaptureReader':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _read(self, offset: int) -> tuple[_Record, int]:
+        """
+        the record at `offset`, and the offset of the next one.
+        """
+        when, direction, _, pkt_id, ip, port, length = RECORD_HEADER.unpack_from(self._map, offset)
+        start = offset + RECORD_HEADER.size
+        return (when, direction, pkt_id, (socket.inet_ntoa(ip), port), self._map[start:start + length]), start + length
+
+    def _next(self, offset: int) -> int:
+        return offset + RECORD_HEADER.size + RECORD_HEADER.unpack_from(self._map, offset)[6]
+
+    def _load_index(self):
+        offsets: dict[int, array.array] = {}
+        position = self._index_offset
+        count, = INDEX_COUNT.unpack_from(self._map, position)
+        position += INDEX_COUNT.size
+        for _ in range(count):
+            pkt_id, records = INDEX_TYPE.unpack_from(self._map, position)
+            position += INDEX_TYPE.size
+            offsets[pkt_id] = _from_big_endian('Q', self._map[position:position + records * 8])
+            position += records * 8
+        count, = INDEX_COUNT.unpack_from(self._map, position)
+        position += INDEX_COUNT.size
+        self._times = _from_big_endian('d', self._map[position:position + count * 8])
+        self._time_offsets = _from_big_endian('Q', self._map[position + count * 8:position + count * 16])
+        self._offsets = offsets
+
+    def _build_index(self):
+        """
+        the capture was never closed, so there's no index. goes through every record header (not the datagrams) to work it out.
+        """
+        offsets: dict[int, array.array] = {}
+        next_time = 0.0
+        offset = FILE_HEADER_SIZE
+        while offset + RECORD_HEADER.size <= self.end:
+            when, _, _, pkt_id, _, _, length = RECORD_HEADER.unpack_from(self._map, offset)
+            if offset + RECORD_HEADER.size + length > self.end: # cut short
+                break
+            offsets.setdefault(pkt_id, array.array('Q')).append(offset)
+            if when >= next_time:
+                self._times.append(when)
+                self._time_offsets.append(offset)
+                next_time = when + Capture.TIME_INDEX_INTERVAL
+            offset += RECORD_HEADER.size + length
+        self.end = offset
+        self._offsets = offsets
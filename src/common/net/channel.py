@@ -0,0 +1,60 @@
+import socket
+import threading
+
+# a channel is a socket of its own, on a port of its own, that some packet types go through instead of the default one.
+# each socket has its own kernel buffers, so a burst of camera frames filling one up cant push out the controls queued behind them on another.
+# both ends have to add the same channels, at the same port offsets, with the same packet types on them
+# like the rest of this folder, nothing from the rest of the project is imported here
+
+# dscp values (the top 6 bits of the ip TOS byte), for routers and switches that prioritise by them
+DSCP_DEFAULT: int = 0 # best effort
+DSCP_BULK: int = 8 # CS1, lower than best effort. big things that can wait
+DSCP_VIDEO: int = 34 # AF41, interactive video
+DSCP_EXPEDITED: int = 46 # EF, low latency. controls
+
+
+class Channel():
+    """
+    One socket, and what went through it. The networker makes and drives these (see Networker.add_channel).
+    """
+
+    def __init__(self, name: str, port_offset: int, packet_size: int, priority: int = 0, rcvbuf: int | None = None, sndbuf: int | None = None, dscp: int | None = None) -> None:
+        self.name = name
+        self.port_offset = port_offset # added to both the listening port and the target port
+        self.priority = priority # channels with something to read are read highest priority first
+        self.types: set[int] = set() # packet ids that go through this channel
+
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.rcvbuf = self._buffer(socket.SO_RCVBUF, rcvbuf) # what the os actually gave us (linux doubles what it's asked for)
+        self.sndbuf = self._buffer(socket.SO_SNDBUF, sndbuf)
+        self.dscp = self._mark(dscp) if dscp is not None else None
+
+        # every outgoing packet on this channel is packed straight into this one buffer, and only the used part of it is sent.
+        # more than one thread can send at once, so the buffer is guarded by a lock. channels have one each, so a big camera frame going out doesnt hold up a control
+        self._send_buffer = bytearray(packet_size)
+        self._send_view = memoryview(self._send_buffer)
+        self._send_lock = threading.Lock()
+
+        # counters
+        self.datagrams_in = 0
+        self.bytes_in = 0
+        self.datagrams_out = 0
+        self.bytes_out = 0
+        self.send_dropped = 0 # datagrams not sent because the send buffer was full
+        self.wakeups = 0 # times the receive thread woke up with datagrams to read here
+        self.batch_max = 0 # most datagrams read in one wakeup
+
+    def _buffer(self, option: int, size: int | None) -> int:
+        if size is not None:
+            try:
+                self.socket.setsockopt(socket.SOL_SOCKET, option, size)
+            except OSError as e: # over the os limit (see net.core.rmem_max on linux), or not allowed. keep the default
+                print(f"channel {self.name}: couldnt set socket buffer to {size} bytes:", repr(e))
+        return self.socket.getsockopt(socket.SOL_SOCKET, option)
+
+    def _mark(self, dscp: int) -> int | None:
+        try:
+            self.socket.setsockopt(socket.IPPROTO_IP, socket.IP_TOS, dscp << 2) # the bottom 2 bits are ECN, left alone
+        except (OSError, AttributeError): # windows mostly ignores (or refuses) this without a group policy
+            return None
+        return dscp
@@ -0,0 +1,84 @@
+import typing
+import struct
+
+type _Packet = tuple[int, str | None] # id, struct format string (raw bytes if none)
+type _Buffer = bytes | bytearray | memoryview
+
+class Codec():
+    """
+    a packet type with its format compiled into a `struct.Struct`, once.
+
+    packet types without a format carry raw bytes, which are just copied in and out.
+    """
+
+    def __init__(self, id: int, format: str | None) -> None:
+        self.id = id
+        self.format = format
+        self.struct: struct.Struct | None = compile_format(format) if format else None
+
+        if self.struct:
+            # packets with a format skip the python below and go straight to the compiled struct. this is the hot path
+            self.pack_into = self.struct.pack_into # type: ignore
+            self.unpack_from = self.struct.unpack_from # type: ignore
+
+    def size(self, *data) -> int:
+        """
+        how many bytes `data` would take up when packed.
+        """
+        if self.struct:
+            return self.struct.size
+        if len(data) <= 0:
+            return 0
+        return len(data[0])
+
+    def pack_into(self, buffer: bytearray | memoryview, offset: int, *data) -> None:
+        """
+        packs raw `data` into `buffer` at `offset`. use `size()` to find out how much was written.
+        """
+        if len(data) <= 0:
+            return
+        if not isinstance(data[0], (bytes, bytearray, memoryview)):
+            raise TypeError("cannot pack this type (packet type might have no data attachment or want raw bytes)")
+
+        buffer[offset:offset + len(data[0])] = data[0]
+
+    def unpack_from(self, buffer: _Buffer, offset: int = 0) -> tuple[typing.Any, ...]:
+        """
+        unpacks raw packet data from `buffer` at `offset`, as a single `bytes`.
+        """
+        return bytes(buffer[offset:]),
+
+    def packet(self) -> _Packet:
+        return self.id, self.format
+
+
+_CODECS: dict[int, Codec] = {} # every registered packet id and its codec
+_COMPILED: dict[str, struct.Struct] = {} # every format compiled so far
+
+def compile_format(format: str) -> struct.Struct:
+    """
+    compiles a struct format, reusing it if it has been compiled before.
+    """
+    compiled = _COMPILED.get(format)
+    if compiled is None:
+        compiled = struct.Struct(format)
+        _COMPILED[format] = compiled
+    return compiled
+
+def register_packet(id: int, format: str | None) -> _Packet:
+    """
+    declares a packet type, and compiles its codec so both ends can look it up by id alone.
+    """
+    if id in _CODECS:
+        raise ValueError(f"packet id {id} is registered twice")
+    _CODECS[id] = Codec(id, format)
+    return id, format
+
+def get(id: int) -> Codec | None:
+    return _CODECS.get(id)
+
+def registered() -> list[Codec]:
+    """
+    every registered codec, in id order.
+    """
+    return [_CODECS[id] for id in sorted(_CODECS)]
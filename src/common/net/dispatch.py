@@ -0,0 +1,176 @@
+import time
+import typing
+import threading
+import collections
+
+# how received packets get to their listeners. each packet type has a policy:
+# - inline: the listeners run on the receive thread, straight away. for small, quick, important things (controls, kill)
+# - worker: the packet is queued for a thread of its own, so slow listeners (camera frames) dont hold up everything else
+# - latest: like worker, but only the newest packet of the type waiting is kept; any older one of it still queued is dropped
+# and a priority. when the receive thread reads several datagrams at once, the highest priority ones are handled first
+# types that have to stay in order with each other (full camera frames and the tiles that go on top of them) can share a queue by name.
+# each keeps its own policy on it, so a 'latest' type only ever drops its own packets, never another type's
+# like the rest of this folder, nothing from the rest of the project is imported here
+
+type _Policy = typing.Literal['inline', 'worker', 'latest']
+type _Call = typing.Callable[[], None]
+
+PRIORITY_URGENT: int = 10 # controls, kill
+PRIORITY_NORMAL: int = 0
+PRIORITY_BULK: int = -10 # camera frames
+
+
+class DispatchStats():
+    """
+    how packets of one type are getting to their listeners.
+    """
+
+    def __init__(self) -> None:
+        self.handled = 0
+        self.dropped = 0 # superseded by a newer one (latest), or pushed out of a full queue (worker)
+        self.queue_depth = 0 # waiting right now
+        self.queue_max = 0
+        self.wait_total = 0.0 # seconds between being received and the listeners starting
+        self.wait_max = 0.0
+        self.handler_total = 0.0 # seconds the listeners took
+        self.handler_max = 0.0
+
+    def mean_wait(self) -> float:
+        return self.wait_total / self.handled if self.handled > 0 else 0.0
+
+    def mean_handler(self) -> float:
+        return self.handler_total / self.handled if self.handled > 0 else 0.0
+
+    def _record(self, received: float, started: float, finished: float):
+        self.handled += 1
+        self.wait_total += started - received
+        self.wait_max = max(self.wait_max, started - received)
+        self.handler_total += finished - started
+        self.handler_max = max(self.handler_max, finished - started)
+
+
+class _Worker():
+    """
+    a thread, and the queue of packets waiting for it.
+    """
+
+    def __init__(self, name: str, max_queue: int) -> None:
+        self.max_queue = max_queue
+
+        self._queue: collections.deque[tuple[DispatchStats, float, _Call]] = collections.deque() # (its type's stats, when it was received, what to run)
+        self._condition = threading.Condition()
+        self.running = True
+
+        self.thread = threading.Thread(name=name, target=self._thread_activity, daemon=True)
+        self.thread.start()
+
+    def put(self, stats: DispatchStats, received: float, call: _Call, latest: bool):
+        """
+        queues `call`. if `latest`, an older packet of the same type (the same stats) still waiting is dropped.
+        """
+        with self._condition:
+            if latest:
+                for item in self._queue: # theres only ever one of the type waiting, so this stops at the first
+                    if item[0] is stats:
+                        self._queue.remove(item)
+                        stats.dropped += 1
+                        break
+            if len(self._queue) >= self.max_queue:
+                dropped = self._queue.popleft()
+                dropped[0].dropped += 1
+            self._queue.append((stats, received, call))
+            stats.queue_depth = len(self._queue)
+            stats.queue_max = max(stats.queue_max, len(self._queue))
+            self._condition.notify()
+
+    def stop(self):
+        with self._condition:
+            self.running = False
+            self._condition.notify()
+
+    def _thread_activity(self):
+        while True:
+            with self._condition:
+                while self.running and not self._queue:
+                    self._condition.wait()
+                if not self.running:
+                    return
+                stats, received, call = self._queue.popleft()
+                stats.queue_depth = len(self._queue)
+
+            started = time.perf_counter()
+            call()
+            stats._record(received, started, time.perf_counter())
+
+
+class Dispatcher():
+    """
+    Runs each packet type's listeners according to its policy and keeps stats on how long it takes. Types without a policy are inline.
+    """
+
+    MAX_QUEUE: int = 1024 # most packets of one type a worker can have waiting. the oldest are dropped past this
+
+    def __init__(self) -> None:
+        self.policies: dict[int, tuple[_Policy, int]] = {} # packet id -> policy, priority
+        self.stats: dict[int, DispatchStats] = {}
+        self._workers: dict[int, tuple[_Worker, bool]] = {} # packet id -> the worker its packets go to, and whether only the newest is kept
+        self._queues: dict[str, _Worker] = {} # queue name -> its worker
+        self._lock = threading.Lock()
+
+    def set_policy(self, pkt_id: int, policy: _Policy, priority: int = PRIORITY_NORMAL, queue: str | None = None):
+        """
+        types given the same `queue` name share one worker, so they're handled in the order they came. each keeps its own policy on it.
+        """
+        self._stats(pkt_id)
+        with self._lock:
+            self.policies[pkt_id] = (policy, priority)
+            self._workers.pop(pkt_id, None)
+            if policy == 'inline':
+                return
+            name = queue if queue is not None else f"packet {pkt_id}"
+            if name not in self._queues:
+                self._queues[name] = _Worker(f"Dispatch Thread ({name})", Dispatcher.MAX_QUEUE)
+            self._workers[pkt_id] = (self._queues[name], policy == 'latest')
+
+    def priority(self, pkt_id: int) -> int:
+        policy = self.policies.get(pkt_id)
+        return policy[1] if policy else PRIORITY_NORMAL
+
+    def dispatch(self, pkt_id: int, call: _Call, received: float):
+        """
+        runs (or queues) `call`, which runs the listeners for a packet received at `received` (perf_counter).
+        """
+        worker = self._workers.get(pkt_id)
+        if worker:
+            worker[0].put(self._stats(pkt_id), received, call, worker[1])
+            return
+
+        started = time.perf_counter()
+        call()
+        self._stats(pkt_id)._record(received, started, time.perf_counter())
+
+    def stop(self):
+        with self._lock:
+            for worker in self._queues.values():
+                worker.stop()
+            self._workers.clear()
+            self._queues.clear()
+
+    def summary(self, names: dict[int, str] | None = None) -> str:
+        """
+        one line per packet type, for a log.
+        """
+        lines = []
+        for pkt_id, stats in sorted(list(self.stats.items())):
+            policy, priority = self.policies.get(pkt_id, ('inline', PRIORITY_NORMAL))
+            name = names.get(pkt_id, str(pkt_id)) if names else str(pkt_id)
+            lines.append(f"{name} ({policy}, {priority}): {stats.handled} handled, {stats.dropped} dropped, queue {stats.queue_depth} (max {stats.queue_max}), "
+                         f"wait {stats.mean_wait() * 1000:.2f}ms (max {stats.wait_max * 1000:.1f}), handler {stats.mean_handler() * 1000:.2f}ms (max {stats.handler_max * 1000:.1f})")
+        return "\n".join(lines)
+
+    def _stats(self, pkt_id: int) -> DispatchStats:
+        stats = self.stats.get(pkt_id)
+        if stats is None:
+            with self._lock:
+                stats = self.stats.setdefault(pkt_id, DispatchStats())
+        return stats
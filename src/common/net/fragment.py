@@ -0,0 +1,138 @@
+import time
+import struct
+
+# big things (camera frames) dont fit in one datagram, or do but get split up by IP anyway, where losing any bit loses all of it.
+# so they're chopped up into fragments small enough to go down the wire whole, and glued back together on the other end.
+#
+# every fragment carries this after the normal packet header
+# <frame id> <chunk index> <chunk count>
+# the frame id counts up per packet type, so the receiver can tell which frame a fragment belongs to, and which frames are old
+
+FRAGMENT_HEADER: struct.Struct = struct.Struct(">IHH") # frame id, chunk index, chunk count
+
+def frame_is_newer(frame_id: int, than: int) -> bool:
+    """
+    is `frame_id` after `than`? frame ids wrap around at 2^32, so half of the ids ahead of `than` count as newer.
+    """
+    return frame_id != than and ((frame_id - than) & 0xFFFFFFFF) < 0x80000000
+
+
+class _PartialFrame():
+    """
+    the fragments of a frame received so far.
+    """
+    def __init__(self, count: int, started: float) -> None:
+        self.chunks: list[bytes | None] = [None] * count
+        self.received = 0 # how many chunks have arrived
+        self.size = 0 # how many bytes have arrived
+        self.started = started # when the first chunk arrived
+
+
+class Reassembler():
+    """
+    glues fragments back into whole frames.
+
+    memory is bounded: partial frames are dropped when they take too long, when a newer frame completes first,
+    or (oldest first) when the partial frames add up to more than `max_bytes`.
+    """
+
+    RESTART_DISTANCE: int = 1024 # a frame this many ids behind the last completed one means the sender started again
+
+    def __init__(self, timeout: float, max_bytes: int) -> None:
+        self.timeout = timeout # seconds a partial frame can wait for the rest of its fragments
+        self.max_bytes = max_bytes # most bytes that can be held in partial frames at once
+
+        self.partial: dict[int, _PartialFrame] = {} # frame id -> partial frame. dicts keep insertion order, so the first is the oldest
+        self.buffered = 0 # bytes held in partial frames
+        self.last_completed: int | None = None # frame id of the newest frame that was completed
+
+        # counters
+        self.completed = 0
+        self.dropped_timeout = 0
+        self.dropped_stale = 0
+        self.dropped_memory = 0
+        self.dropped_malformed = 0
+
+    def add(self, fragment: bytes | memoryview, now: float | None = None) -> bytes | None:
+        """
+        takes a fragment (fragment header and chunk). returns the whole frame if this fragment completed it.
+        """
+        if now is None:
+            now = time.monotonic()
+
+        self._expire(now)
+
+        if len(fragment) < FRAGMENT_HEADER.size:
+            self.dropped_malformed += 1
+            return None
+        frame_id, index, count = FRAGMENT_HEADER.unpack_from(fragment)
+        if index >= count:
+            self.dropped_malformed += 1
+            return None
+
+        # a newer frame has already been shown, so this one is no use.
+        # unless its WAY older, in which case the other end has restarted and is counting from 0 again
+        if self.last_completed is not None and not frame_is_newer(frame_id, self.last_completed):
+            if (self.last_completed - frame_id) & 0xFFFFFFFF < Reassembler.RESTART_DISTANCE:
+                self.dropped_stale += 1
+                return None
+            self.last_completed = None
+
+        frame = self.partial.get(frame_id)
+        if frame is None:
+            frame = _PartialFrame(count, now)
+            self.partial[frame_id] = frame
+        elif len(frame.chunks) != count or frame.chunks[index] is not None: # duplicate, or doesnt agree with the rest of the frame
+            return None
+
+        chunk = bytes(fragment[FRAGMENT_HEADER.size:])
+        frame.chunks[index] = chunk
+        frame.received += 1
+        frame.size += len(chunk)
+        self.buffered += len(chunk)
+
+        if frame.received == count:
+            self._forget(frame_id)
+            self._drop_older_than(frame_id)
+            self.last_completed = frame_id
+            self.completed += 1
+            return b''.join(frame.chunks) # type: ignore # every chunk is here by now
+
+        # too much is being held; let go of the oldest partial frames until it fits
+        while self.buffered > self.max_bytes and len(self.partial) > 0:
+            self._forget(next(iter(self.partial)))
+            self.dropped_memory += 1
+
+        return None
+
+    def reset(self):
+        """
+        forgets the partial frames, and which frame was newest (but keeps the counts), so any frame id is taken as new again.
+        """
+        self.partial.clear()
+        self.buffered = 0
+        self.last_completed = None
+
+    def _expire(self, now: float):
+        for frame_id in [id for id, frame in self.partial.items() if now - frame.started > self.timeout]:
+            self._forget(frame_id)
+            self.dropped_timeout += 1
+
+    def _drop_older_than(self, frame_id: int):
+        for old_id in [id for id in self.partial if frame_is_newer(frame_id, id)]:
+            self._forget(old_id)
+            self.dropped_stale += 1
+
+    def _forget(self, frame_id: int):
+        frame = self.partial.pop(frame_id)
+        self.buffered -= frame.size
+
+
+def split(data: bytes | bytearray | memoryview, chunk_size: int) -> list[memoryview]:
+    """
+    splits `data` into chunks of at most `chunk_size` bytes. empty data is still one (empty) chunk.
+    """
+    view = memoryview(data)
+    if len(view) == 0:
+        return [view]
+    return [view[i:i + chunk_size] for i in range(0, len(view), chunk_size)]
@@ -0,0 +1,209 @@
+import time
+import threading
+import collections
+
+# how well the link is doing, worked out from what goes through the networker:
+# - every packet header has a sequence number that counts up per packet type, so gaps are packets lost,
+#   and ones that turn up after a later one are reordered (and not lost after all), or duplicates if they've been seen already
+# - pings carry the time they were sent and come straight back as pongs, which gives the round trip time
+# like the rest of this folder, nothing from the rest of the project is imported here
+
+
+class SequenceTracker():
+    """
+    spots lost, reordered and duplicate packets of one type from their sequence numbers (16 bit, wrapping).
+    """
+
+    RESTART_DISTANCE: int = 4096 # a packet this far behind the newest one means the sender started again
+
+    def __init__(self) -> None:
+        self.newest: int | None = None # highest sequence number seen
+        self._seen = bytearray(0x10000) # 1 for every sequence number received since the newest last went past it
+
+        # counters
+        self.received = 0 # packets, not counting duplicates
+        self.lost = 0 # skipped over and never turned up
+        self.reordered = 0 # turned up after a later one
+        self.duplicates = 0
+        self.restarts = 0
+
+    def add(self, sequence: int):
+        if self.newest is None:
+            self._restart(sequence)
+            return
+
+        ahead = (sequence - self.newest) & 0xFFFF
+        if ahead == 0:
+            self.duplicates += 1
+        elif ahead < 0x8000:
+            # newer. everything in between hasnt come (yet), and their flags are from the last time round, so clear them
+            self._clear(self.newest + 1, ahead - 1)
+            self.lost += ahead - 1
+            self.newest = sequence
+            self._seen[sequence] = 1
+            self.received += 1
+        elif 0x10000 - ahead > SequenceTracker.RESTART_DISTANCE:
+            self.restarts += 1
+            self._restart(sequence)
+        elif self._seen[sequence]:
+            self.duplicates += 1
+        else:
+            # older, and counted as lost when it was skipped over
+            self._seen[sequence] = 1
+            self.lost -= 1
+            self.reordered += 1
+            self.received += 1
+
+    def forget(self):
+        """
+        forgets the sequence numbers seen (but not the counts), so the next one starts it again without anything counted as lost.
+        """
+        self.newest = None
+
+    def loss(self) -> float:
+        """
+        fraction of packets lost.
+        """
+        total = self.received + self.lost
+        return self.lost / total if total > 0 else 0.0
+
+    def _restart(self, sequence: int):
+        self._clear(0, 0x10000)
+        self.newest = sequence
+        self._seen[sequence] = 1
+        self.received += 1
+
+    def _clear(self, start: int, count: int):
+        start &= 0xFFFF
+        end = min(start + count, 0x10000)
+        self._seen[start:end] = bytes(end - start)
+        if start + count > 0x10000: # wrapped round
+            self._seen[:start + count - 0x10000] = bytes(start + count - 0x10000)
+
+
+class TypeStats():
+    """
+    traffic of one packet type, both ways.
+    """
+
+    def __init__(self) -> None:
+        self.sequence = SequenceTracker() # of what's received
+
+        # counters
+        self.packets_in = 0 # datagrams, so a fragmented packet counts once per fragment
+        self.bytes_in = 0
+        self.packets_out = 0
+        self.bytes_out = 0
+
+        # measurements, over the last rate interval
+        self.packets_in_per_second = 0.0
+        self.bytes_in_per_second = 0.0
+        self.packets_out_per_second = 0.0
+        self.bytes_out_per_second = 0.0
+        self._rate_counts = (0, 0, 0, 0)
+
+
+class LinkStats():
+    """
+    Round trip times, loss and traffic of a networker's link, per packet type.
+
+    The networker counts every datagram in and out. Round trip times come from pings (see Networker.enable_ping).
+    Anything can read it, from any thread.
+    """
+
+    RATE_INTERVAL: float = 1.0 # seconds the rates are measured over
+    RTT_SAMPLES: int = 256 # round trip times kept for the percentiles
+    JITTER_GAIN: float = 1 / 16 # how quickly the jitter follows changes, like RFC 3550's
+
+    def __init__(self) -> None:
+        self.types: dict[int, TypeStats] = {} # packet id -> its stats
+
+        self._lock = threading.Lock()
+        self._rtts: collections.deque[float] = collections.deque(maxlen=LinkStats.RTT_SAMPLES) # seconds, oldest first
+        self.rtt = 0.0 # newest round trip time, seconds
+        self.jitter = 0.0 # smoothed change in round trip time from one ping to the next, seconds
+        self.pings_sent = 0
+        self.pongs_received = 0
+
+        self._rate_start = time.monotonic()
+
+    def sent(self, pkt_id: int, size: int):
+        """
+        counts a datagram going out.
+        """
+        stats = self._type(pkt_id)
+        stats.packets_out += 1
+        stats.bytes_out += size
+
+    def received(self, pkt_id: int, sequence: int, size: int):
+        """
+        counts a datagram coming in.
+        """
+        stats = self._type(pkt_id)
+        stats.packets_in += 1
+        stats.bytes_in += size
+        stats.sequence.add(sequence)
+
+    def add_rtt(self, rtt: float):
+        with self._lock:
+            if len(self._rtts) > 0:
+                self.jitter += (abs(rtt - self.rtt) - self.jitter) * LinkStats.JITTER_GAIN
+            self._rtts.append(rtt)
+            self.rtt = rtt
+            self.pongs_received += 1
+
+    def rtt_percentile(self, percent: float) -> float | None:
+        """
+        round trip time (seconds) that `percent` of recent pings came back within. none if no pings have come back.
+        """
+        with self._lock:
+            rtts = sorted(self._rtts)
+        if len(rtts) <= 0:
+            return None
+        return rtts[min(len(rtts) - 1, int(len(rtts) * percent / 100))]
+
+    def loss(self) -> float:
+        """
+        fraction of packets lost, over every type.
+        """
+        received = sum(stats.sequence.received for stats in list(self.types.values()))
+        lost = sum(stats.sequence.lost for stats in list(self.types.values()))
+        return lost / (received + lost) if received + lost > 0 else 0.0
+
+    def measure(self):
+        """
+        works out the rates again, if the interval is up. anything reading them should call this first.
+        """
+        now = time.monotonic()
+        elapsed = now - self._rate_start
+        if elapsed < LinkStats.RATE_INTERVAL:
+            return
+        self._rate_start = now
+
+        for stats in list(self.types.values()):
+            counts = (stats.packets_in, stats.bytes_in, stats.packets_out, stats.bytes_out)
+            last = stats._rate_counts
+            stats.packets_in_per_second = (counts[0] - last[0]) / elapsed
+            stats.bytes_in_per_second = (counts[1] - last[1]) / elapsed
+            stats.packets_out_per_second = (counts[2] - last[2]) / elapsed
+            stats.bytes_out_per_second = (counts[3] - last[3]) / elapsed
+            stats._rate_counts = counts
+
+    def summary(self) -> str:
+        """
+        one line, for the ui or a log.
+        """
+        self.measure()
+        p50 = self.rtt_percentile(50)
+        p95 = self.rtt_percentile(95)
+        rtt = f"rtt {p50 * 1000:.1f}ms (p95 {p95 * 1000:.1f}ms, jitter {self.jitter * 1000:.1f}ms)" if p50 is not None and p95 is not None else "rtt ?"
+        kib_in = sum(stats.bytes_in_per_second for stats in list(self.types.values())) / 1024
+        kib_out = sum(stats.bytes_out_per_second for stats in list(self.types.values())) / 1024
+        return f"{rtt}, loss {self.loss() * 100:.1f}%, in {kib_in:.0f} KiB/s, out {kib_out:.0f} KiB/s"
+
+    def _type(self, pkt_id: int) -> TypeStats:
+        stats = self.types.get(pkt_id)
+        if stats is None:
+            with self._lock: # the send and receive threads could both be first
+                stats = self.types.setdefault(pkt_id, TypeStats())
+        return stats
@@ -1,4 +1,5 @@
-from src.common.net.worker import _Packet
+from src.common.net.codec import _Packet, register_packet
+from src.common import telemetry
 """
 v2 of networking code. 
 
@@ -6,12 +7,22 @@ packet types
 
 """ 
 
-NONE:               _Packet = 0, None    # in case of emergency! blank packets shouldn't do anything, and they would resolve to 0.
-MSG_ROV2POOLSIDE:   _Packet = 1, ">1024p"# logs upto 1kb
-CAMERA:             _Packet = 2, None    # sent with a camera frame.
-CONTROL:            _Packet = 3, ">6f3i" # sent with information about control values
-ENABLE_CORRECTION:  _Packet = 4, None    # when received, enables correction
-DISABLE_CORRECTION: _Packet = 5, None    # when received, disables correction
-KILL:               _Packet = 6, None    # when received, rov kills itself nicely
-SYNC_CAMERA:        _Packet = 7, ">?"    # when received, rov syncs camera state
-REQ_SYNC_CAMERA:    _Packet = 8, None    # when received, camera state will be synced
\ No newline at end of file
+NONE:               _Packet = register_packet(0, None)    # in case of emergency! blank packets shouldn't do anything, and they would resolve to 0.
+MSG_ROV2POOLSIDE:   _Packet = register_packet(1, ">1024p")# logs upto 1kb
+CAMERA:             _Packet = register_packet(2, None)    # sent with a camera frame. (fragmented, see Networker.send_fragmented)
+CONTROL:            _Packet = register_packet(3, ">6f3i") # sent with information about control values
+ENABLE_CORRECTION:  _Packet = register_packet(4, None)    # when received, enables correction
+DISABLE_CORRECTION: _Packet = register_packet(5, None)    # when received, disables correction
+KILL:               _Packet = register_packet(6, None)    # when received, rov kills itself nicely
+SYNC_CAMERA:        _Packet = register_packet(7, ">?")    # when received, rov syncs camera state
+REQ_SYNC_CAMERA:    _Packet = register_packet(8, None)    # when received, camera state will be synced
+CAMERA_STATS:       _Packet = register_packet(9, ">fffBf")# sent every second by the rov: achieved fps, encode time (ms), bytes per second, jpeg quality, downscale
+CAMERA_FEEDBACK:    _Packet = register_packet(10, ">fff") # sent every second by the poolside: frames per second received, bytes per second received, fraction of frames lost
+CAMERA_TILE:        _Packet = register_packet(11, None)   # sent with part of a camera frame, in delta mode. (fragmented, see src/common/tiles.py)
+TELEMETRY:          _Packet = register_packet(12, telemetry.FORMAT) # sent a few times a second by the rov: what its motors, servos, imu, pid and loop are actually doing (see src/common/telemetry.py)
+PING:               _Packet = register_packet(13, ">Id")  # either end: ping id, sender's clock. answered with a PONG carrying the same (see Networker.enable_ping)
+PONG:               _Packet = register_packet(14, ">Id")  # the answer to a PING
+
+# packet types with a socket of their own (see Networker.add_channel). both ends add the same channels
+CONTROL_CHANNEL: tuple[_Packet, ...] = (CONTROL, KILL, ENABLE_CORRECTION, DISABLE_CORRECTION, PING, PONG)
+CAMERA_CHANNEL: tuple[_Packet, ...] = (CAMERA, CAMERA_TILE)
@@ -0,0 +1,126 @@
+import time
+import typing
+import threading
+from src.common.net import capture
+from src.common.net.capture import CaptureReader
+from src.common.net.worker import Networker
+
+# plays a capture (see capture.py) back into a networker, through the same path a datagram coming off the socket takes:
+# header, stats, reassembly, futures, then the listeners (by their dispatch policies). so anything listening cant tell it from the real thing.
+# records are handed over with Networker.inject, so they're handled on the networker's receive thread, alongside anything live
+# a poolside capture has both ends in it: what the poolside received (IN) drives the poolside's listeners again,
+# and what it sent (OUT) drives the rov's.
+# like the rest of this folder, nothing from the rest of the project is imported here
+
+
+class Replay():
+    """
+    Feeds the records of a capture going one `direction` into a networker's listeners, at `speed` times real time (0 for as fast as possible).
+    """
+
+    LATE_AFTER: float = 0.005 # seconds behind when it should have been played for a record to count as late
+
+    def __init__(self, reader: CaptureReader, net: Networker, direction: int = capture.IN, speed: float = 1.0, types: typing.Iterable[int] | None = None) -> None:
+        self.reader = reader
+        self.net = net
+        self.direction = direction
+        self.speed = speed
+        self.types = list(types) if types is not None else None # packet ids to play, or all of them
+
+        self.position = 0.0 # capture time of the last record played
+        self.running = False
+        self._seek_to: float | None = None # set by seek, taken (and cleared) by run
+        self._seek_lock = threading.Lock()
+        self._interrupt = threading.Event() # set to cut a wait short, for seek and stop
+        self.thread: threading.Thread | None = None
+
+        # counters
+        self.played = 0
+        self.late = 0 # records played more than LATE_AFTER after they were due. the listeners cant keep up at this speed
+        self.lag_max = 0.0 # seconds
+
+    def run(self, start: float = 0.0, end: float | None = None) -> int:
+        """
+        plays from `start` seconds into the capture to `end` (or the end), and returns how many records were played. blocks until it's done or stopped.
+        """
+        self.running = True
+        self._interrupt.clear()
+        played = self.played
+
+        while self.running:
+            if not self._play(start, end):
+                break
+            to = self._take_seek() # only stops early to seek, or because it was stopped
+            if to is None:
+                break
+            start = to
+            self.net.forget_received() # otherwise going back looks like old packets, and going forwards like lost ones
+
+        self.running = False
+        self._take_seek() # a seek that came in after the last record doesnt carry over to the next run
+        return self.played - played
+
+    def start(self, start: float = 0.0, end: float | None = None) -> threading.Thread:
+        """
+        like run, on a thread of its own.
+        """
+        self.thread = threading.Thread(name="ReplayThread", target=self.run, args=(start, end), daemon=True)
+        self.thread.start()
+        return self.thread
+
+    def seek(self, to: float):
+        """
+        carries on from `to` seconds into the capture (the index makes this quick). takes effect before the next record.
+        """
+        with self._seek_lock:
+            self._seek_to = to
+        self._interrupt.set()
+
+    def stop(self):
+        self.running = False
+        self._interrupt.set()
+
+    def _take_seek(self) -> float | None:
+        """
+        where the last seek asked to go, clearing it, so one that comes in while this is happening isnt lost.
+        """
+        with self._seek_lock:
+            to, self._seek_to = self._seek_to, None
+        return to
+
+    def _play(self, start: float, end: float | None) -> bool:
+        """
+        plays records from `start`. true if it stopped early to seek somewhere else.
+        """
+        self._interrupt.clear()
+        wall_start = time.perf_counter()
+        capture_start: float | None = None
+
+        for when, direction, _, addr, datagram in self.reader.records(start, self.types):
+            if not self.running:
+                return False
+            if self._seek_to is not None:
+                return True
+            if end is not None and when > end:
+                return False
+            if direction != self.direction:
+                continue
+
+            if self.speed > 0:
+                if capture_start is None:
+                    capture_start = when
+                due = wall_start + (when - capture_start) / self.speed
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    if self._interrupt.wait(delay): # cut short by seek or stop
+                        self._interrupt.clear()
+                        return self._seek_to is not None and self.running
+                elif -delay > Replay.LATE_AFTER:
+                    self.late += 1
+                    self.lag_max = max(self.lag_max, -delay)
+
+            self.net.inject(datagram, addr)
+            self.position = when
+            self.played += 1
+
+        return False
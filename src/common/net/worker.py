@@ -2,11 +2,22 @@ import typing
 import time
 import socket
 import struct
+import functools
+import collections
+import selectors
 import threading
+import concurrent.futures
+from src.common.net import codec
+from src.common.net import fragment
+from src.common.net import linkstats
+from src.common.net import dispatch
+from src.common.net import channel
+from src.common.net import capture
+from src.common.net.codec import _Packet, register_packet
 
-type _Packet = tuple[int, str | None] # id, struct format string (raw bytes if none)
 type _Addr = tuple[str, int] # ip, port
 type _Listener = typing.Callable[..., None] # the first argument is ALWAYS of type _Addr, but the type system isnt complex enough to let me put that in
+type _Response = tuple[bytes, _Addr] # a packet's raw data, and who sent it
 
 class Networker():
     """
@@ -17,49 +28,119 @@ class Networker():
 
     # this system is.. quite complicated
     # it is by no means perfect
-    # i wrote it with the intention that it is not tied to this program (look at the import list, nothing from this project. everything this file needs is in this file)
+    # i wrote it with the intention that it is not tied to this program (look at the import list, nothing from this project. everything this file needs is in this folder)
     # however, the packets are defined elsewhere for simplicity
     # a packet is defined like this
-    # PACKET_TYPE_AS_SOME_CONSTANT: _Packet = (<unique numerical id of the packet>, <format of the packet, or None (treated as raw bytes if None)>) 
+    # PACKET_TYPE_AS_SOME_CONSTANT: _Packet = register_packet(<unique numerical id of the packet>, <format of the packet, or None (treated as raw bytes if None)>) 
     # 
     # the general structure of a packet is like this
     # <the header> <the data>
-    # the header says what the id and the format is
+    # the header says which version of this protocol sent it, some flags, the id, a sequence number and how long the data is
+    # the format isnt sent; both ends register the same packets, so the receiver looks it up from the id
+    # registering a packet compiles its format into a codec (see codec.py) once, which does the actual packing and unpacking
     # internally the packets are referenced by the unique id
-    # the unique id is stored as an unsigned short, so 16 bytes, can have up to (2^16)-1 types. more than enough!
+    # the unique id is stored as an unsigned short, so 16 bits, can have up to (2^16)-1 types. more than enough!
+    # the sequence number counts up per packet type and wraps around at 2^16
+    # raw packets too big for one datagram can be sent with send_fragmented, which sets FLAG_FRAGMENT and splits them up (see fragment.py)
+    # the receiving end puts them back together before any listener sees them, so listeners cant tell the difference
+    # every datagram in and out is counted in `stats`, which uses the sequence numbers to spot lost packets (see linkstats.py)
+    #
+    # receiving runs on one thread, waiting on a selector for either the socket or a wake socket to have something.
+    # when the socket does, everything queued on it is read and handled in one go, rather than one packet per wakeup.
+    # close() writes to the wake socket, so the thread stops straight away instead of waiting out a timeout
+    # to wait for a particular packet (like the answer to a request), use expect() or request(), which give a future the receive thread fills in
+    # listeners run on the receive thread unless their packet type is given another policy with set_policy (see dispatch.py)
+    #
+    # everything goes through one socket, unless add_channel gives some packet types a socket (and port) of their own (see channel.py),
+    # so they dont share kernel buffers with everything else. the one receive thread reads all of them
+    # if `capture` is set, every datagram sent and received is written to it as well (see capture.py)
+    # inject() hands the receive thread a datagram that didnt come off a socket (a replay, see replay.py), through the wake socket,
+    # so it's handled in turn with everything else, and nothing on the receive side ever runs on two threads at once
     #
     # general rule of thumb: if a function is prefixed with an underscore, you probably shouldnt need to be using it outside this file
 
-    PACKET_HEADER: str = ">H16s" # i cant remember what each character means. google "python struct formats"
+    PROTOCOL_VERSION: int = 2 # bump this whenever the header changes. packets from other versions are ignored
+    PACKET_HEADER: str = ">BBHHH" # version, flags, id, sequence, data length. i cant remember what each character means. google "python struct formats"
+    _HEADER_STRUCT: struct.Struct = struct.Struct(PACKET_HEADER)
+    _ID_STRUCT: struct.Struct = struct.Struct(">H") # just the id, which comes after the version and flags
+
+    FLAG_FRAGMENT: int = 0x01 # the data is one fragment of something bigger
+    _WAKE_PRIORITY: int = 1 << 30 # the wake socket is read before any channel, so closing is never held up
+    BATCH_SIZE: int = 256 # most datagrams read in one go before checking if the networker is closing
+    INJECT_QUEUE_LENGTH: int = 1024 # most injected datagrams waiting to be handled. inject() waits for room past this
 
-    def __init__(self, target_ip: str, target_port: int, port: int, packet_size: int) -> None:
+    def __init__(self, target_ip: str, target_port: int, port: int, packet_size: int, fragment_size: int = 1400, reassembly_timeout: float = 0.5, reassembly_max_bytes: int = 1024*1024*4) -> None:
         self.target_ip = target_ip # where to send packets to?
         self.target_port = target_port # which port am i SENDING to
         self.port = port # which port am i RECEIVING on?
         self.packet_size = packet_size # how many (boosters) bytes are in the packets?
+        self.fragment_size = fragment_size # how big (at most) each datagram from send_fragmented is, header and all. keep it under the MTU
+        self.reassembly_timeout = reassembly_timeout # how long a half-received fragmented packet is kept for
+        self.reassembly_max_bytes = reassembly_max_bytes # how much memory half-received fragmented packets can take up, per packet type
 
         self.open = False
 
         self.target_addr: _Addr | None = None # combination of target ip and target port
 
-        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM) # actual socket object
+        self.default_channel = channel.Channel("default", 0, packet_size) # anything not given a channel of its own goes through here
+        self.channels: list[channel.Channel] = [self.default_channel]
+        self._channel_of: dict[int, channel.Channel] = {} # packet id -> the channel it goes through, if not the default
+        self.socket = self.default_channel.socket # actual socket object
 
         self.listeners: dict[int, list[_Listener]] = {} # callbacks for each packet type
         self.recv_thread: threading.Thread # thread that handles incoming traffic
+        self._selector: selectors.BaseSelector | None = None
+        self._wake_recv: socket.socket | None = None # close() writes to _wake_send, which makes _wake_recv readable and wakes the receive thread
+        self._wake_send: socket.socket | None = None
+        self._expected: dict[int, list[concurrent.futures.Future[_Response]]] = {} # futures waiting for each packet type (see expect)
+        self._expected_lock = threading.Lock()
+        self._injected: collections.deque[tuple[bytes, _Addr] | None] = collections.deque() # datagrams from inject() (or None, from forget_received), waiting for the receive thread
+        self._injected_space = threading.Condition() # inject() waits on this while the queue is full
+
+        # counters
+        self.wakeups = 0 # times the receive thread woke up with datagrams to read
+        self.datagrams = 0 # datagrams read
+        self.batch_max = 0 # most datagrams read in one wakeup
+        self.send_dropped = 0 # datagrams not sent because a socket's send buffer was full
+        self.listener_errors = 0 # listeners that raised
+
+        # every outgoing packet is packed straight into its channel's buffer, and only the used part of it is sent (see channel.py)
+        self._send_buffer = self.default_channel._send_buffer
+        self._send_view = self.default_channel._send_view
+        self._send_lock = self.default_channel._send_lock
+        self._send_sequence: dict[int, int] = {} # last sequence number sent, per packet type
+        self._send_frame: dict[int, int] = {} # last fragmented frame id sent, per packet type
+
+        self.reassemblers: dict[int, fragment.Reassembler] = {} # half-received fragmented packets, per packet type
+
+        self.stats = linkstats.LinkStats() # round trip times, loss and traffic
+        self.dispatcher = dispatch.Dispatcher() # runs the listeners, on this thread or another, depending on the packet type
+        self.capture: capture.Capture | None = None # records everything in and out, if set. whoever sets it closes it
+        self._ping_type: _Packet | None = None # set by enable_ping
+        self._ping_id = 0
 
     def start(self) -> bool:
         """
         starts up the network.
         """
         print(f"starting networker (listening on port {self.port}, sending to {self.target_ip}:{self.target_port})")
-        self.socket.bind(('', self.port)) # set the listening port
-        self.target_addr = (self.target_ip, self.target_port) # build target address
+        self._selector = selectors.DefaultSelector()
+        for ch in self.channels:
+            if ch is not self.default_channel:
+                print(f"channel {ch.name}: listening on port {self.port + ch.port_offset}, receive buffer {ch.rcvbuf} bytes, dscp {ch.dscp}")
+            ch.socket.bind(('', self.port + ch.port_offset)) # set the listening port
+            ch.socket.setblocking(False) # the selector says when theres something to read, and a full send buffer drops the datagram rather than holding up the sender
+            self._selector.register(ch.socket, selectors.EVENT_READ, (ch.priority, functools.partial(self._drain, ch)))
+        self.target_addr = self._resolve((self.target_ip, self.target_port)) # build target address
         self.open = True # declares the network open for business
 
+        # a socket pair rather than a pipe, because windows can only select on sockets
+        self._wake_recv, self._wake_send = socket.socketpair()
+        self._wake_recv.setblocking(False)
+        self._selector.register(self._wake_recv, selectors.EVENT_READ, (Networker._WAKE_PRIORITY, self._drain_wake))
 
-        self.recv_thread = threading.Thread(name="NetworkerRecvThread", target=self._recv_thread) # build the thread
+        self.recv_thread = threading.Thread(name="NetworkerRecvThread", target=self._recv_thread, daemon=True) # build the thread. daemon, so it never keeps the program open
         self.recv_thread.start()
-        self.socket.settimeout(1.0) # after how many seconds does it give up on waiting for a packet? (stops the program freezing)
         
         return True # i cant remember why i made it return true
 
@@ -67,22 +148,13 @@ class Networker():
 
     def build_packet(self, pkt_type: _Packet, *data) -> bytes:
         """
-        bundles the packet and abstract data into bytes, ready to be sent.
+        bundles the packet and abstract data into bytes, ready to be sent. it takes a sequence number, so only build packets that will be sent,
+        or the other end counts it as lost.
         """
-        pkt_id, format = pkt_type # we dont actually care about the packet id here..
-
-        pkt_bytes: bytes
-        if format:
-            pkt_bytes = struct.pack(format, *data)
-        else:
-            if len(data) <= 0:
-                pkt_bytes = bytes()
-            elif type(data[0]) is bytes:
-                pkt_bytes = data[0]
-            else:
-                raise TypeError("cannot pack this type (packet type might have no data attachment or want raw bytes)")
-        
-        return self._build_raw_packet(pkt_type, pkt_bytes)
+        ch = self._channel(pkt_type[0])
+        with ch._send_lock:
+            size = self._pack_packet(ch._send_buffer, pkt_type, *data)
+            return bytes(ch._send_view[:size])
     
     def send(self, type: _Packet, *data):
         """
@@ -90,26 +162,137 @@ class Networker():
         """
         if self.target_addr: # if we have the target address..
             #print("send", type, self.target_addr) # debug line that prints out sent packets
-            self._send(self.target_addr, self.build_packet(type, *data))
+            ch = self._channel(type[0])
+            with ch._send_lock:
+                size = self._pack_packet(ch._send_buffer, type, *data)
+                if self._send(ch, self._target(ch), ch._send_view[:size]):
+                    self.stats.sent(type[0], size)
 
-    def wait_for_packet(self, type: _Packet, timeout: float = 1.0) -> tuple[bytes, _Addr] | None:
+    def send_fragmented(self, type: _Packet, data: bytes | bytearray | memoryview):
         """
-        waits to receive a packet of a certain type. useful when listening for specific packets
+        sends raw bytes of any size, split across as many packets as it takes to keep each one under `fragment_size`.
         """
-        id = -1 # default id is negative one because you probably shouldnt do that.
-        data = None
-
-        start = time.time() # to count timeout
+        if type[1] is not None:
+            raise TypeError("only raw packet types can be sent fragmented")
+        if not self.target_addr:
+            return
+
+        header_size = Networker._HEADER_STRUCT.size + fragment.FRAGMENT_HEADER.size
+        chunks = fragment.split(data, self.fragment_size - header_size)
+        if len(chunks) > 0xFFFF:
+            raise OverflowError(f"too much data to fragment! (max: {0xFFFF * (self.fragment_size - header_size)}, got: {len(data)})")
+
+        ch = self._channel(type[0])
+        addr = self._target(ch)
+        with ch._send_lock:
+            frame_id = (self._send_frame.get(type[0], 0) + 1) & 0xFFFFFFFF
+            self._send_frame[type[0]] = frame_id
+
+            for index, chunk in enumerate(chunks):
+                fragment.FRAGMENT_HEADER.pack_into(ch._send_buffer, Networker._HEADER_STRUCT.size, frame_id, index, len(chunks))
+                ch._send_buffer[header_size:header_size + len(chunk)] = chunk
+                self._pack_header(ch._send_buffer, type[0], Networker.FLAG_FRAGMENT, fragment.FRAGMENT_HEADER.size + len(chunk))
+                if self._send(ch, addr, ch._send_view[:header_size + len(chunk)]):
+                    self.stats.sent(type[0], header_size + len(chunk))
+
+    def wait_for_packet(self, type: _Packet, timeout: float = 1.0) -> _Response | None:
+        """
+        waits to receive a packet of a certain type. useful when listening for specific packets. none if it doesnt come in time
+        """
+        future = self.expect(type)
+        try:
+            return future.result(timeout)
+        except (TimeoutError, ConnectionError):
+            self._forget(type, future)
+            return None
 
-        while id != type[0] and time.time() <= start + timeout:
-            result = self._recv() # receive..
-            if result: # if we get a result
-                id, data, addr = result # extract the data from the tuple
-                if id[0] == type[0]: # if the type matches what we want
-                    return data, addr
-                
-        return None
+    def expect(self, type: _Packet) -> concurrent.futures.Future[_Response]:
+        """
+        a future for the next packet of a certain type (its raw data, and who sent it). listeners still get it as well.
+        if the networker closes first, the future raises ConnectionError.
+        """
+        future: concurrent.futures.Future[_Response] = concurrent.futures.Future()
+        with self._expected_lock:
+            if not self.open:
+                future.set_exception(ConnectionError("networker is closed"))
+                return future
+            self._expected.setdefault(type[0], []).append(future)
+        return future
+
+    def request(self, type: _Packet, *data, response: _Packet) -> concurrent.futures.Future[_Response]:
+        """
+        sends a packet, and gives a future for the packet that answers it.
+        """
+        future = self.expect(response) # before sending, so an answer that comes straight back isnt missed
+        self.send(type, *data)
+        return future
     
+    def enable_ping(self, ping_type: _Packet, pong_type: _Packet):
+        """
+        answers pings with pongs, and times pongs coming back from ping() into `stats`. both packet types must have the format ">Id"
+        (ping id, send time). both ends should call it, with the same types.
+        """
+        self._ping_type = ping_type
+        self.register_listener(ping_type, lambda addr, ping_id, sent: self.send(pong_type, ping_id, sent))
+        self.register_listener(pong_type, lambda addr, ping_id, sent: self.stats.add_rtt(time.monotonic() - sent))
+
+    def ping(self):
+        """
+        sends a ping. the round trip time is in `stats` once the pong comes back. the send time is this end's clock, so the clocks never need to agree.
+        """
+        if self._ping_type is None:
+            raise RuntimeError("pings arent enabled (use enable_ping)")
+        self._ping_id = (self._ping_id + 1) & 0xFFFFFFFF
+        self.send(self._ping_type, self._ping_id, time.monotonic())
+        self.stats.pings_sent += 1
+
+    def set_policy(self, type: _Packet, policy: dispatch._Policy, priority: int = dispatch.PRIORITY_NORMAL, queue: str | None = None):
+        """
+        how (and in what order) a packet type's listeners are run: 'inline' on the receive thread (the default), on a 'worker' thread of its own,
+        or on one that only handles the 'latest' one waiting. higher priorities are handled first when several packets come in at once.
+        types given the same `queue` name share a worker, so stay in order with each other.
+        """
+        self.dispatcher.set_policy(type[0], policy, priority, queue)
+
+    def add_channel(self, name: str, port_offset: int, types: typing.Iterable[_Packet], priority: int = dispatch.PRIORITY_NORMAL,
+                    rcvbuf: int | None = None, sndbuf: int | None = None, dscp: int | None = None) -> channel.Channel:
+        """
+        gives some packet types a socket of their own, listening on `port + port_offset` and sending to `target_port + port_offset`,
+        with its own buffer sizes (bytes) and dscp marking. channels are read highest `priority` first. must be called before start(), the same on both ends.
+        """
+        if self.open:
+            raise RuntimeError("channels have to be added before the networker starts")
+        if any(ch.port_offset == port_offset for ch in self.channels):
+            raise ValueError(f"port offset {port_offset} is already used by another channel")
+
+        ch = channel.Channel(name, port_offset, self.packet_size, priority, rcvbuf, sndbuf, dscp)
+        for type in types:
+            ch.types.add(type[0])
+            self._channel_of[type[0]] = ch
+        self.channels.append(ch)
+        return ch
+
+    def channel_loss(self, ch: channel.Channel) -> float:
+        """
+        fraction of packets lost on a channel, from the sequence numbers of the types that go through it.
+        """
+        received = lost = 0
+        for pkt_id, stats in list(self.stats.types.items()):
+            if self._channel(pkt_id) is ch:
+                received += stats.sequence.received
+                lost += stats.sequence.lost
+        return lost / (received + lost) if received + lost > 0 else 0.0
+
+    def channel_summary(self) -> str:
+        """
+        one line per channel, for a log.
+        """
+        return "\n".join(
+            f"{ch.name}: in {ch.datagrams_in} ({ch.bytes_in / 1024:.0f} KiB), out {ch.datagrams_out} ({ch.bytes_out / 1024:.0f} KiB), "
+            f"loss {self.channel_loss(ch) * 100:.1f}%, send dropped {ch.send_dropped}, most read at once {ch.batch_max}"
+            for ch in self.channels
+        )
+
     def register_listener(self, type: _Packet, func: _Listener) -> _Listener:
         """
         register a callback to a certain packet type's reception.
@@ -132,6 +315,36 @@ class Networker():
         """
         print("closing")
         self.open = False
+        self.dispatcher.stop()
+        self._wake() # so the receive thread sees it should stop
+
+        with self._expected_lock:
+            for futures in self._expected.values():
+                for future in futures:
+                    if future.set_running_or_notify_cancel():
+                        future.set_exception(ConnectionError("networker closed"))
+            self._expected.clear()
+
+    def inject(self, raw_pkt: bytes, addr: _Addr):
+        """
+        handles a datagram as if it had just come in from `addr` (for replays). it's handled on the receive thread, in turn with what really comes in,
+        so listeners and reassembly never run on two threads at once. waits if INJECT_QUEUE_LENGTH are already waiting.
+        if the networker was never started, theres no receive thread to share with, so it's handled straight away.
+        """
+        if self._selector is None:
+            self._handle(raw_pkt, addr, time.perf_counter())
+            return
+        self._queue_injected((raw_pkt, addr))
+
+    def forget_received(self):
+        """
+        forgets where each packet type coming in was up to (sequence numbers, and half-received and newest fragmented packets) but not the counts,
+        for when what comes in next goes back in time (a replay seeking), so it isnt all thrown away as old. done in turn with injected datagrams, like inject().
+        """
+        if self._selector is None:
+            self._forget_received()
+            return
+        self._queue_injected(None)
 
     def set_target_address(self, addr: _Addr):
         """
@@ -139,95 +352,276 @@ class Networker():
         """
         self.target_ip = addr[0]
         self.target_port = addr[1]
-        self.target_addr = addr
+        self.target_addr = self._resolve(addr)
 
-    def _send(self, addr: _Addr, pkt: bytes):
+    def _send(self, ch: channel.Channel, addr: _Addr, pkt: bytes | memoryview) -> bool:
         """
-        low level raw send bytes down socket. ignores timeouts.
+        low level raw send bytes down a channel's socket. ignores timeouts. returns whether it actually went out.
         """
-        if self.is_open():
-            try:
-                self.socket.sendto(pkt, addr)
-            except TimeoutError:
-                return
+        if not self.is_open():
+            return False
+        try:
+            ch.socket.sendto(pkt, addr)
+        except BlockingIOError: # send buffer full
+            ch.send_dropped += 1
+            self.send_dropped += 1
+            return False
+        except OSError: # closed under us, or the other end isnt there
+            return False
+        ch.datagrams_out += 1
+        ch.bytes_out += len(pkt)
+        if self.capture:
+            self._record(capture.OUT, Networker._ID_STRUCT.unpack_from(pkt, 2)[0], addr, pkt)
+        return True
+
+    def _record(self, direction: int, pkt_id: int, addr: _Addr, pkt: bytes | memoryview):
+        """
+        writes a datagram to the capture. recording must never break the link, so if it fails, the record is counted as dropped and that's it
+        """
+        cap = self.capture
+        if cap is None:
+            return
+        try:
+            cap.write(direction, pkt_id, addr, pkt)
+        except Exception:
+            cap.dropped += 1
+
+    def _resolve(self, addr: _Addr) -> _Addr:
+        """
+        looks up the host of an address once (so a hostname isnt looked up again on every send, and the capture gets an ip).
+        if it cant be looked up yet, it's left as it is, and the socket has a go every send.
+        """
+        try:
+            return (socket.gethostbyname(addr[0]), addr[1])
+        except OSError:
+            return addr
 
-    def _recv(self) -> tuple[_Packet, bytes, _Addr] | None:
+    def _channel(self, pkt_id: int) -> channel.Channel:
+        return self._channel_of.get(pkt_id, self.default_channel)
+
+    def _target(self, ch: channel.Channel) -> _Addr:
         """
-        low level raw receive bytes from socket. ignores errors. returns the packet type, raw bytes and source address.
+        where a channel sends to.
         """
-        if self.is_open():
-            try:
-                raw_pkt, addr = self.socket.recvfrom(self.packet_size)
-                pkt_type, data = self._unpack_header(raw_pkt)
-                #print("recv", pkt_type, self.target_addr) # debug line that prints out received packets
-                return pkt_type, data, addr
-            except:
-                return None
-        else:
-            return None
+        assert self.target_addr is not None
+        return (self.target_addr[0], self.target_addr[1] + ch.port_offset)
 
+    def _handle(self, raw_pkt: bytes, addr: _Addr, received: float):
+        """
+        makes sense of one datagram, and hands it to whatever is waiting for it. runs on the receive thread.
+        """
+        header = self._unpack_header(raw_pkt)
+        if header is None: # not something we can read
+            return
+        pkt_type, sequence, flags, data = header
+        self.stats.received(pkt_type[0], sequence, len(raw_pkt))
+
+        if flags & Networker.FLAG_FRAGMENT: # only one piece of the packet; hold on to it until the rest comes
+            whole = self._reassembler(pkt_type[0]).add(data)
+            if whole is None:
+                return
+            data = memoryview(whole)
+
+        #print("recv", pkt_type, sequence, self.target_addr) # debug line that prints out received packets
+        if pkt_type[0] in self._expected:
+            with self._expected_lock:
+                futures = self._expected.pop(pkt_type[0], [])
+            for future in futures:
+                if future.set_running_or_notify_cancel(): # false if whoever was waiting gave up
+                    future.set_result((bytes(data), addr))
+
+        if pkt_type[0] in self.listeners:
+            self.dispatcher.dispatch(pkt_type[0], lambda: self._call_listeners(pkt_type, data, addr), received)
 
-    def _build_raw_packet(self, id: _Packet, data: bytes) -> bytes:
+    def _call_listeners(self, pkt_type: _Packet, data: memoryview, addr: _Addr):
+        for listener in self.listeners.get(pkt_type[0], []):
+            try:
+                listener(addr, *self._unpack_data(pkt_type, data))
+            except Exception as e: # one bad packet (or listener) shouldnt stop everything else being received
+                self.listener_errors += 1
+                print(f"listener for packet {pkt_type[0]} failed:", repr(e))
+
+    def _forget(self, type: _Packet, future: concurrent.futures.Future[_Response]):
+        with self._expected_lock:
+            futures = self._expected.get(type[0], [])
+            if future in futures:
+                futures.remove(future)
+
+    def _pack_packet(self, buffer: bytearray, pkt_type: _Packet, *data) -> int:
         """
-        builds a packet type and data bytes into a complete packet.
+        packs the header and abstract data of a packet into the start of `buffer`. returns how many bytes were used.
+        nothing after the data is touched, so only `buffer[:size]` should be sent.
         """
-        header_size = struct.calcsize(Networker.PACKET_HEADER)
+        pkt_id, format = pkt_type
+        header_size = Networker._HEADER_STRUCT.size
+        max_size = self.packet_size - header_size
 
-        if len(data) > self.packet_size - header_size:
-            raise OverflowError(f"packet data too big! (max: {self.packet_size - header_size}, got: {len(data)})")
-        
-        packet = [0x0 for i in range(self.packet_size)]
+        pkt_codec = codec.get(pkt_id)
+        if pkt_codec is None:
+            raise KeyError(f"packet id {pkt_id} was never registered (use register_packet)")
 
-        # pack header
-        pkt_id, format = id
-        header = struct.pack(Networker.PACKET_HEADER, pkt_id, format.encode() if format else bytes())
-        packet[0:len(header)] = header
+        size = pkt_codec.size(*data)
+        if size > max_size:
+            raise OverflowError(f"packet data too big! (max: {max_size}, got: {size})")
+        pkt_codec.pack_into(buffer, header_size, *data)
 
-        # pack data
-        packet[len(header):self.packet_size] = data
+        self._pack_header(buffer, pkt_id, 0, size)
+        return header_size + size
 
-        # pad
-        while len(packet) < self.packet_size:
-            packet += [0x0]
+    def _pack_header(self, buffer: bytearray, pkt_id: int, flags: int, size: int):
+        """
+        packs a packet header into the start of `buffer`, taking the next sequence number for the packet type.
+        """
+        sequence = (self._send_sequence.get(pkt_id, 0) + 1) & 0xFFFF
+        self._send_sequence[pkt_id] = sequence
 
-        assert len(packet) == self.packet_size
-        return bytes(packet)
+        Networker._HEADER_STRUCT.pack_into(buffer, 0, Networker.PROTOCOL_VERSION, flags, pkt_id, sequence, size)
+
+    def _reassembler(self, pkt_id: int) -> fragment.Reassembler:
+        """
+        gets the reassembler for a packet type, making it if it doesnt exist yet
+        """
+        reassembler = self.reassemblers.get(pkt_id)
+        if reassembler is None:
+            reassembler = fragment.Reassembler(self.reassembly_timeout, self.reassembly_max_bytes)
+            self.reassemblers[pkt_id] = reassembler
+        return reassembler
     
-    def _unpack_header(self, raw_pkt: bytes) -> tuple[_Packet, bytes]:
+    def _unpack_header(self, raw_pkt: bytes) -> tuple[_Packet, int, int, memoryview] | None:
         """
-        unpack the packet type and data bytes from a complete packet
+        unpack the packet type, sequence number, flags and data bytes from a complete packet.
+        returns None if the packet is from another protocol version, of an unknown type or cut short.
         """
-        header_size = struct.calcsize(Networker.PACKET_HEADER)
-        id, format = struct.unpack_from(Networker.PACKET_HEADER, raw_pkt)
+        header_size = Networker._HEADER_STRUCT.size
+        if len(raw_pkt) < header_size:
+            return None
 
-        decoded_format = bytes(format).decode()
-        if decoded_format == 16*'\0':
-            decoded_format = None
-        else:
-            decoded_format = decoded_format.rstrip("\0")
+        version, flags, id, sequence, length = Networker._HEADER_STRUCT.unpack_from(raw_pkt)
+        pkt_codec = codec.get(id)
+        if version != Networker.PROTOCOL_VERSION or pkt_codec is None:
+            return None
+        if header_size + length > len(raw_pkt):
+            return None
 
-        return (id,  decoded_format), raw_pkt[header_size:]
+        return pkt_codec.packet(), sequence, flags, memoryview(raw_pkt)[header_size:header_size + length]
     
-    def _unpack_data(self, type: _Packet, data: bytes) -> tuple[typing.Any, ...]:
+    def _unpack_data(self, type: _Packet, data: memoryview) -> tuple[typing.Any, ...]:
         """
         unpacks an indeterminate amount of data according to the packet type structure from packet data
         """
-        if type[1] == None:
-            return data,
-        else:
-            # add padding bytes based off length
-            format = type[1] + ("x" * (len(data) - struct.calcsize(type[1])))
-
-            return struct.unpack(format, data)
+        return codec.get(type[0]).unpack_from(data) # type: ignore # _unpack_header already checked it was registered
 
     def _recv_thread(self):
         """
         process that runs to receive packets and handle the listeners
         """
-        while self.open:
-            packet = self._recv()
-            if packet:
-                type, data, addr = packet
-                arr = self.listeners.get(type[0], [])
-                for listener in arr:
-                    listener(addr, *self._unpack_data(type, data))
+        selector = self._selector
+        assert selector is not None
+
+        try:
+            while self.open:
+                events = selector.select()
+                if len(events) > 1:
+                    events.sort(key=lambda event: -event[0].data[0]) # highest priority first
+                for key, _ in events:
+                    key.data[1]() # _drain (for a channel) or _drain_wake
+        finally:
+            selector.close()
+            for ch in self.channels:
+                ch.socket.close()
+            if self._wake_recv:
+                self._wake_recv.close()
+            if self._wake_send:
+                self._wake_send.close()
+
+    def _drain(self, ch: channel.Channel):
+        """
+        reads everything queued on a channel's socket (or a batch of it, if theres loads), then handles it highest priority first.
+        """
+        batch: list[tuple[int, bytes, _Addr]] = [] # (priority, datagram, sender)
+        count = 0
+        size = 0
+        while count < Networker.BATCH_SIZE and self.open:
+            try:
+                raw_pkt, addr = ch.socket.recvfrom(self.packet_size)
+            except BlockingIOError: # nothing left
+                break
+            except ConnectionResetError: # windows says this when something we sent bounced. there may still be more to read
+                count += 1
+                continue
+            except OSError: # closed
+                break
+            count += 1
+            size += len(raw_pkt)
+            pkt_id = Networker._ID_STRUCT.unpack_from(raw_pkt, 2)[0] if len(raw_pkt) >= Networker._HEADER_STRUCT.size else 0
+            if self.capture:
+                self._record(capture.IN, pkt_id, addr, raw_pkt)
+            batch.append((self.dispatcher.priority(pkt_id), raw_pkt, addr))
+
+        received = time.perf_counter()
+        if len(batch) > 1:
+            batch.sort(key=lambda item: -item[0]) # stable, so packets of the same priority stay in the order they came
+        for _, raw_pkt, addr in batch:
+            self._handle(raw_pkt, addr, received)
+
+        if count > 0:
+            self.wakeups += 1
+            self.datagrams += count
+            self.batch_max = max(self.batch_max, count)
+            ch.wakeups += 1
+            ch.datagrams_in += count
+            ch.bytes_in += size
+            ch.batch_max = max(ch.batch_max, count)
+
+    def _queue_injected(self, item: tuple[bytes, _Addr] | None):
+        with self._injected_space:
+            while len(self._injected) >= Networker.INJECT_QUEUE_LENGTH and self.open:
+                self._injected_space.wait(0.1)
+            if not self.open:
+                return
+            self._injected.append(item)
+            wake = len(self._injected) == 1 # otherwise the receive thread has already been woken for the ones before it
+        if wake:
+            self._wake()
+
+    def _drain_wake(self):
+        """
+        empties the wake socket, then handles a batch of injected datagrams, if there are any.
+        """
+        try:
+            while self._wake_recv and self._wake_recv.recv(64):
+                pass
+        except (BlockingIOError, OSError):
+            pass
+
+        if not self._injected:
+            return
+        with self._injected_space:
+            batch = [self._injected.popleft() for _ in range(min(len(self._injected), Networker.BATCH_SIZE))]
+            more = len(self._injected) > 0
+            self._injected_space.notify_all()
+
+        received = time.perf_counter()
+        for item in batch:
+            if item is None:
+                self._forget_received()
+            else:
+                self._handle(item[0], item[1], received)
+        if more:
+            self._wake() # come back for the rest, once the sockets have had a look in
+
+    def _forget_received(self):
+        for reassembler in list(self.reassemblers.values()):
+            reassembler.reset()
+        for stats in list(self.stats.types.values()):
+            stats.sequence.forget()
+
+    def _wake(self):
+        """
+        wakes the receive thread.
+        """
+        if self._wake_send:
+            try:
+                self._wake_send.send(b'\0')
+            except OSError:
+                pass
@@ -0,0 +1,84 @@
+import typing
+import numpy as np
+
+
+class RingBuffer():
+    """
+    Keeps the last `capacity` samples of a time series (or a few side by side, as columns), in a NumPy array made up front.
+
+    Every sample is written twice, once in each half of an array twice the capacity, so the newest samples (however many you ask for)
+    are always one contiguous slice of it. That makes reading a window a view rather than a copy, and appending is always just two rows
+    written, however full it is. Memory never grows past what's made at the start.
+
+    Meant for one thread appending and any number reading. A view is of the buffer itself, so once `capacity` more samples are appended
+    it will have been written over; copy it if it has to last.
+    """
+
+    def __init__(self, capacity: int, columns: int = 1) -> None:
+        if capacity <= 0:
+            raise ValueError("ring buffer capacity must be positive")
+
+        self.capacity = capacity
+        self.columns = columns
+        self.appended = 0 # samples ever appended. goes up by one for every sample, so it can tell readers if anything is new
+
+        self._data = np.zeros((capacity * 2, columns), dtype=np.float64)
+        self._head = 0 # where the next sample goes, in the first half
+
+    def __len__(self) -> int:
+        return min(self.appended, self.capacity)
+
+    def append(self, *values: float):
+        """
+        adds one sample, one value per column.
+        """
+        self._data[self._head] = values
+        self._data[self._head + self.capacity] = values
+        self._head = (self._head + 1) % self.capacity
+        self.appended += 1
+
+    def extend(self, samples: typing.Any):
+        """
+        adds many samples at once, shape (n, columns) (or (n,) for one column).
+        """
+        samples = np.asarray(samples, dtype=np.float64).reshape(-1, self.columns)
+        if len(samples) > self.capacity: # only the newest would survive anyway
+            self.appended += len(samples) - self.capacity
+            samples = samples[-self.capacity:]
+
+        count = len(samples)
+        first = min(count, self.capacity - self._head) # up to the end of the first half, then wrapping round to the start
+        for offset in (0, self.capacity):
+            self._data[offset + self._head:offset + self._head + first] = samples[:first]
+            self._data[offset:offset + count - first] = samples[first:]
+        self._head = (self._head + count) % self.capacity
+        self.appended += count
+
+    def view(self, count: int = -1) -> np.ndarray:
+        """
+        the newest `count` samples (or all of them, if -1), oldest first, shape (count, columns). doesn't copy, and can't be written to.
+        """
+        size = len(self)
+        count = size if count < 0 else min(count, size)
+        end = self._head + self.capacity
+        view = self._data[end - count:end]
+        view.flags.writeable = False
+        return view
+
+    def column(self, column: int, count: int = -1) -> np.ndarray:
+        """
+        like view, but just one column, shape (count,).
+        """
+        return self.view(count)[:, column]
+
+    def latest(self) -> np.ndarray:
+        """
+        the newest sample. the buffer mustn't be empty.
+        """
+        if self.appended <= 0:
+            raise IndexError("ring buffer is empty")
+        return self.view(1)[0]
+
+    def clear(self):
+        self._head = 0
+        self.appended = 0
@@ -0,0 +1,85 @@
+"""
+What the rov reports back about itself in TELEMETRY packets, and how it's squeezed into whole numbers to keep the packet small.
+
+Everything is fixed point: a value is multiplied by its scale, rounded, and clamped to what the packed type can hold.
+The duty cycles and servo bytes are already whole numbers, so they go as they are.
+"""
+from __future__ import annotations
+from src.common import types
+
+
+MOTORS: tuple[types._MotorKey, ...] = ('left_front', 'right_front', 'left_top', 'right_top', 'left_back', 'right_back') # the order motors are packed in
+SERVOS: tuple[types._ServoKey, ...] = ('camera_angle', 'tool_ver', 'tool_hor')
+
+# packed as: uptime (ms), 6 duty cycles, 3 servo bytes, gyro (yaw, pitch, roll), pid modulation,
+#            loop busy (percent), loop jitter, loop overruns, i2c writes per second, camera fps
+FORMAT: str = ">I6H3B3hhBHIHH"
+
+UPTIME_SCALE: int = 1000 # ms
+GYRO_SCALE: int = 100 # hundredths, so +-327.67
+PID_SCALE: int = 100
+BUSY_SCALE: int = 100 # percent of the tick
+JITTER_SCALE: int = 10000 # tenths of a ms, so up to 6.5 s
+FPS_SCALE: int = 100
+
+_INT16: tuple[int, int] = (-0x8000, 0x7FFF)
+_UINT8: tuple[int, int] = (0, 0xFF)
+_UINT16: tuple[int, int] = (0, 0xFFFF)
+_UINT32: tuple[int, int] = (0, 0xFFFFFFFF)
+
+
+def _fixed(value: float, scale: int, limits: tuple[int, int]) -> int:
+    return max(limits[0], min(limits[1], round(value * scale)))
+
+
+class Telemetry():
+    """
+    One TELEMETRY packet's worth of what the rov is actually doing.
+    """
+
+    def __init__(self) -> None:
+        self.uptime = 0.0 # seconds since the rov started
+        self.duty_cycles: dict[types._MotorKey, int] = {motor: 0 for motor in MOTORS} # what each motor's channel was last set to
+        self.servos: dict[types._ServoKey, int] = {servo: 0 for servo in SERVOS} # bytes, 0..180
+        self.gyro: tuple[float, float, float] = (0.0, 0.0, 0.0) # yaw, pitch, roll
+        self.pid = 0.0 # the stabiliser's last modulation (0 while correction is off)
+        self.loop_busy = 0.0 # fraction of the last tick spent working
+        self.loop_jitter = 0.0 # seconds late the last tick woke up
+        self.loop_overruns = 0 # ticks that ran over, ever
+        self.i2c_writes_per_second = 0.0
+        self.camera_fps = 0.0
+
+    def pack(self) -> tuple[int, ...]:
+        """
+        the values to send, in FORMAT order.
+        """
+        return (
+            _fixed(self.uptime, UPTIME_SCALE, _UINT32),
+            *(_fixed(self.duty_cycles[motor], 1, _UINT16) for motor in MOTORS),
+            *(_fixed(self.servos[servo], 1, _UINT8) for servo in SERVOS),
+            *(_fixed(axis, GYRO_SCALE, _INT16) for axis in self.gyro),
+            _fixed(self.pid, PID_SCALE, _INT16),
+            _fixed(self.loop_busy, BUSY_SCALE, _UINT8),
+            _fixed(self.loop_jitter, JITTER_SCALE, _UINT16),
+            _fixed(self.loop_overruns, 1, _UINT32),
+            _fixed(self.i2c_writes_per_second, 1, _UINT16),
+            _fixed(self.camera_fps, FPS_SCALE, _UINT16),
+        )
+
+    @staticmethod
+    def unpack(*values: int) -> Telemetry:
+        """
+        the other way round, from what a TELEMETRY listener gets.
+        """
+        t = Telemetry()
+        t.uptime = values[0] / UPTIME_SCALE
+        t.duty_cycles = dict(zip(MOTORS, values[1:7]))
+        t.servos = dict(zip(SERVOS, values[7:10]))
+        t.gyro = (values[10] / GYRO_SCALE, values[11] / GYRO_SCALE, values[12] / GYRO_SCALE)
+        t.pid = values[13] / PID_SCALE
+        t.loop_busy = values[14] / BUSY_SCALE
+        t.loop_jitter = values[15] / JITTER_SCALE
+        t.loop_overruns = values[16]
+        t.i2c_writes_per_second = values[17]
+        t.camera_fps = values[18] / FPS_SCALE
+        return t
@@ -0,0 +1,25 @@
+"""
+Shared layout of camera tiles, for the delta camera mode.
+
+In delta mode the picture is split into a grid, and only the tiles that changed get sent, each as its own small JPEG.
+Every so often a keyframe (the whole picture as one tile) is sent, so anything that went missing gets fixed.
+"""
+
+import struct
+
+# sent in front of every tile's jpeg
+# <frame id> <flags> <x> <y> <frame width> <frame height>
+# x and y are where the tile goes, in pixels of the whole frame (which is frame width x frame height)
+TILE_HEADER: struct.Struct = struct.Struct(">IBHHHH")
+
+FLAG_KEYFRAME: int = 0x01 # this tile is the whole frame
+
+
+def tile_bounds(width: int, height: int, cols: int, rows: int) -> list[tuple[int, int, int, int]]:
+    """
+    splits a width x height picture into a cols x rows grid. returns (x0, y0, x1, y1) of every tile, row by row.
+    tiles on the right and bottom edges take up any pixels that dont divide evenly.
+    """
+    xs = [width * i // cols for i in range(cols + 1)]
+    ys = [height * i // rows for i in range(rows + 1)]
+    return [(xs[c], ys[r], xs[c + 1], ys[r + 1]) for r in range(rows) for c in range(cols)]
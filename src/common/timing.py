@@ -0,0 +1,70 @@
+import time
+
+
+class FixedRateLoop():
+    """
+    Keeps a loop running at a fixed rate, on monotonic deadlines.
+
+    Deadlines are spaced exactly one period apart from the first one, so sleeping a bit too long on one tick doesn't push every
+    later tick back (no drift). If a tick overruns past the next deadline, the missed deadlines are skipped rather than rushed through.
+    """
+
+    def __init__(self, rate: float) -> None:
+        self.rate = rate # ticks per second
+        self.period = 1.0 / rate
+
+        self._deadline: float | None = None # when the next tick is due
+        self._tick_start = 0.0
+
+        # stats
+        self.ticks = 0
+        self.overruns = 0 # ticks that took so long a deadline was missed
+        self.jitter = 0.0 # how late the last tick woke up, in seconds
+        self.jitter_max = 0.0
+        self.jitter_total = 0.0
+        self.busy = 0.0 # fraction of the last tick's period spent working (not sleeping)
+
+    def wait(self) -> float:
+        """
+        sleeps until the next tick is due. returns dt for the tick: a whole number of periods, so it's the same every tick unless one overran.
+        """
+        now = time.monotonic()
+
+        if self._deadline is None: # first tick goes straight away
+            self._deadline = now + self.period
+            self._tick_start = now
+            self.ticks += 1
+            return self.period
+
+        self.busy = (now - self._tick_start) / self.period
+
+        periods = 1
+        if now > self._deadline:
+            # the last tick ran over. this one goes straight away, and any whole periods missed on top of that
+            # are skipped instead of running back-to-back ticks to catch up
+            missed = int((now - self._deadline) / self.period)
+            self.overruns += 1
+            self._deadline += missed * self.period
+            periods += missed
+
+        time.sleep(max(0.0, self._deadline - time.monotonic()))
+
+        now = time.monotonic()
+        self.jitter = now - self._deadline
+        self.jitter_max = max(self.jitter_max, self.jitter)
+        self.jitter_total += self.jitter
+
+        self._tick_start = now
+        self._deadline += self.period
+        self.ticks += 1
+        return self.period * periods
+
+    def jitter_mean(self) -> float:
+        return self.jitter_total / max(1, self.ticks - 1)
+
+    def reset_stats(self):
+        self.ticks = 0
+        self.overruns = 0
+        self.jitter = 0.0
+        self.jitter_max = 0.0
+        self.jitter_total = 0.0
@@ -0,0 +1,102 @@
+import threading
+import time
+from src.common.net import packets
+from src.common.net.worker import Networker
+from src.common.timing import FixedRateLoop
+
+type _Controls = tuple[float, float, float, float, float, float, int, int, int] # the CONTROL packet's values
+
+
+class ControlSender():
+    """
+    Sends the controls to the rov at a fixed rate, however fast the window is drawing.
+
+    A big change (past the threshold) goes out straight away instead of waiting for the next slot. If nothing has changed,
+    only a keepalive goes out every so often, so the rov still knows the poolside is there.
+
+    Runs on its own thread. The window just hands it the newest controls every frame.
+    """
+
+    RATE_INTERVAL: float = 1.0 # seconds the send rate is measured over
+
+    def __init__(self, net: Networker, rate: float, keepalive_interval: float, threshold: float) -> None:
+        self.net = net
+        self.rate = rate # sends per second while the controls are changing
+        self.keepalive_interval = keepalive_interval # most seconds between sends while nothing is changing
+        self.threshold = threshold # a throttle (or servo, scaled to -1..1) changing by more than this is sent straight away
+
+        self._lock = threading.Lock()
+        self._latest: _Controls | None = None # newest controls from the window
+        self._sent: _Controls | None = None # what the rov was last sent
+        self._last_send = 0.0
+        self.running = True
+
+        # counters
+        self.sends = 0
+        self.sends_immediate = 0 # sent straight away because something changed a lot
+        self.sends_keepalive = 0 # sent with nothing changed
+
+        # measurements, over the last rate interval
+        self.sends_per_second = 0.0
+        self._rate_start = time.monotonic()
+        self._rate_sends = 0
+
+        self.thread = threading.Thread(name="Control Sender Thread", target=self._thread_activity)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def submit(self, controls: _Controls):
+        """
+        hands over the newest controls. sends them right away if they changed past the threshold since they were last sent.
+        """
+        with self._lock:
+            self._latest = controls
+            if not self.net.is_open():
+                return
+            if self._sent is None or self._changed_past_threshold(controls, self._sent):
+                self._send(controls)
+                self.sends_immediate += 1
+
+    def stop(self):
+        self.running = False
+
+    def _thread_activity(self):
+        loop = FixedRateLoop(self.rate)
+        while self.running: # loops until the window closes
+            loop.wait()
+
+            with self._lock:
+                if self._latest is None or not self.net.is_open():
+                    continue
+                if self._latest != self._sent:
+                    self._send(self._latest)
+                elif time.monotonic() - self._last_send >= self.keepalive_interval:
+                    self._send(self._latest)
+                    self.sends_keepalive += 1
+
+                self._measure()
+
+    def _changed_past_threshold(self, a: _Controls, b: _Controls) -> bool:
+        for i in range(6): # throttles, -1..1
+            if abs(a[i] - b[i]) > self.threshold:
+                return True
+        for i in range(6, 9): # servos, as bytes 0..180 (so 90 per 1.0 of the -1..1 range)
+            if abs(a[i] - b[i]) > self.threshold * 90:
+                return True
+        return False
+
+    def _send(self, controls: _Controls):
+        # lock must be held
+        self.net.send(packets.CONTROL, *controls)
+        self._sent = controls
+        self._last_send = time.monotonic()
+        self.sends += 1
+
+    def _measure(self):
+        now = time.monotonic()
+        elapsed = now - self._rate_start
+        if elapsed < ControlSender.RATE_INTERVAL:
+            return
+        self.sends_per_second = (self.sends - self._rate_sends) / elapsed
+        self._rate_start = now
+        self._rate_sends = self.sends
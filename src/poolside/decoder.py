@@ -0,0 +1,183 @@
+import io
+import collections
+import threading
+import pygame
+
+from src.common import tiles
+from src.common.net import fragment
+
+
+class FrameDecoder():
+    """
+    Decodes and scales camera frames on its own thread, so the network thread never waits on a JPEG.
+
+    Only the newest frame matters: a frame that arrives while another is still waiting to be decoded replaces it.
+    Decoded frames are handed to the render loop through three surfaces (triple buffering), so neither side
+    ever draws or decodes into a surface the other is using.
+
+    In delta mode, tiles are composited onto a persistent canvas instead. Every tile matters there, so they queue up,
+    but a keyframe replaces anything queued before it.
+    """
+
+    TILE_QUEUE_LENGTH: int = 256 # most tiles waiting to be decoded. any more are dropped (the next keyframe fixes it)
+
+    def __init__(self, blank: pygame.Surface) -> None:
+        # all of these are copies of the blank frame, so they share its size and pixel format
+        self._front = blank.copy() # what the render loop draws
+        self._ready = blank.copy() # the newest decoded frame, waiting to be swapped to the front
+        self._back = blank.copy() # what the decoder thread decodes into
+        self._canvas = blank.copy() # what the tiles are composited onto, which persists between frames
+        self._has_ready = False
+        self._generation = 0 # goes up on every reset, so a decode that was already under way when it happened is thrown away
+        self._blank_canvas: pygame.Surface | None = None # set by reset, for the decoder thread to clear the canvas with before the next tile
+
+        self._pending: bytes | None = None # newest undecoded frame
+        self._tiles: collections.deque[bytes] = collections.deque() # undecoded tiles, oldest first
+        self._keyframe_id: int | None = None # frame id of the newest keyframe seen, tiles from before it are out of date
+        self._condition = threading.Condition()
+        self._running = True
+
+        # counters
+        self.received = 0 # frames (or tiles) given to the decoder
+        self.decoded = 0 # frames (or tiles) decoded and scaled
+        self.dropped = 0 # frames (or tiles) that failed to decode, or didnt fit in the queue
+        self.superseded = 0 # frames (or tiles) replaced by a newer one before they were decoded, or before they were drawn
+        self.shown = 0 # times the front surface (what latest() returns) changed
+
+        self._thread = threading.Thread(name="FrameDecoderThread", target=self._decode_thread)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def submit(self, data: bytes):
+        """
+        queues an encoded frame for decoding. never blocks for longer than it takes to swap a reference.
+        """
+        with self._condition:
+            if self._pending is not None:
+                self.superseded += 1
+            self._pending = data
+            self.received += 1
+            self._condition.notify()
+
+    def submit_tile(self, data: bytes):
+        """
+        queues an encoded tile (tile header and jpeg) for compositing.
+        """
+        if len(data) < tiles.TILE_HEADER.size:
+            return
+        frame_id, flags, x, y, width, height = tiles.TILE_HEADER.unpack_from(data)
+
+        with self._condition:
+            self.received += 1
+
+            if flags & tiles.FLAG_KEYFRAME:
+                # the keyframe covers everything, so nothing queued before it matters any more
+                self.superseded += len(self._tiles)
+                self._tiles.clear()
+                self._keyframe_id = frame_id
+            elif self._keyframe_id is not None and not fragment.frame_is_newer(frame_id, self._keyframe_id):
+                self.superseded += 1
+                return
+
+            if len(self._tiles) >= FrameDecoder.TILE_QUEUE_LENGTH:
+                self.dropped += 1
+                return
+
+            self._tiles.append(data)
+            self._condition.notify()
+
+    def latest(self) -> pygame.Surface:
+        """
+        the newest decoded frame. only call this from the render loop; the surface is the render loop's until the next call.
+        """
+        with self._condition:
+            if self._has_ready:
+                self._front, self._ready = self._ready, self._front
+                self._has_ready = False
+                self.shown += 1
+        return self._front
+
+    def reset(self, blank: pygame.Surface):
+        """
+        shows `blank` until the next frame arrives, forgetting anything that was waiting, and the last keyframe.
+        """
+        with self._condition:
+            self._pending = None
+            self._tiles.clear()
+            self._keyframe_id = None
+            self._has_ready = False
+            self._generation += 1
+            self._blank_canvas = blank # the canvas is the decoder thread's, so it clears it
+            self._front.blit(blank, (0, 0))
+            self.shown += 1
+
+    def stop(self):
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+
+    def _decode_thread(self):
+        while True:
+            with self._condition:
+                while self._running and self._pending is None and len(self._tiles) <= 0:
+                    self._condition.wait()
+                if not self._running:
+                    return
+                data, self._pending = self._pending, None
+                tile_batch = list(self._tiles)
+                self._tiles.clear()
+                generation = self._generation
+                blank, self._blank_canvas = self._blank_canvas, None
+
+            if blank is not None: # reset since the last batch, so the tiles dont go on top of the old picture
+                self._canvas.blit(blank, (0, 0))
+
+            decoded = 0
+            if data is not None:
+                decoded += self._decode_frame(data)
+            for tile in tile_batch:
+                decoded += self._decode_tile(tile)
+
+            if decoded <= 0:
+                continue
+
+            if len(tile_batch) > 0: # tiles go onto the canvas, so the whole canvas is the new frame
+                self._back.blit(self._canvas, (0, 0))
+
+            with self._condition:
+                if generation != self._generation: # reset while it was being decoded, so it's out of date
+                    self.superseded += decoded
+                    continue
+                if self._has_ready: # the last one never got drawn
+                    self.superseded += 1
+                self._ready, self._back = self._back, self._ready
+                self._has_ready = True
+                self.decoded += decoded
+
+    def _decode_frame(self, data: bytes) -> int:
+        try:
+            image = pygame.image.load(io.BytesIO(data), 'jpg').convert()
+            pygame.transform.scale(image, self._back.size, self._back)
+            return 1
+        except (pygame.error, ValueError):
+            with self._condition:
+                self.dropped += 1
+            return 0
+
+    def _decode_tile(self, data: bytes) -> int:
+        frame_id, flags, x, y, width, height = tiles.TILE_HEADER.unpack_from(data)
+        try:
+            image = pygame.image.load(io.BytesIO(memoryview(data)[tiles.TILE_HEADER.size:]), 'jpg').convert()
+        except (pygame.error, ValueError):
+            with self._condition:
+                self.dropped += 1
+            return 0
+
+        # where the tile goes on the canvas. both edges are scaled (rather than the position and size) so neighbouring tiles meet without gaps
+        sx = self._canvas.width / width
+        sy = self._canvas.height / height
+        left, top = round(x * sx), round(y * sy)
+        right, bottom = round((x + image.width) * sx), round((y + image.height) * sy)
+
+        self._canvas.blit(pygame.transform.scale(image, (right - left, bottom - top)), (left, top))
+        return 1
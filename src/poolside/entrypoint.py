@@ -2,11 +2,11 @@ import pygame
 
 from src.poolside.window import Window
 
-def poolside_main(target_ip: str, target_port: int, port: int):
+def poolside_main(target_ip: str, target_port: int, port: int, replay: str | None = None, replay_speed: float = 1.0):
     """
-    Main Entrypoint for the poolside.
+    Main Entrypoint for the poolside. if `replay` is a capture, what the poolside received in it is played back as well.
     """
     pygame.init() # initialise pygame
 
-    wnd = Window(target_ip, target_port, port)
+    wnd = Window(target_ip, target_port, port, replay, replay_speed)
     wnd.run()
@@ -2,6 +2,7 @@ import socket
 import struct
 
 from src.common import consts
+from src.common.net import codec
 from src.poolside.float import packets
 
 
@@ -9,6 +10,13 @@ class FloatNetworker():
     HEADER_FORMAT: str = '>H' # id
     POINT_FORMAT: str = '>ff' # time, depth
     OTHER_DATA_FORMAT: str = ">if" # profile no., temperature
+    COUNT_FORMAT: str = ">i" # number of points
+
+    # compiled once, here, rather than every time a packet comes in
+    HEADER: struct.Struct = codec.compile_format(HEADER_FORMAT)
+    POINT: struct.Struct = codec.compile_format(POINT_FORMAT)
+    OTHER_DATA: struct.Struct = codec.compile_format(OTHER_DATA_FORMAT)
+    COUNT: struct.Struct = codec.compile_format(COUNT_FORMAT)
 
     type _addr = tuple[str, int]
 
@@ -25,9 +33,9 @@ class FloatNetworker():
             data = bytes()
             while id != type:
                 data, addr = self.client.recvfrom(consts.FLOAT_PACKET_SIZE)
-                id, = struct.unpack_from(FloatNetworker.HEADER_FORMAT, data)
+                id, = FloatNetworker.HEADER.unpack_from(data)
 
-            return data[struct.calcsize(FloatNetworker.HEADER_FORMAT):]
+            return data[FloatNetworker.HEADER.size:]
         except ConnectionResetError:
             return None
         except TimeoutError:
@@ -36,19 +44,14 @@ class FloatNetworker():
 
     @staticmethod
     def build_packet(id: int, data: bytes = bytes()) -> bytes:
+        header_size = FloatNetworker.HEADER.size
 
-        if len(data) > consts.FLOAT_PACKET_SIZE - struct.calcsize(FloatNetworker.HEADER_FORMAT):
-            raise OverflowError(f"too much data! max is {consts.FLOAT_PACKET_SIZE - struct.calcsize(FloatNetworker.HEADER_FORMAT)}, this is {len(data)}")
-
-        packet = [0x0 for i in range(consts.FLOAT_PACKET_SIZE)]
-        header = struct.pack(FloatNetworker.HEADER_FORMAT, id)
-
-        packet[0:len(header)] = header
-
-        packet[len(header):consts.FLOAT_PACKET_SIZE] = data
+        if len(data) > consts.FLOAT_PACKET_SIZE - header_size:
+            raise OverflowError(f"too much data! max is {consts.FLOAT_PACKET_SIZE - header_size}, this is {len(data)}")
 
-        while len(packet) < 1024:
-            packet += [0x0]
+        # morag expects the whole FLOAT_PACKET_SIZE, so the rest stays zeroed
+        packet = bytearray(consts.FLOAT_PACKET_SIZE)
+        FloatNetworker.HEADER.pack_into(packet, 0, id)
+        packet[header_size:header_size + len(data)] = data
 
         return bytes(packet)
-    
\ No newline at end of file
@@ -1,5 +1,4 @@
 import threading
-import struct
 from src.common import consts
 from src.poolside.logger import Logger
 from src.poolside.float import packets
@@ -30,21 +29,15 @@ class FloatInterface():
     def consume_raw_data(self, data: bytes):
         offset = 0
 
-        self.profile, self.temperature = struct.unpack_from(FloatNetworker.OTHER_DATA_FORMAT, data, offset)
-        offset += struct.calcsize(FloatNetworker.OTHER_DATA_FORMAT)
+        self.profile, self.temperature = FloatNetworker.OTHER_DATA.unpack_from(data, offset)
+        offset += FloatNetworker.OTHER_DATA.size
 
-        points = []
-        count, = struct.unpack_from(">i", data, offset)
-        offset += struct.calcsize(">i")
+        count, = FloatNetworker.COUNT.unpack_from(data, offset)
+        offset += FloatNetworker.COUNT.size
 
-        for i in range(count):
-            points.append(struct.unpack_from(FloatNetworker.POINT_FORMAT, data, offset + i * struct.calcsize(FloatNetworker.POINT_FORMAT)))
-        
-        self.processed_data = []
-        for datum in points:
-            self.processed_data.append(
-                (datum[0], datum[1])
-            )
+        # every point is the same shape, so they can all be unpacked in one go
+        points = memoryview(data)[offset:offset + count * FloatNetworker.POINT.size]
+        self.processed_data = list(FloatNetworker.POINT.iter_unpack(points))
 
     def get_processed_data(self) -> list[tuple[float, float]]:
         return self.processed_data
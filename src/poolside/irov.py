@@ -1,3 +1,4 @@
+import time
 import typing
 import pygame
 import struct
@@ -6,8 +7,11 @@ from src.common import types
 from src.common import rovmath
 from src.common.net import packets
 from src.common.net.worker import Networker
+from src.common.ringbuffer import RingBuffer
+from src.common.telemetry import Telemetry
 from src.poolside.control.manager import ControllerManager
 from src.poolside.control.thrustmaster import Thrustmaster
+from src.poolside.controlsend import ControlSender
 
 
 
@@ -41,8 +45,69 @@ class RovInterface():
         self.correction_enabled = True # if true, the ROV will attempt to stabilise itself using its IMU.
         self.camera_enabled = True
 
+        # sends the controls at a fixed rate on its own thread, rather than every frame
+        self.control_sender = ControlSender(net, consts.CONTROL_SEND_RATE, consts.CONTROL_KEEPALIVE_INTERVAL, consts.CONTROL_SEND_THRESHOLD)
+
+        # what the rov says its camera is doing
+        self.camera_fps = 0.0
+        self.camera_encode_ms = 0.0
+        self.camera_bytes_per_second = 0.0
+        self.camera_quality = 0
+        self.camera_scale = 1.0
+        self.net.register_listener(packets.CAMERA_STATS, self._recv_camera_stats)
+
+        # what is actually arriving, which gets sent back so the rov can adjust its bitrate
+        self.camera_feedback_timer = 0.0
+        self._camera_frames = 0
+        self._camera_bytes = 0
+        self._camera_lost = 0
+        self._camera_completed = 0
+        self.net.register_listener(packets.CAMERA, self._recv_camera_frame)
+        self.net.register_listener(packets.CAMERA_TILE, self._recv_camera_frame)
+
+        # history of what was sent and heard back, each as (seconds since start, value), for graphs and recording.
+        # they're ring buffers, so a whole run's worth takes the same memory from the start
+        self.start_time = time.monotonic()
+        self.history_timer = 0.0
+        self.ping_timer = 0.0
+        control_capacity = int(consts.HISTORY_SECONDS * consts.HISTORY_RATE)
+        camera_capacity = int(consts.HISTORY_SECONDS / consts.CAMERA_FEEDBACK_INTERVAL) * 2 # the stats come about once a feedback interval
+        self.history: dict[str, RingBuffer] = {}
+        for key in self.motors:
+            self.history[key] = RingBuffer(control_capacity, 2)
+        for key in ('camera_fps', 'camera_encode_ms', 'camera_bytes_per_second', 'camera_quality', 'camera_scale'):
+            self.history[key] = RingBuffer(camera_capacity, 2)
+
+        # what the rov says it is actually doing. the history has it too, as applied_<motor> (pulse width, us), applied_<servo> and the rest
+        self.telemetry: Telemetry | None = None # the newest, or none if nothing has come yet
+        self.telemetry_time = 0.0 # elapsed() when it came
+        telemetry_capacity = int(consts.HISTORY_SECONDS * consts.TELEMETRY_RATE)
+        for key in self.motors:
+            self.history[f'applied_{key}'] = RingBuffer(telemetry_capacity, 2)
+        for key in ('gyro_yaw', 'gyro_pitch', 'gyro_roll', 'pid', 'loop_busy', 'loop_jitter_ms', 'i2c_writes_per_second', 'rov_camera_fps'):
+            self.history[key] = RingBuffer(telemetry_capacity, 2)
+        self.net.register_listener(packets.TELEMETRY, self._recv_telemetry)
+
+    def elapsed(self) -> float:
+        """
+        seconds since the interface was made. the time axis of the history.
+        """
+        return time.monotonic() - self.start_time
+
     def update(self, dt: float):
 
+        # time the link
+        self.ping_timer += dt
+        if self.ping_timer >= consts.PING_INTERVAL and self.net.is_open():
+            self.net.ping()
+            self.ping_timer = 0.0
+
+        # camera feedback
+        self.camera_feedback_timer += dt
+        if self.camera_feedback_timer >= consts.CAMERA_FEEDBACK_INTERVAL:
+            self._send_camera_feedback(self.camera_feedback_timer)
+            self.camera_feedback_timer = 0.0
+
         # tick
         motor_tick: dict[types._MotorKey, rovmath.Number] = {
             'left_front': 0, # front left
@@ -127,8 +192,8 @@ class RovInterface():
             self.motors['right_back']   = motor_tick['right_back']  * throttle
 
 
-        # send data
-        self.net.send(packets.CONTROL, 
+        # send data (whenever the control sender decides to)
+        self.control_sender.submit((
                                         self.motors['left_front']  ,
                                         self.motors['right_front'] ,
                                         self.motors['left_top']    ,
@@ -139,5 +204,70 @@ class RovInterface():
                                         rovmath.servo_angle_to_byte(self.motors['camera_angle']),
                                         rovmath.servo_angle_to_byte(self.motors['tool_ver']),
                                         rovmath.servo_angle_to_byte(self.motors['tool_hor']),
-                                        )
-        
+                                        ))
+
+        # history
+        self.history_timer += dt
+        if self.history_timer >= 1.0 / consts.HISTORY_RATE:
+            self.history_timer = 0.0
+            now = self.elapsed()
+            for key, value in self.motors.items():
+                self.history[key].append(now, value)
+
+    def _send_camera_feedback(self, elapsed: float):
+        # frames that were half received and given up on count as lost
+        lost, completed = 0, 0
+        for pkt_type in (packets.CAMERA, packets.CAMERA_TILE):
+            reassembler = self.net.reassemblers.get(pkt_type[0])
+            if reassembler:
+                lost += reassembler.dropped_timeout + reassembler.dropped_stale + reassembler.dropped_memory
+                completed += reassembler.completed
+
+        new_lost = lost - self._camera_lost
+        new_completed = completed - self._camera_completed
+        loss = new_lost / (new_lost + new_completed) if new_lost + new_completed > 0 else 0.0
+
+        self.net.send(packets.CAMERA_FEEDBACK, self._camera_frames / elapsed, self._camera_bytes / elapsed, loss)
+
+        self._camera_frames = 0
+        self._camera_bytes = 0
+        self._camera_lost = lost
+        self._camera_completed = completed
+
+    def _recv_camera_frame(self, addr, data: bytes):
+        self._camera_frames += 1
+        self._camera_bytes += len(data)
+
+    def _recv_camera_stats(self, addr, fps: float, encode_ms: float, bytes_per_second: float, quality: int, scale: float):
+        self.camera_fps = fps
+        self.camera_encode_ms = encode_ms
+        self.camera_bytes_per_second = bytes_per_second
+        self.camera_quality = quality
+        self.camera_scale = scale
+
+        now = self.elapsed()
+        self.history['camera_fps'].append(now, fps)
+        self.history['camera_encode_ms'].append(now, encode_ms)
+        self.history['camera_bytes_per_second'].append(now, bytes_per_second)
+        self.history['camera_quality'].append(now, quality)
+        self.history['camera_scale'].append(now, scale)
+
+    def _recv_telemetry(self, addr, *values: int):
+        t = Telemetry.unpack(*values)
+        now = self.elapsed()
+
+        for key, dc in t.duty_cycles.items():
+            self.history[f'applied_{key}'].append(now, rovmath.inv_calc_motor_dutycycle(dc))
+        for key, byte in t.servos.items():
+            self.history[f'applied_{key}'].append(now, byte)
+        self.history['gyro_yaw'].append(now, t.gyro[0])
+        self.history['gyro_pitch'].append(now, t.gyro[1])
+        self.history['gyro_roll'].append(now, t.gyro[2])
+        self.history['pid'].append(now, t.pid)
+        self.history['loop_busy'].append(now, t.loop_busy)
+        self.history['loop_jitter_ms'].append(now, t.loop_jitter * 1000)
+        self.history['i2c_writes_per_second'].append(now, t.i2c_writes_per_second)
+        self.history['rov_camera_fps'].append(now, t.camera_fps)
+
+        self.telemetry = t
+        self.telemetry_time = now
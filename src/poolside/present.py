@@ -0,0 +1,128 @@
+import math
+import typing
+import pygame
+
+
+class Presenter():
+    """
+    Puts the draw surface (the ui, at its logical size) on the window, at whatever size the window is.
+
+    It scales straight into the window's surface (or the part of it the picture goes in), which is only worked out again when the window
+    changes size, so nothing is allocated per frame. Only the parts of the draw surface that changed are scaled, where the mode allows.
+
+    Modes, cheapest first:
+    - `integer`: scales by a whole number (or one over a whole number, to shrink), with black bars around whatever doesn't fit.
+                 every pixel maps exactly, so only what changed is scaled, and its pixel perfect.
+    - `nearest`: fills the window, picking the nearest pixel. only what changed is scaled, but the edges of those parts can be a pixel out
+                 until the next full redraw. shrinking text this way looks rough.
+    - `smooth`: fills the window, blending pixels. looks best, especially shrinking, but blending reaches past the edges of what changed,
+                so the whole surface is scaled whenever anything does. several times the cost of `nearest` at 1080p.
+    """
+
+    type _Mode = typing.Literal['nearest', 'smooth', 'integer']
+
+    def __init__(self, window: pygame.Window, source: pygame.Surface, mode: _Mode = 'nearest', skip_same_size: bool = True) -> None:
+        self.window = window
+        self.source = source # the draw surface
+        self.mode: Presenter._Mode = mode
+        self.skip_same_size = skip_same_size # if true and the window is the same size as the source, its copied across without scaling
+
+        self.target: pygame.Surface = window.get_surface() # where the picture goes, in the window surface
+        self._size = (0, 0) # window size the target was worked out for
+        self._factor = 1 # integer mode: the scale, as a whole number (or one over it, if shrinking)
+        self._shrink = False
+        self._full = True # the next present scales everything, and clears the bars around it
+
+        self.resize()
+
+    def set_mode(self, mode: _Mode):
+        self.mode = mode
+        self.resize()
+
+    def resize(self):
+        """
+        works out where the picture goes again. call it when the window changes size.
+        """
+        surface = self.window.get_surface()
+        self._size = surface.size
+        self._full = True
+
+        if self.mode != 'integer':
+            self.target = surface
+            return
+
+        sw, sh = self.source.size
+        ww, wh = self._size
+        if ww >= sw and wh >= sh:
+            self._factor = max(1, min(ww // sw, wh // sh))
+            self._shrink = False
+            size = (sw * self._factor, sh * self._factor)
+        else:
+            self._factor = max(math.ceil(sw / max(1, ww)), math.ceil(sh / max(1, wh)))
+            self._shrink = True
+            size = (sw // self._factor, sh // self._factor)
+
+        rect = pygame.Rect((0, 0), size)
+        rect.center = surface.get_rect().center
+        self.target = surface.subsurface(rect)
+
+    def present(self, changed: list[pygame.Rect]) -> bool:
+        """
+        scales the changed parts of the source onto the window. returns true if anything on the window changed.
+        """
+        if self.window.size != self._size: # in case the resize event hasnt come through yet
+            self.resize()
+
+        if not self._full and len(changed) <= 0:
+            return False
+
+        direct = self.skip_same_size and self.target.size == self.source.size
+        if self._full or self.mode == 'smooth' or (len(changed) == 1 and changed[0] == self.source.get_rect()):
+            if self._full:
+                self.window.get_surface().fill(0x000000) # the bars around the picture
+                self._full = False
+
+            if direct:
+                self.target.blit(self.source, (0, 0))
+            elif self.mode == 'smooth':
+                pygame.transform.smoothscale(self.source, self.target.size, self.target)
+            else:
+                pygame.transform.scale(self.source, self.target.size, self.target)
+            return True
+
+        for rect in changed:
+            if direct:
+                self.target.blit(self.source, rect, rect)
+                continue
+
+            source, dest = self._map(rect)
+            if dest.w <= 0 or dest.h <= 0 or source.w <= 0 or source.h <= 0:
+                continue
+            pygame.transform.scale(self.source.subsurface(source), dest.size, self.target.subsurface(dest))
+        return True
+
+    def _map(self, rect: pygame.Rect) -> tuple[pygame.Rect, pygame.Rect]:
+        """
+        the part of the source to scale, and the part of the target it goes in, to cover `rect`.
+        """
+        target_rect = self.target.get_rect()
+        source_rect = self.source.get_rect()
+
+        if self.mode == 'integer':
+            n = self._factor
+            if not self._shrink:
+                return rect, pygame.Rect(rect.x * n, rect.y * n, rect.w * n, rect.h * n).clip(target_rect)
+            # line the part up with blocks of n pixels, which each become one pixel on the window
+            left, top = rect.left // n, rect.top // n
+            dest = pygame.Rect(left, top, math.ceil(rect.right / n) - left, math.ceil(rect.bottom / n) - top).clip(target_rect)
+            return pygame.Rect(dest.x * n, dest.y * n, dest.w * n, dest.h * n).clip(source_rect), dest
+
+        # a pixel on the edge of this part can come from the source pixel next to the one scaling the whole thing would have picked,
+        # which is never more than a pixel out, and is put right by the next full redraw
+        sx = self.target.width / self.source.width
+        sy = self.target.height / self.source.height
+        left, top = math.floor(rect.left * sx), math.floor(rect.top * sy)
+        dest = pygame.Rect(left, top, math.ceil(rect.right * sx) - left, math.ceil(rect.bottom * sy) - top).clip(target_rect)
+        left, top = math.floor(dest.left / sx), math.floor(dest.top / sy)
+        source = pygame.Rect(left, top, math.ceil(dest.right / sx) - left, math.ceil(dest.bottom / sy) - top).clip(source_rect)
+        return source, dest
@@ -0,0 +1,258 @@
+import os
+import time
+import struct
+import threading
+import collections
+
+from src.common import tiles
+
+# records the camera feed to disk as it arrives, so the dive can be watched back afterwards.
+#
+# the frames are already jpegs, so they're written as they are (no decoding, no encoding again) into motion jpeg AVI files,
+# which most video players (and opencv, and ffmpeg) can open. a new file (segment) is started every so often, and whenever the
+# picture changes size (the rov shrinks it when the link is struggling), so a crash only loses the end of the newest one.
+# next to every segment is a .csv of when each frame in it actually arrived, since the AVI can only say "n frames per second".
+#
+# the network side only ever appends to a queue. a thread of its own does the writing, a batch of frames at a time,
+# so a slow (or stuck) disk never holds up the camera feed. if the queue fills up, frames are dropped, and counted
+
+
+def jpeg_size(data: bytes | memoryview) -> tuple[int, int] | None:
+    """
+    width and height of a jpeg, from its frame header. none if it doesnt look like a jpeg.
+    """
+    if len(data) < 4 or data[0] != 0xFF or data[1] != 0xD8:
+        return None
+    i = 2
+    while i + 4 <= len(data):
+        if data[i] != 0xFF:
+            return None
+        marker = data[i + 1]
+        if marker == 0xFF: # padding
+            i += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD9: # no length after these
+            i += 2
+            continue
+        length = (data[i + 2] << 8) | data[i + 3]
+        if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC): # start of frame (any kind)
+            if i + 9 > len(data):
+                return None
+            height = (data[i + 5] << 8) | data[i + 6]
+            width = (data[i + 7] << 8) | data[i + 8]
+            return width, height
+        i += 2 + length
+    return None
+
+
+class AviWriter():
+    """
+    Writes one motion jpeg AVI file. The sizes and frame counts in the headers, and the index at the end, are filled in by close().
+    """
+
+    AVIF_HASINDEX: int = 0x10
+    AVIIF_KEYFRAME: int = 0x10 # every frame of motion jpeg is a keyframe
+
+    MAIN_HEADER: struct.Struct = struct.Struct("<4sI10I4I") # 'avih', size, then the fields of AVIMAINHEADER
+    STREAM_HEADER: struct.Struct = struct.Struct("<4sI4s4sIHHIIIIIIIIhhhh") # 'strh', size, then AVISTREAMHEADER
+    STREAM_FORMAT: struct.Struct = struct.Struct("<4sIIiiHH4sIiiII") # 'strf', size, then BITMAPINFOHEADER
+    CHUNK: struct.Struct = struct.Struct("<4sI")
+    INDEX_ENTRY: struct.Struct = struct.Struct("<4sIII") # chunk id, flags, offset (from the 'movi'), size
+
+    def __init__(self, path: str, width: int, height: int, fps: float) -> None:
+        self.path = path
+        self.width = width
+        self.height = height
+        self.fps = fps # what the headers say until close works out the real rate
+
+        self._file = open(path, 'wb')
+        self._index = bytearray()
+        self.frames = 0
+        self.bytes = 0
+
+        self._file.write(self._headers(fps, 0))
+        self._movi_start = self._file.tell() - 4 # index offsets are from the 'movi' fourcc
+
+    def add(self, frames: list[bytes]):
+        """
+        appends frames, in one write.
+        """
+        out = bytearray()
+        offset = self._file.tell() - self._movi_start
+        for data in frames:
+            self._index += AviWriter.INDEX_ENTRY.pack(b'00dc', AviWriter.AVIIF_KEYFRAME, offset + len(out), len(data))
+            out += AviWriter.CHUNK.pack(b'00dc', len(data))
+            out += data
+            if len(data) % 2: # chunks start on even bytes
+                out += b'\0'
+        self._file.write(out)
+        self.frames += len(frames)
+        self.bytes += len(out)
+
+    def close(self, duration: float):
+        """
+        finishes the file. `duration` is how long (seconds) the frames in it took to arrive, which sets the frame rate it plays at.
+        """
+        movi_end = self._file.tell()
+        self._file.write(AviWriter.CHUNK.pack(b'idx1', len(self._index)))
+        self._file.write(self._index)
+        end = self._file.tell()
+
+        fps = (self.frames - 1) / duration if self.frames > 1 and duration > 0 else self.fps
+        self._file.seek(0)
+        self._file.write(self._headers(fps, self.frames, end - 8, movi_end - self._movi_start))
+        self._file.close()
+
+    def _headers(self, fps: float, frames: int, riff_size: int = 0, movi_size: int = 4) -> bytes:
+        scale, rate = 1000, max(1, round(fps * 1000)) # the rate is rate / scale frames per second
+        avih = AviWriter.MAIN_HEADER.pack(b'avih', 56, round(1e6 / max(fps, 0.001)), 0, 0, AviWriter.AVIF_HASINDEX, frames, 0, 1, 0,
+                                          self.width, self.height, 0, 0, 0, 0)
+        strh = AviWriter.STREAM_HEADER.pack(b'strh', 56, b'vids', b'MJPG', 0, 0, 0, 0, scale, rate, 0, frames, 0, 0xFFFFFFFF, 0,
+                                            0, 0, self.width, self.height)
+        strf = AviWriter.STREAM_FORMAT.pack(b'strf', 40, 40, self.width, self.height, 1, 24, b'MJPG', self.width * self.height * 3, 0, 0, 0, 0)
+        strl = b'LIST' + struct.pack("<I", 4 + len(strh) + len(strf)) + b'strl' + strh + strf
+        hdrl = b'LIST' + struct.pack("<I", 4 + len(avih) + len(strl)) + b'hdrl' + avih + strl
+        return b'RIFF' + struct.pack("<I", riff_size) + b'AVI ' + hdrl + b'LIST' + struct.pack("<I", movi_size) + b'movi'
+
+
+class VideoRecorder():
+    """
+    Writes camera frames (jpegs) to segmented AVI files on a thread of its own. submit() never waits on the disk.
+    """
+
+    def __init__(self, directory: str, fps: float, segment_seconds: float = 60.0, queue_length: int = 120, name: str = "camera") -> None:
+        self.directory = directory
+        self.fps = fps # the frame rate new segments start out claiming
+        self.segment_seconds = segment_seconds # how long each file is, at most
+        self.queue_length = queue_length # most frames waiting to be written. any more are dropped
+        self.name = name # files are called <name>-<date and time>-<segment>.avi
+
+        self._queue: collections.deque[tuple[float, bytes]] = collections.deque() # (when it arrived, the jpeg)
+        self._condition = threading.Condition()
+        self._running = True
+        self._started = time.time()
+        self._prefix = time.strftime(f"{name}-%Y%m%d-%H%M%S", time.localtime(self._started))
+        os.makedirs(directory, exist_ok=True)
+
+        # the segment being written
+        self._avi: AviWriter | None = None
+        self._csv = None
+        self._segment_start = 0.0
+        self._segment_last = 0.0
+        self.segments = 0
+
+        # counters
+        self.received = 0 # frames given to the recorder
+        self.written = 0
+        self.dropped = 0 # didnt fit in the queue (the disk isnt keeping up), or werent jpegs
+        self.bytes = 0 # written to disk
+        self.queue_max = 0
+        self.write_max = 0.0 # longest a batch took to write, seconds
+
+        self._thread = threading.Thread(name="VideoRecorderThread", target=self._writer_thread, daemon=True)
+        self._thread.start()
+
+    def submit(self, data: bytes):
+        """
+        queues a jpeg to be written. runs on whichever thread the frame arrived on, so it only ever appends.
+        """
+        with self._condition:
+            self.received += 1
+            if len(self._queue) >= self.queue_length:
+                self.dropped += 1
+                return
+            self._queue.append((time.time(), data))
+            self.queue_max = max(self.queue_max, len(self._queue))
+            if len(self._queue) == 1: # otherwise the writer is already busy, and takes everything queued when it's done
+                self._condition.notify()
+
+    def submit_tile(self, data: bytes):
+        """
+        queues a delta mode tile, if it is a keyframe. the other tiles are only part of a picture, and would need decoding, compositing
+        and encoding again to be saved as one, so in delta mode only the keyframes are recorded.
+        """
+        if len(data) < tiles.TILE_HEADER.size:
+            return
+        flags = tiles.TILE_HEADER.unpack_from(data)[1]
+        if flags & tiles.FLAG_KEYFRAME:
+            self.submit(data[tiles.TILE_HEADER.size:])
+
+    def stop(self):
+        """
+        writes whatever is still queued, and finishes the files.
+        """
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+        self._thread.join()
+
+    def summary(self) -> str:
+        """
+        one line, for the ui.
+        """
+        return (f"recording: {self.written} frames ({self.bytes / 1024 / 1024:.0f} MiB) in {self.segments} files, "
+                f"{self.dropped} dropped")
+
+    def _writer_thread(self):
+        while True:
+            with self._condition:
+                while self._running and not self._queue:
+                    self._condition.wait()
+                batch = list(self._queue)
+                self._queue.clear()
+                running = self._running
+
+            if batch:
+                start = time.perf_counter()
+                self._write(batch)
+                self.write_max = max(self.write_max, time.perf_counter() - start)
+            if not running:
+                self._end_segment()
+                return
+
+    def _write(self, batch: list[tuple[float, bytes]]):
+        """
+        writes a batch of frames, starting new segments where it needs to. frames that arent jpegs are dropped.
+        """
+        frames: list[bytes] = []
+        for when, data in batch:
+            size = jpeg_size(data)
+            if size is None:
+                self.dropped += 1
+                continue
+            if self._avi is None or size != (self._avi.width, self._avi.height) or when - self._segment_start >= self.segment_seconds:
+                self._flush(frames)
+                frames = []
+                self._end_segment()
+                self._start_segment(when, size)
+
+            assert self._avi is not None and self._csv is not None
+            self._csv.write(f"{self._avi.frames + len(frames)},{when:.6f},{when - self._segment_start:.6f},{len(data)}\n")
+            self._segment_last = when
+            frames.append(data)
+        self._flush(frames)
+
+    def _flush(self, frames: list[bytes]):
+        if self._avi is None or not frames:
+            return
+        before = self._avi.bytes
+        self._avi.add(frames)
+        self.written += len(frames)
+        self.bytes += self._avi.bytes - before
+
+    def _start_segment(self, when: float, size: tuple[int, int]):
+        self.segments += 1
+        path = os.path.join(self.directory, f"{self._prefix}-{self.segments:03}")
+        self._avi = AviWriter(path + ".avi", size[0], size[1], self.fps)
+        self._csv = open(path + ".csv", 'w')
+        self._csv.write("frame,unix time,seconds into file,bytes\n")
+        self._segment_start = when
+        self._segment_last = when
+
+    def _end_segment(self):
+        if self._avi is None or self._csv is None:
+            return
+        self._avi.close(self._segment_last - self._segment_start)
+        self._csv.close()
+        self._avi = None
+        self._csv = None
@@ -1,4 +1,5 @@
 import typing
+import collections
 import pygame
 
 class Renderer():
@@ -10,60 +11,132 @@ class Renderer():
     type _Orientation = typing.Literal['left_to_right', 'right_to_left', 'top_to_bottom', 'bottom_to_top']
     type _LabelSupplier = typing.Callable[[str, pygame.typing.RectLike, pygame.Surface], None] | None
 
+    type _FontKey = tuple[str, bool, bool, bool, bool, bool] # font, sysfont, bold, italic, underline, strikethrough
+    type _TextKey = tuple[_FontKey, str, tuple[int, int, int, int], int, _Orientation, float, _TextJustification] # font, text, color, wrap length, orientation, scale, justification
+
+    FONT_SIZE: int = 24
+    TEXT_CACHE_SIZE: int = 512 # most rendered strings kept around. the least recently drawn ones go first
+
+    # loading a font from disk and rasterising text are both slow, and most text is the same from frame to frame, so both are kept.
+    cache_enabled: bool = True
+    _fonts: dict[_FontKey, pygame.font.Font] = {}
+    _text: collections.OrderedDict[_TextKey, pygame.Surface] = collections.OrderedDict() # oldest first
+    text_hits: int = 0
+    text_misses: int = 0
+
     @staticmethod
     def init():
-        pass
+        Renderer.clear_caches()
+
+    @staticmethod
+    def clear_caches():
+        Renderer._fonts.clear()
+        Renderer._text.clear()
+        Renderer.text_hits = 0
+        Renderer.text_misses = 0
+
+    @staticmethod
+    def get_font(font: str, sysfont: bool = False, bold: bool = False, italic: bool = False, underline: bool = False, strikethrough: bool = False) -> pygame.font.Font:
+        """
+        the font with that style, loaded once and kept.
+        """
+        key = (font, sysfont, bold, italic, underline, strikethrough)
+        f = Renderer._fonts.get(key) if Renderer.cache_enabled else None
+        if f is None:
+            if sysfont:
+                f = pygame.font.SysFont(font, Renderer.FONT_SIZE)
+            else:
+                f = pygame.font.Font(font, Renderer.FONT_SIZE)
+            f.set_bold(bold)
+            f.set_italic(italic)
+            f.set_underline(underline)
+            f.set_strikethrough(strikethrough)
+            if Renderer.cache_enabled:
+                Renderer._fonts[key] = f
+        return f
 
     
     @staticmethod
-    def draw_text(surface: pygame.Surface, text: str, rect: pygame.typing.RectLike, orientation: _Orientation = 'left_to_right', scale: float = 1.0, color: pygame.typing.ColorLike = 'white', justify: _TextJustification = 'left', font: str = 'src/resource/LeagueSpartan-SemiBold.ttf', sysfont: bool = False, bold: bool = False, italic: bool = False, underline: bool = False, strikethrough: bool = False, draw_rect: bool = False):
+    def draw_text(surface: pygame.Surface, text: str, rect: pygame.typing.RectLike, orientation: _Orientation = 'left_to_right', scale: float = 1.0, color: pygame.typing.ColorLike = 'white', justify: _TextJustification = 'left', font: str = 'src/resource/LeagueSpartan-SemiBold.ttf', sysfont: bool = False, bold: bool = False, italic: bool = False, underline: bool = False, strikethrough: bool = False, draw_rect: bool = False) -> pygame.Rect:
+        """
+        returns the area drawn over.
+        """
+        s, dest = Renderer.layout_text(text, rect, orientation, scale, color, justify, font, sysfont, bold, italic, underline, strikethrough)
+
+        drawn = surface.blit(s, dest)
+        if draw_rect:
+            og_rect = pygame.Rect(rect)
+            pygame.draw.rect(surface, 'red', og_rect, 2)
+            drawn.union_ip(og_rect)
+        return drawn
+
+    @staticmethod
+    def text_bounds(text: str, rect: pygame.typing.RectLike, orientation: _Orientation = 'left_to_right', scale: float = 1.0, color: pygame.typing.ColorLike = 'white', justify: _TextJustification = 'left', font: str = 'src/resource/LeagueSpartan-SemiBold.ttf', sysfont: bool = False, bold: bool = False, italic: bool = False, underline: bool = False, strikethrough: bool = False, draw_rect: bool = False) -> pygame.Rect:
+        """
+        the area draw_text would draw over, without drawing anything.
+        """
+        s, dest = Renderer.layout_text(text, rect, orientation, scale, color, justify, font, sysfont, bold, italic, underline, strikethrough)
+        bounds = pygame.Rect(dest.topleft, s.size)
+        if draw_rect:
+            bounds.union_ip(pygame.Rect(rect))
+        return bounds
+
+    @staticmethod
+    def layout_text(text: str, rect: pygame.typing.RectLike, orientation: _Orientation = 'left_to_right', scale: float = 1.0, color: pygame.typing.ColorLike = 'white', justify: _TextJustification = 'left', font: str = 'src/resource/LeagueSpartan-SemiBold.ttf', sysfont: bool = False, bold: bool = False, italic: bool = False, underline: bool = False, strikethrough: bool = False) -> tuple[pygame.Surface, pygame.Rect]:
+        """
+        the rendered text, and where it goes.
+        """
         
         # fix like types
         rect = pygame.Rect(rect)
         color = pygame.Color(color)
 
-        # font
-        if sysfont:
-            f = pygame.font.SysFont(font, 24)
-        else:
-            f = pygame.font.Font(font, 24)
-        f.set_bold(bold)
-        f.set_italic(italic)
-        f.set_underline(underline)
-        f.set_strikethrough(strikethrough)
-
         if orientation == 'right_to_left':
             raise Exception("text cant be drawn right to left")
-        
-        match justify:
-            case 'left': f.align = pygame.FONT_LEFT
-            case 'center': f.align = pygame.FONT_CENTER
-            case 'right': f.align = pygame.FONT_RIGHT
 
-        # render
         major_length = 0
         match orientation:
             case 'left_to_right': major_length = rect.width
             case 'top_to_bottom': major_length = rect.height
             case 'bottom_to_top': major_length = rect.height
+        wraplength = int(major_length/scale)
+
+        # render (or dont, if its been drawn before)
+        key = ((font, sysfont, bold, italic, underline, strikethrough), text, (color.r, color.g, color.b, color.a), wraplength, orientation, scale, justify)
+        s = Renderer._text.get(key) if Renderer.cache_enabled else None
+        if s is not None:
+            Renderer._text.move_to_end(key)
+            Renderer.text_hits += 1
+        else:
+            s = Renderer._render_text(text, color, wraplength, orientation, scale, justify, Renderer.get_font(font, sysfont, bold, italic, underline, strikethrough))
+            Renderer.text_misses += 1
+            if Renderer.cache_enabled:
+                Renderer._text[key] = s
+                if len(Renderer._text) > Renderer.TEXT_CACHE_SIZE:
+                    Renderer._text.popitem(last=False)
+
+        if justify == 'right':
+            rect.x -= s.get_rect().w
 
-        s = f.render(text, color=color, antialias=False, wraplength=int(major_length/scale))
+        return s, rect
+
+    @staticmethod
+    def _render_text(text: str, color: pygame.Color, wraplength: int, orientation: _Orientation, scale: float, justify: _TextJustification, f: pygame.font.Font) -> pygame.Surface:
+        match justify:
+            case 'left': f.align = pygame.FONT_LEFT
+            case 'center': f.align = pygame.FONT_CENTER
+            case 'right': f.align = pygame.FONT_RIGHT
+
+        s = f.render(text, color=color, antialias=False, wraplength=wraplength)
 
         if orientation != 'left_to_right':
             s = pygame.transform.rotate(s, 90)
             if orientation == 'top_to_bottom':
                 s = pygame.transform.flip(s, True, True)
 
-        og_rect = rect.copy()
         if scale != 1.0:
             s = pygame.transform.scale_by(s, scale)
-
-        if justify == 'right':
-            rect.x -= s.get_rect().w
-
-        surface.blit(s, rect)
-        if draw_rect:
-            pygame.draw.rect(surface, 'red', og_rect, 2)
+        return s
 
     @staticmethod
     def draw_boolean_circle(surface: pygame.Surface, pos: pygame.Vector2, bool: bool, true_label: str, false_label: str, label_supplier: _LabelSupplier = None):
@@ -71,6 +144,14 @@ class Renderer():
         pygame.draw.circle(surface, 0x00ff00 if bool else 0xff0000, pos, 8)
         Renderer._supply_label(true_label if bool else false_label, (pos + pygame.Vector2(15, -7), pygame.Vector2(0, 0)), surface, label_supplier)
 
+    @staticmethod
+    def boolean_circle_bounds(pos: pygame.Vector2, bool: bool, true_label: str, false_label: str) -> pygame.Rect:
+        """
+        the area draw_boolean_circle would draw over (with the default label).
+        """
+        bounds = pygame.Rect(pos - pygame.Vector2(10, 10), (21, 21))
+        return bounds.union(Renderer.text_bounds(true_label if bool else false_label, (pos + pygame.Vector2(15, -7), pygame.Vector2(0, 0))))
+
     @staticmethod
     def draw_progress_bar(surface: pygame.Surface, topleft: pygame.Vector2, length: float, width: float, progress: float, absolute: bool = True, orientation: _Orientation = 'left_to_right', outline_color: pygame.typing.ColorLike = 'black', fill_color: pygame.typing.ColorLike = 'white', outline_width: int = 8):
 
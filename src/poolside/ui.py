@@ -2,26 +2,44 @@ from __future__ import annotations
 import pygame
 import typing
 import datetime
-import io
+import numpy as np
 
 from src.poolside.irov import RovInterface
 from src.poolside.logger import Logger
 from src.poolside.callback import Callback
 from src.poolside.render import Renderer
+from src.poolside.decoder import FrameDecoder
+from src.poolside.recorder import VideoRecorder
 from src.common.net.worker import Networker, _Addr
 from src.common.net import packets
 from src.common import rovmath
 from src.common import consts
+from src.common import types
+from src.common.ringbuffer import RingBuffer
 
 class UiContainer():
     """
     A `UiContainer` is a type of object that keeps track of `UiElement`s.
+
+    In retained mode, the surface is kept between frames and only the parts of it where an element changed are redrawn.
+    An element changed if its `state()` or `bounds()` did, or it was marked dirty. Everything drawn over that part is redrawn too,
+    in order, so overlapping elements still stack the same way.
     """
-    def __init__(self) -> None:
+
+    FULL_REDRAW_FRACTION: float = 0.5 # when this much of the surface changed, its quicker to just redraw all of it
+
+    def __init__(self, background: pygame.typing.ColorLike | None = None, retained: bool = False) -> None:
         self.elements: list[UiElement] = []
         self.global_offset = pygame.Vector2(0, 0)
         self.global_visible = True
 
+        self.background = background # what the surface is filled with under the elements. if None, its left to whatever draws the container
+        self.retained = retained # needs a background, to clear what changed with
+
+        self._drawn: dict[UiElement, tuple[pygame.Rect | None, typing.Hashable]] = {} # element -> bounds and state it was last drawn with
+        self._drawn_visible = True
+        self._full_redraw = True
+
     def add(self, element: UiElement) -> int:
         idx = len(self.elements)
         self.elements.append(element)
@@ -29,17 +47,91 @@ class UiContainer():
     
     def get_element(self, idx: int) -> UiElement:
         return self.elements[idx]
+
+    def invalidate(self):
+        """
+        redraws everything next frame. needed when whatever the surface was shown on lost it (like a window resize).
+        """
+        self._full_redraw = True
     
-    def draw(self, surface: pygame.Surface):
-        if not self.global_visible:
-            return
+    def draw(self, surface: pygame.Surface) -> list[pygame.Rect]:
+        """
+        returns the parts of the surface that were drawn over.
+        """
+        if not self.retained or self.background is None:
+            if self.background is not None:
+                surface.fill(self.background)
+            if self.global_visible:
+                for element in self.elements:
+                    element.draw(surface)
+            return [surface.get_rect()]
+
+        full = self._full_redraw or self.global_visible != self._drawn_visible
+        damage: list[pygame.Rect] = []
+
+        # find what changed since last frame
         for element in self.elements:
-            element.draw(surface)
+            bounds = element.bounds()
+            state = element.state()
+            last = self._drawn.get(element)
+
+            if element.dirty or state is None or last is None or last[0] != bounds or last[1] != state:
+                if bounds is None or last is None or last[0] is None: # dont know where it was or will be
+                    full = True
+                elif not full:
+                    damage.append(bounds)
+                    damage.append(last[0]) # wherever it was before needs clearing
+
+            element.dirty = False
+            self._drawn[element] = (bounds, state)
+
+        self._full_redraw = False
+        self._drawn_visible = self.global_visible
+
+        surface_rect = surface.get_rect()
+        if not full:
+            damage = UiContainer._merge(damage, surface_rect)
+            full = sum(r.w * r.h for r in damage) > surface_rect.w * surface_rect.h * UiContainer.FULL_REDRAW_FRACTION
+
+        if full:
+            surface.fill(self.background)
+            if self.global_visible:
+                for element in self.elements:
+                    element.draw(surface)
+            return [surface_rect]
+
+        for rect in damage:
+            surface.set_clip(rect) # nothing drawn now can spill out of the part being redrawn
+            surface.fill(self.background, rect)
+            if self.global_visible:
+                for element in self.elements:
+                    bounds = self._drawn[element][0]
+                    if bounds is not None and bounds.colliderect(rect):
+                        element.draw(surface)
+        surface.set_clip(None)
+        return damage
 
     def update(self, dt: float, surface: pygame.Surface):
         for element in self.elements:
             element.update(dt, surface)
 
+    @staticmethod
+    def _merge(rects: list[pygame.Rect], within: pygame.Rect) -> list[pygame.Rect]:
+        """
+        joins overlapping rects, so nothing is redrawn twice.
+        """
+        merged: list[pygame.Rect] = []
+        for rect in rects:
+            rect = rect.clip(within)
+            if rect.w <= 0 or rect.h <= 0:
+                continue
+            i = rect.collidelist(merged)
+            while i != -1:
+                rect.union_ip(merged.pop(i))
+                i = rect.collidelist(merged)
+            merged.append(rect)
+        return merged
+
 
 class UiElement():
     """
@@ -53,6 +145,7 @@ class UiElement():
         self.container: UiContainer | None = None
 
         self.visible = True
+        self.dirty = True # set to redraw it next frame, even if its state() didnt change
 
     def resolve_position(self) -> pygame.Vector2:
         if self.container:
@@ -67,6 +160,18 @@ class UiElement():
     def update(self, dt: float, surface: pygame.Surface):
         pass
 
+    def bounds(self) -> pygame.Rect | None:
+        """
+        the area this element draws over. None if it can't tell, in which case it changing redraws everything.
+        """
+        return None
+
+    def state(self) -> typing.Hashable:
+        """
+        anything that changes whenever what this element draws does. None if it can't tell, in which case it's redrawn every frame.
+        """
+        return None
+
 
 class UiTexture(UiElement):
     def __init__(self, pos: pygame.Vector2, texture: pygame.Surface, scale: pygame.Vector2 = pygame.Vector2(1, 1), rotation: float = 0.0, centered: bool = False):
@@ -92,6 +197,15 @@ class UiTexture(UiElement):
         if self.centered:
             pos = self.resolve_position() - pygame.Vector2(self.texture.size) / 2
         surface.blit(self.texture, pos)
+
+    def bounds(self) -> pygame.Rect | None:
+        pos = self.resolve_position()
+        if self.centered:
+            pos = self.resolve_position() - pygame.Vector2(self.texture.size) / 2
+        return pygame.Rect(pos, self.texture.size)
+
+    def state(self) -> typing.Hashable:
+        return id(self.texture) # a new texture is made whenever it's scaled or rotated (which marks it dirty too)
     
     def set_scale(self, scale: float):
         self.scale = scale
@@ -104,6 +218,7 @@ class UiTexture(UiElement):
     def _update_texture(self):
         self.texture = pygame.transform.scale_by(self.original_texture, self.scale)
         self.texture = pygame.transform.rotate(self.texture, self.rotation)
+        self.dirty = True
 
 class UiCameraFeed(UiElement):
     def __init__(self, pos: pygame.Vector2, no_conn_img: pygame.Surface, net: Networker, rov: RovInterface):
@@ -112,25 +227,40 @@ class UiCameraFeed(UiElement):
         self.rov = rov
 
         self._no_connection_frame = no_conn_img
-        self.set_no_camera()
+        self.decoder = FrameDecoder(self._no_connection_frame) # decoding happens off the network thread
+        self.recorder: VideoRecorder | None = None # if set, every frame received is recorded as well
         self.net.register_listener(packets.CAMERA, self._recv_camera_frame)
+        self.net.register_listener(packets.CAMERA_TILE, self._recv_camera_tile)
 
     def draw(self, surface: pygame.Surface):
         super().draw(surface)
         if self.net.is_open() and self.rov.camera_enabled:
-            surface.blit(self._last_frame, self.resolve_position())
+            surface.blit(self.decoder.latest(), self.resolve_position())
         else:
             surface.blit(self._no_connection_frame, self.resolve_position())
 
+    def bounds(self) -> pygame.Rect | None:
+        return pygame.Rect(self.resolve_position(), self._no_connection_frame.size) # decoded frames are always scaled to this size
+
+    def state(self) -> typing.Hashable:
+        if self.net.is_open() and self.rov.camera_enabled:
+            self.decoder.latest() # swaps in the newest frame, if there is one
+            return ('camera', self.decoder.shown)
+        return ('no camera',)
+
     def set_no_camera(self):
-        self._last_frame = self._no_connection_frame.copy()
+        self.decoder.reset(self._no_connection_frame)
 
     def _recv_camera_frame(self, addr: _Addr, data: ...):
-        pygame.transform.scale(
-            pygame.image.load(io.BytesIO(data), 'jpg').convert(),
-            self._last_frame.size,
-            self._last_frame
-        )
+        # runs on the network thread, so just hand it over
+        self.decoder.submit(data)
+        if self.recorder:
+            self.recorder.submit(data)
+
+    def _recv_camera_tile(self, addr: _Addr, data: ...):
+        self.decoder.submit_tile(data)
+        if self.recorder:
+            self.recorder.submit_tile(data)
 
 class UiControlMonitor(UiElement):
 
@@ -142,23 +272,68 @@ class UiControlMonitor(UiElement):
     def draw(self, surface: pygame.Surface):
         super().draw(surface)
 
-        Renderer.draw_text(surface, 
-                           "lf:".ljust(3) + f"{round(self.rov.motors['left_front']  , 2)}".rjust(5) + "   " +
-                           "rf:".ljust(3) + f"{round(self.rov.motors['right_front'] , 2)}".rjust(5) + "\n" + 
-                           "lt:".ljust(3) + f"{round(self.rov.motors['left_top']    , 2)}".rjust(5) + "   " +
-                           "rt:".ljust(3) + f"{round(self.rov.motors['right_top']   , 2)}".rjust(5) + "\n" + 
-                           "lb:".ljust(3) + f"{round(self.rov.motors['left_back']   , 2)}".rjust(5) + "   " +
-                           "rb:".ljust(3) + f"{round(self.rov.motors['right_back']  , 2)}".rjust(5) + "\n" +
-                           "\n\n\n" +
-                           f"camera angle: {round(self.rov.motors['camera_angle'], 2)}\n" +
-                           f"ver grip: {round(self.rov.motors['tool_ver'], 2)}\n" +
-                           f"hor grip: {round(self.rov.motors['tool_hor'], 2)}\n", 
-                           (self.resolve_position(), pygame.Vector2(0, 0)),
-                           color='black'
-            )
-        
+        Renderer.draw_text(surface, self._text(), (self.resolve_position(), pygame.Vector2(0, 0)), color='black')
+
+    def bounds(self) -> pygame.Rect | None:
+        return Renderer.text_bounds(self._text(), (self.resolve_position(), pygame.Vector2(0, 0)), color='black')
+
+    def state(self) -> typing.Hashable:
+        return self._text()
+
+    def _text(self) -> str:
+        return ("lf:".ljust(3) + f"{round(self.rov.motors['left_front']  , 2)}".rjust(5) + "   " +
+                "rf:".ljust(3) + f"{round(self.rov.motors['right_front'] , 2)}".rjust(5) + "\n" + 
+                "lt:".ljust(3) + f"{round(self.rov.motors['left_top']    , 2)}".rjust(5) + "   " +
+                "rt:".ljust(3) + f"{round(self.rov.motors['right_top']   , 2)}".rjust(5) + "\n" + 
+                "lb:".ljust(3) + f"{round(self.rov.motors['left_back']   , 2)}".rjust(5) + "   " +
+                "rb:".ljust(3) + f"{round(self.rov.motors['right_back']  , 2)}".rjust(5) + "\n" +
+                "\n\n\n" +
+                f"camera angle: {round(self.rov.motors['camera_angle'], 2)}\n" +
+                f"ver grip: {round(self.rov.motors['tool_ver'], 2)}\n" +
+                f"hor grip: {round(self.rov.motors['tool_hor'], 2)}\n" +
+                f"\nsending: {self.rov.control_sender.sends_per_second:.0f}/s\n")
+
+
+class UiTelemetryMonitor(UiElement):
+    """
+    Shows what the rov says it is actually doing (its telemetry), rather than what it was sent.
+    """
+
+    STALE_AFTER: float = 1.0 # seconds without telemetry before its shown as old
+
+    def __init__(self, pos: pygame.Vector2, rov: RovInterface):
+        super().__init__(pos)
+
+        self.rov = rov
+
+    def draw(self, surface: pygame.Surface):
+        super().draw(surface)
+
+        Renderer.draw_text(surface, self._text(), (self.resolve_position(), pygame.Vector2(0, 0)), color='black')
 
+    def bounds(self) -> pygame.Rect | None:
+        return Renderer.text_bounds(self._text(), (self.resolve_position(), pygame.Vector2(0, 0)), color='black')
 
+    def state(self) -> typing.Hashable:
+        return self._text()
+
+    def _text(self) -> str:
+        t = self.rov.telemetry
+        if t is None:
+            return "rov says: nothing yet"
+
+        def us(motor: types._MotorKey) -> str:
+            return f"{rovmath.inv_calc_motor_dutycycle(t.duty_cycles[motor])}".rjust(4)
+
+        stale = " (old)" if self.rov.elapsed() - self.rov.telemetry_time > UiTelemetryMonitor.STALE_AFTER else ""
+        return (f"rov says{stale}:\n" +
+                f"lf: {us('left_front')}  rf: {us('right_front')}\n" +
+                f"lt: {us('left_top')}  rt: {us('right_top')}\n" +
+                f"lb: {us('left_back')}  rb: {us('right_back')}\n" +
+                f"gyro: {t.gyro[0]:.1f} {t.gyro[1]:.1f} {t.gyro[2]:.1f}\n" +
+                f"pid: {t.pid:.2f}\n" +
+                f"loop: {t.loop_busy * 100:.0f}%, {t.loop_jitter * 1000:.1f}ms late\n" +
+                f"i2c: {t.i2c_writes_per_second:.0f}/s  cam: {t.camera_fps:.0f}fps")
 
 
 class UiPidStatus(UiElement):
@@ -172,6 +347,13 @@ class UiPidStatus(UiElement):
         string = "IMU-PID Stabiliser: "
         Renderer.draw_boolean_circle(surface, self.resolve_position(), self.rov.correction_enabled, string + "Enabled", string + "Disabled")
 
+    def bounds(self) -> pygame.Rect | None:
+        string = "IMU-PID Stabiliser: "
+        return Renderer.boolean_circle_bounds(self.resolve_position(), self.rov.correction_enabled, string + "Enabled", string + "Disabled")
+
+    def state(self) -> typing.Hashable:
+        return self.rov.correction_enabled
+
 class UiCameraEnabledStatus(UiElement):
     def __init__(self, pos: pygame.Vector2, rov: RovInterface):
         super().__init__(pos)
@@ -180,8 +362,18 @@ class UiCameraEnabledStatus(UiElement):
     def draw(self, surface: pygame.Surface):
         super().draw(surface)
 
+        Renderer.draw_boolean_circle(surface, self.resolve_position(), self.rov.camera_enabled, *self._labels())
+
+    def bounds(self) -> pygame.Rect | None:
+        return Renderer.boolean_circle_bounds(self.resolve_position(), self.rov.camera_enabled, *self._labels())
+
+    def state(self) -> typing.Hashable:
+        return (self.rov.camera_enabled, self._labels())
+
+    def _labels(self) -> tuple[str, str]:
         string = "Camera: "
-        Renderer.draw_boolean_circle(surface, self.resolve_position(), self.rov.camera_enabled, string + "Enabled", string + "Disabled")
+        stats = f" ({self.rov.camera_fps:.0f} fps, {self.rov.camera_encode_ms:.0f} ms, {self.rov.camera_bytes_per_second / 1024:.0f} KiB/s, q{self.rov.camera_quality} x{self.rov.camera_scale:.2f})"
+        return string + "Enabled" + stats, string + "Disabled"
 
 class UiTextLog(UiElement):
     def __init__(self, pos: pygame.Vector2, dimensions: pygame.Vector2, lines: int):
@@ -209,6 +401,17 @@ class UiTextLog(UiElement):
                  pygame.Vector2(self.dimensions.x - 15, 30))
                  )
 
+    def bounds(self) -> pygame.Rect | None:
+        box = pygame.Rect(self.resolve_position(), self.dimensions)
+        return box.union(Renderer.text_bounds(
+                "\n".join(self.recent_lines), 
+                (self.resolve_position() + pygame.Vector2(15, 15), 
+                 pygame.Vector2(self.dimensions.x - 15, 30))
+                 ))
+
+    def state(self) -> typing.Hashable:
+        return tuple(self.recent_lines)
+
 
     def _log(self, e: pygame.Event):
         line: str = f"[{e.dict['idx']}] {e.dict['s']}"
@@ -220,11 +423,21 @@ class UiTextLog(UiElement):
 class UiLineGraph(UiElement):
     """
     Draws a line graph. Origin is top left.
+
+    The points are kept in a NumPy array, put on screen all at once and drawn as one polyline, so long recordings don't slow the frame down.
+    A list that only grows (like a recording coming in) only has its new points copied each frame, and the bounds are kept as a running min/max.
+    A ring buffer is read in place, and only looked at again when something has been appended to it.
+
+    With `decimate` on, only the lowest and highest point in each pixel along the x axis are drawn (kept in order), which looks the same
+    but means drawing costs the same however long the recording is. It's worked out again only when the points or the x range change.
     """
 
     type _Axis = typing.Literal['x', 'y']
+    type _Points = list[tuple[float, float]] | np.ndarray | RingBuffer # (x, y) pairs, or an array (or ring buffer) of them with shape (n, 2)
 
-    def __init__(self, pos: pygame.Vector2, data_fetcher: typing.Callable[[], list[tuple[float, float]]]):
+    INITIAL_CAPACITY: int = 1024 # points the array starts with room for. it doubles when it runs out
+
+    def __init__(self, pos: pygame.Vector2, data_fetcher: typing.Callable[[], _Points]):
         super().__init__(pos)
 
         self.x_label = "Time (s)"
@@ -252,13 +465,22 @@ class UiLineGraph(UiElement):
         self.drawn_points = -1
         self.bounds_from_all_x = False
         self.bounds_from_all_y = True
+        self.decimate = True
 
         self.auto_calculate_bounds = True
         self.data_fetcher = data_fetcher
-        self.points: list[tuple[float, float]] = []
+        self.points: np.ndarray = np.empty((0, 2)) # every point, as rows of (x, y)
 
+        self._data = np.empty((UiLineGraph.INITIAL_CAPACITY, 2)) # copies of points from lists. self.points is the used part of it
+        self._source: UiLineGraph._Points | None = None # what data_fetcher returned last time
+        self._appended = 0 # if thats a ring buffer, how many samples had been appended to it
+        self._low = np.full(2, np.inf) # running min and max of every point, (x, y)
+        self._high = np.full(2, -np.inf)
+        self._version = 0 # goes up whenever the points change
 
-        self._points_to_draw: list[tuple[float, float]] = []
+        self._points_to_draw: np.ndarray = self.points
+        self._decimated: np.ndarray = self.points # _points_to_draw, with only the lowest and highest in each pixel column
+        self._decimated_key: typing.Hashable = None # what _decimated was worked out for
 
     def draw(self, surface: pygame.Surface):
         super().draw(surface)
@@ -306,72 +528,150 @@ class UiLineGraph(UiElement):
                 ), 1)), (pos, pygame.Vector2()), 'bottom_to_top', color=self.axis_color)
 
 
+        if len(self._points_to_draw) <= 0:
+            return
+
+        # every point on screen at once, with any that land on the same pixel as the one before dropped (they wouldnt show anyway)
+        screen = self._to_screen(self._level_of_detail(), origin)
+        if len(screen) > 1:
+            screen = screen[np.concatenate(([True], np.any(screen[1:] != screen[:-1], axis=1)))]
+        screen_points = screen.tolist()
+
         # draw points
-        if self.draw_points and len(self._points_to_draw) > 0:
-            for (x, y) in self._points_to_draw:
-                pygame.draw.circle(
-                    surface, 
-                    self.point_color, 
-                    (
-                        origin.x + (self.axis_line_length * self._map_value('x', x)), 
-                        origin.y + (self.axis_line_length * self._map_value('y', y))
-                    ),
-                    self.point_size
-                    )
+        if self.draw_points:
+            for point in screen_points:
+                pygame.draw.circle(surface, self.point_color, point, self.point_size)
         
         # draw lines between points
-        if self.draw_lines and len(self._points_to_draw) > 1:
-            last_point = self._points_to_draw[0]
-            for i, (x, y) in enumerate(self._points_to_draw):
-                if i == 0:
-                    continue
-
-                pygame.draw.line(surface, self.line_color, (
-                    origin.x + (self.axis_line_length * self._map_value('x', last_point[0])), 
-                    origin.y + (self.axis_line_length * self._map_value('y', last_point[1]))
-                ), (
-                    origin.x + (self.axis_line_length * self._map_value('x', x)), 
-                    origin.y + (self.axis_line_length * self._map_value('y', y))
-                ), self.line_width)
-                last_point = (x, y)
+        if self.draw_lines and len(screen_points) > 1:
+            pygame.draw.lines(surface, self.line_color, False, screen_points, self.line_width)
 
     def update(self, dt: float, surface: pygame.Surface):
         super().update(dt, surface)
 
-        self.points = self.data_fetcher()
+        self._consume(self.data_fetcher())
 
-        self._points_to_draw = self.points if self.drawn_points <= 0 or len(self.points) < self.drawn_points else self.points[len(self.points)-self.drawn_points:]
+        count = len(self.points)
+        self._points_to_draw = self.points if self.drawn_points <= 0 or count < self.drawn_points else self.points[count-self.drawn_points:]
 
-        if self.auto_calculate_bounds and len(self.points) > 0:
-            x_group = (self.points if self.bounds_from_all_x else self._points_to_draw)
-            y_group = (self.points if self.bounds_from_all_y else self._points_to_draw)
+        if self.auto_calculate_bounds and count > 0:
+            self.x_range_low, self.x_range_high = self._range(0, self.bounds_from_all_x)
+            self.y_range_low, self.y_range_high = self._range(1, self.bounds_from_all_y)
 
-            self.x_range_low = x_group[0][0]
-            self.x_range_high = x_group[0][0]
-            self.y_range_low = y_group[0][1]
-            self.y_range_high = y_group[0][1]
+    def bounds(self) -> pygame.Rect | None:
+        # the labels and numbers sit up to 60px above and left of the axes, and the arrow heads, points and lines poke a little past them
+        origin = self.resolve_position()
+        margin = max(20, self.point_size, self.line_width, self.axis_line_width)
+        return pygame.Rect(origin - pygame.Vector2(90, 90), (self.axis_line_length + 90 + margin, self.axis_line_length + 90 + margin))
 
-            for (x, y) in x_group:
-                if x < self.x_range_low: self.x_range_low = x
-                if x > self.x_range_high: self.x_range_high = x
-            
-            for (x, y) in y_group:
-                if y < self.y_range_low: self.y_range_low = y
-                if y > self.y_range_high: self.y_range_high = y
-    
-    def _map_value(self, axis: _Axis, v: float) -> float:
-        if axis == 'x':
-            return rovmath.map(
-                self.x_range_low, self.x_range_high,
-                v,
-                0.0, 1.0
-            )
+    def state(self) -> typing.Hashable:
+        return (self._version, len(self._points_to_draw), self.x_range_low, self.x_range_high, self.y_range_low, self.y_range_high)
+
+    def _consume(self, data: _Points):
+        """
+        takes in whatever data_fetcher returned.
+        """
+        if isinstance(data, RingBuffer):
+            if self._source is data and self._appended == data.appended:
+                return
+            # old points fall off the end, so the bounds are found again from what's left
+            self._source = data
+            self._appended = data.appended
+            self.points = data.view()
+            self._low = self.points.min(axis=0) if len(self.points) > 0 else np.full(2, np.inf)
+            self._high = self.points.max(axis=0) if len(self.points) > 0 else np.full(2, -np.inf)
+            self._version += 1
+            return
+
+        if isinstance(data, np.ndarray):
+            # arrays are used as they are. theres no telling if they changed, so they count as new every time
+            self._source = data
+            self.points = data.reshape(-1, 2)
+            if len(self.points) > 0:
+                self._low = self.points.min(axis=0)
+                self._high = self.points.max(axis=0)
+            self._version += 1
+            return
+
+        count = len(self.points) if self._source is data else 0
+        if self._source is not data or len(data) < count: # a different list (or a shorter one), so start again
+            count = 0
+            self._low = np.full(2, np.inf)
+            self._high = np.full(2, -np.inf)
+            self.points = self._data[:0]
+            self._version += 1
+        self._source = data
+
+        if len(data) <= count:
+            return
+
+        new = np.asarray(data[count:], dtype=np.float64).reshape(-1, 2)
+        if count + len(new) > len(self._data):
+            grown = np.empty((max(len(self._data) * 2, count + len(new)), 2))
+            grown[:count] = self._data[:count]
+            self._data = grown
+        self._data[count:count + len(new)] = new
+        self.points = self._data[:count + len(new)]
+
+        self._low = np.minimum(self._low, new.min(axis=0))
+        self._high = np.maximum(self._high, new.max(axis=0))
+        self._version += 1
+
+    def _range(self, axis: int, from_all: bool) -> tuple[float, float]:
+        if from_all or len(self._points_to_draw) == len(self.points):
+            return float(self._low[axis]), float(self._high[axis])
+        column = self._points_to_draw[:, axis]
+        return float(column.min()), float(column.max())
+
+    def _level_of_detail(self) -> np.ndarray:
+        """
+        the points to draw, decimated if its on. kept until the points or the x axis change.
+        """
+        key = (self._version, len(self._points_to_draw), self.x_range_low, self.x_range_high, self.axis_line_length, self.decimate)
+        if key != self._decimated_key:
+            self._decimated_key = key
+            self._decimated = self._decimate(self._points_to_draw) if self.decimate else self._points_to_draw
+        return self._decimated
+
+    def _decimate(self, points: np.ndarray) -> np.ndarray:
+        """
+        the lowest and highest point in each pixel column, plus the first and last point, in their original order.
+        if the points arent in order along x, the columns are equal runs of points instead.
+        """
+        count = len(points)
+        columns = max(1, int(self.axis_line_length))
+        if count <= columns * 2:
+            return points
+
+        x, y = points[:, 0], points[:, 1]
+        if np.all(x[1:] >= x[:-1]):
+            span = self.x_range_high - self.x_range_low
+            column = np.rint(np.clip((x - self.x_range_low) / (span if span != 0 else np.inf), 0.0, 1.0) * columns) # the same rounding as _to_screen
         else:
-            return rovmath.map(
-                self.y_range_low, self.y_range_high,
-                v,
-                0.0, 1.0
-            )
+            column = np.arange(count) * columns // count
+
+        starts = np.concatenate(([0], np.flatnonzero(column[1:] != column[:-1]) + 1))
+        bucket = np.repeat(np.arange(len(starts)), np.diff(np.append(starts, count)))
+        lowest = np.flatnonzero(y == np.minimum.reduceat(y, starts)[bucket])
+        highest = np.flatnonzero(y == np.maximum.reduceat(y, starts)[bucket])
+        # first of each in its column (theres more than one if they tie)
+        lowest = lowest[np.concatenate(([True], bucket[lowest[1:]] != bucket[lowest[:-1]]))]
+        highest = highest[np.concatenate(([True], bucket[highest[1:]] != bucket[highest[:-1]]))]
+
+        return points[np.unique(np.concatenate(([0, count - 1], lowest, highest)))]
+
+    def _to_screen(self, points: np.ndarray, origin: pygame.Vector2) -> np.ndarray:
+        """
+        points -> whole pixel positions, the same way rovmath.map would (clamped to the axes, and at the start of an axis with no range).
+        """
+        low = np.array((self.x_range_low, self.y_range_low), dtype=np.float64)
+        span = np.array((self.x_range_high, self.y_range_high), dtype=np.float64) - low
+        span[span == 0] = np.inf # no range, so everything goes at the start of the axis
+
+        mapped = np.clip((points - low) / span, 0.0, 1.0)
+        mapped *= self.axis_line_length
+        mapped += (origin.x, origin.y)
+        return np.rint(mapped).astype(np.int32)
 
 class UiCountdownClock(UiElement):
     def __init__(self, pos: pygame.Vector2, seconds: float):
@@ -398,10 +698,19 @@ class UiCountdownClock(UiElement):
     
     def draw(self, surface: pygame.Surface):
         super().draw(surface)
+        Renderer.draw_text(surface, self._text(), (self.resolve_position(), pygame.Vector2()))
+
+    def bounds(self) -> pygame.Rect | None:
+        return Renderer.text_bounds(self._text(), (self.resolve_position(), pygame.Vector2()))
+
+    def state(self) -> typing.Hashable:
+        return self._text()
+
+    def _text(self) -> str:
         td = str(datetime.timedelta(seconds=self.time))[2:]
         if len(td) > 8:
             td = td[:8]
-        Renderer.draw_text(surface, td, (self.resolve_position(), pygame.Vector2()))
+        return td
 
 class UiText(UiElement):
     def __init__(self, pos: pygame.Vector2, text_provider: typing.Callable[[], str], *args, width: float = 0, height: float = 0, **kwargs):
@@ -416,4 +725,11 @@ class UiText(UiElement):
         super().draw(surface)
         pos = self.resolve_position()
         Renderer.draw_text(surface, self.text_provider(), *self.args, **self.kwargs, rect=(pos.x, pos.y, self.width, self.height))
+
+    def bounds(self) -> pygame.Rect | None:
+        pos = self.resolve_position()
+        return Renderer.text_bounds(self.text_provider(), *self.args, **self.kwargs, rect=(pos.x, pos.y, self.width, self.height))
+
+    def state(self) -> typing.Hashable:
+        return self.text_provider()
     
\ No newline at end of file
@@ -1,9 +1,12 @@
 import pygame
+import os
+import time
 
 from src.poolside.ui import UiContainer
 from src.poolside.ui import UiTexture
 from src.poolside.ui import UiCameraFeed
 from src.poolside.ui import UiControlMonitor
+from src.poolside.ui import UiTelemetryMonitor
 from src.poolside.ui import UiPidStatus
 from src.poolside.ui import UiCameraEnabledStatus
 from src.poolside.ui import UiTextLog
@@ -11,12 +14,18 @@ from src.poolside.ui import UiLineGraph
 from src.poolside.ui import UiCountdownClock
 from src.poolside.ui import UiText
 from src.poolside.render import Renderer
+from src.poolside.present import Presenter
 from src.poolside.logger import Logger
 from src.poolside.irov import RovInterface
 from src.poolside.float.ifloat import FloatInterface
 from src.poolside.control.manager import ControllerManager
 from src.poolside.callback import Callback
+from src.poolside.recorder import VideoRecorder
 from src.common.net.worker import Networker
+from src.common.net import dispatch
+from src.common.net import channel
+from src.common.net.capture import Capture, CaptureReader
+from src.common.net.replay import Replay
 from src.common.net.worker import _Addr
 from src.common.net import packets
 from src.common import consts
@@ -27,7 +36,7 @@ class Window():
     Pygame Window Manager Class.
     """
 
-    def __init__(self, target_ip: str, target_port: int, port: int):
+    def __init__(self, target_ip: str, target_port: int, port: int, replay: str | None = None, replay_speed: float = 1.0):
 
         ## WINDOW OBJECTS ##
 
@@ -41,7 +50,10 @@ class Window():
         )
 
         self.wnd_surface = self.window.get_surface() # get the surface of the window to draw onto. this initialises everything, too
-        self.draw_surface = pygame.Surface((consts.WINDOW_WIDTH, consts.WINDOW_HEIGHT))
+        self.draw_surface = pygame.Surface((consts.WINDOW_WIDTH, consts.WINDOW_HEIGHT), 0, self.wnd_surface) # same pixel format as the window, so its quick to scale across
+
+        # scales the draw surface onto the window surface
+        self.presenter = Presenter(self.window, self.draw_surface, consts.PRESENT_MODE, consts.PRESENT_SKIP_SAME_SIZE) # type: ignore # PRESENT_MODE is one of the modes
 
         ## ICON ##
         astrid_texture = pygame.image.load('docs/astrid_pixelart.png').convert_alpha()
@@ -63,8 +75,18 @@ class Window():
         self.controller_manager.load_mappings('src/resource/keymap.json')
 
         ## ROV ##
-        self.net = Networker(target_ip, target_port, port, consts.PACKET_SIZE)
+        self.net = Networker(target_ip, target_port, port, consts.PACKET_SIZE, consts.PACKET_FRAGMENT_SIZE, consts.PACKET_REASSEMBLY_TIMEOUT, consts.PACKET_REASSEMBLY_MAX_BYTES)
+        # controls and camera frames each get a socket of their own, like on the rov
+        self.net.add_channel("control", consts.CONTROL_CHANNEL_PORT_OFFSET, packets.CONTROL_CHANNEL, dispatch.PRIORITY_URGENT, consts.CONTROL_CHANNEL_BUFFER, consts.CONTROL_CHANNEL_BUFFER, channel.DSCP_EXPEDITED)
+        self.net.add_channel("camera", consts.CAMERA_CHANNEL_PORT_OFFSET, packets.CAMERA_CHANNEL, dispatch.PRIORITY_BULK, consts.CAMERA_CHANNEL_BUFFER, consts.CAMERA_CHANNEL_BUFFER, channel.DSCP_VIDEO)
+        if consts.CAPTURE_TRAFFIC and replay is None: # record the whole run
+            capture_path = os.path.join(consts.CAPTURE_DIRECTORY, time.strftime("poolside-%Y%m%d-%H%M%S.cap"))
+            self.net.capture = Capture(capture_path, consts.CAPTURE_PREALLOCATE, consts.CAPTURE_MAX_BYTES)
         self.net.start()
+        self.net.enable_ping(packets.PING, packets.PONG)
+        # decoding camera frames is slow, so it happens on a thread of its own (full frames and tiles together, since tiles go on top of frames)
+        self.net.set_policy(packets.CAMERA, 'worker', dispatch.PRIORITY_BULK, queue="camera")
+        self.net.set_policy(packets.CAMERA_TILE, 'worker', dispatch.PRIORITY_BULK, queue="camera")
         self.net.register_listener(packets.MSG_ROV2POOLSIDE, lambda addr, msg_bytes: Logger.log(bytes(msg_bytes).decode()))
         self.net.register_listener(packets.REQ_SYNC_CAMERA, lambda addr, msg_bytes: self.net.send(packets.SYNC_CAMERA, self.rov.camera_enabled))
         self.rov = RovInterface(self.net, self.controller_manager)
@@ -78,27 +100,46 @@ class Window():
             self.rov
         )
         self.net.send(packets.SYNC_CAMERA, self.rov.camera_enabled)
+        if consts.VIDEO_RECORDING and replay is None: # save the camera feed, to watch back after
+            self.camera_feed.recorder = VideoRecorder(consts.VIDEO_DIRECTORY, consts.CAMERA_TARGET_FPS, consts.VIDEO_SEGMENT_SECONDS, consts.VIDEO_QUEUE_LENGTH)
 
         ## FLOAT ##
         self.float = FloatInterface()
         self.float_graph = UiLineGraph(pygame.Vector2(1400, 610), self.float.get_processed_data)
 
         ## UI CONTAINER ##
-        self.container = UiContainer()
+        # everything is drawn on a nice improvise blue. in retained mode, only the parts of the ui that changed are redrawn each frame
+        self.container = UiContainer(background=consts.GLAUCOUS, retained=consts.UI_RETAINED_MODE)
 
         self.container.add(UiText(
             pygame.Vector2(20, 15),
-            lambda: f"{self.net.target_ip}:{self.net.target_port}, listening on port {self.net.port}",
+            lambda: f"{self.net.target_ip}:{self.net.target_port}, listening on port {self.net.port}" + (
+                f", replaying {self.replay.reader.path} ({f'{self.replay.speed}x' if self.replay.speed else 'flat out'}): {self.replay.position:.1f}s (<PGUP>/<PGDN> to seek)" if self.replay else ""),
         ))
 
         self.container.add(self.camera_feed)
 
+        # worked out on a timer (see update), since the text is asked for several times a frame and has to be the same each time
+        self.link_text = ""
+        self.link_text_timer = consts.LINK_STATS_UI_INTERVAL
+        self.container.add(UiText(
+            pygame.Vector2(20, 1012),
+            lambda: self.link_text,
+        ))
+
         self.container.add(UiTextLog(
             pygame.Vector2(1320, 50),
             pygame.Vector2(350, 450),
             10
         ))
 
+        if self.camera_feed.recorder:
+            recorder = self.camera_feed.recorder
+            self.container.add(UiText(
+                pygame.Vector2(1320, 515),
+                lambda: recorder.summary(),
+            ))
+
         self.container.add(UiPidStatus(
             pygame.Vector2(800, 20),
             self.rov
@@ -114,6 +155,11 @@ class Window():
             self.rov
         ))
 
+        self.container.add(UiTelemetryMonitor(
+            pygame.Vector2(1700, 350),
+            self.rov
+        ))
+
         self.container.add(UiText(
             pygame.Vector2(consts.WINDOW_WIDTH - 40, consts.WINDOW_HEIGHT - 130),
             lambda: f"Morag\n\n{consts.FLOAT_IP}:{consts.FLOAT_PORT}\nProfile: {self.float.profile}\nTemperature: {self.float.temperature:.1f} deg C",
@@ -146,6 +192,13 @@ class Window():
             justify = 'right',
         ))
 
+        ## REPLAY ##
+        # plays what the poolside received in a capture back into the listeners, instead of (well, as well as) the rov
+        self.replay: Replay | None = None
+        if replay is not None:
+            self.replay = Replay(CaptureReader(replay), self.net, speed=replay_speed)
+            self.replay.start()
+
         ####################
 
 
@@ -189,13 +242,15 @@ class Window():
             self.event()
 
             # DRAW - draw everything to the window; anything graphical goes under here
-            self.draw()
+            changed = self.draw()
 
             # TICK - calculate delta time
             dt = self.clock.tick(self.target_fps) / 1000
 
             # FLIP - flip the framebuffers (rendering works in two buffers; the one on the screen (frontbuffer) and the one you are drawing to (backbuffer). this prevents graphical glitches)
-            self.window.flip()
+            # if nothing changed, whats on the screen is still right
+            if changed:
+                self.window.flip()
 
         self.shutdown()
 
@@ -207,6 +262,12 @@ class Window():
         # update rov
         self.rov.update(dt)
 
+        # link stats
+        self.link_text_timer += dt
+        if self.link_text_timer >= consts.LINK_STATS_UI_INTERVAL:
+            self.link_text_timer = 0.0
+            self.link_text = f"link: {self.net.stats.summary()}, " + ", ".join(f"{ch.name} loss {self.net.channel_loss(ch) * 100:.1f}%" for ch in self.net.channels)
+
         # update everything in ui container
         self.container.update(dt, self.draw_surface)
 
@@ -241,6 +302,15 @@ class Window():
                 self.net.send(packets.KILL)
                 self.camera_feed.set_no_camera()
 
+        # replay seek
+        if self.replay:
+            if just_pressed[pygame.K_PAGEUP]:
+                self.replay.seek(self.replay.position + consts.REPLAY_SEEK_STEP)
+                self.camera_feed.set_no_camera() # the frame ids jump, so the decoder starts again from the next keyframe
+            if just_pressed[pygame.K_PAGEDOWN]:
+                self.replay.seek(max(0.0, self.replay.position - consts.REPLAY_SEEK_STEP))
+                self.camera_feed.set_no_camera()
+
         # float go
         if just_pressed[pygame.K_RSHIFT]:
             if self.float:
@@ -261,29 +331,42 @@ class Window():
             if e.type == pygame.QUIT:
                 self.keep_window_open = False
 
+            # the window was resized or uncovered, so whats on it cant be trusted any more
+            if e.type in (pygame.WINDOWSIZECHANGED, pygame.WINDOWEXPOSED):
+                self.container.invalidate()
+            if e.type == pygame.WINDOWSIZECHANGED:
+                self.presenter.resize()
+
             # call callbacks
             if e.type in Callback.CALLBACKS:
                 for function in Callback.CALLBACKS[e.type]:
                     function(e)
 
-    def draw(self):
-        # clear the surface with black (0x0 is a shortcut for 0x000000, which is like the hexcode #000000 (or black). replace the hash in a hexcode with 0x, and you can use it for colorlike objects)
-        self.wnd_surface.fill(0x0) # fill window surface
-
-        # from here draw to the draw surface
-        self.draw_surface.fill(consts.GLAUCOUS) # fill with a nice improvise blue
-        
+    def draw(self) -> bool:
+        """
+        returns true if anything on the window changed.
+        """
         # add a safety orange bit BECAUSE I CAN HAHAHAHAH
         #pygame.draw.rect(self.draw_surface, consts.SAFETY_ORANGE, (pygame.Vector2(0, consts.WINDOW_HEIGHT * 1/2), pygame.Vector2(consts.WINDOW_WIDTH, consts.WINDOW_HEIGHT))) 
 
-        # draw ui container (and therefore everything within it)
-        self.container.draw(self.draw_surface)
-
+        # draw ui container (and therefore everything within it) to the draw surface. this fills it with its background first
+        changed = self.container.draw(self.draw_surface)
 
-        # draw draw surface to window surface
-        self.wnd_surface.blit(pygame.transform.scale(self.draw_surface, self.window.size))
+        # draw draw surface to window surface, but only the parts that changed
+        return self.presenter.present(changed)
 
 
     def shutdown(self):
+        if self.replay:
+            self.replay.stop()
+            print(f"replayed {self.replay.played} packets, {self.replay.late} late (at most {self.replay.lag_max * 1000:.1f}ms)")
+        self.rov.control_sender.stop()
         self.net.close()
+        self.camera_feed.decoder.stop()
+        if self.camera_feed.recorder:
+            self.camera_feed.recorder.stop()
+            print(self.camera_feed.recorder.summary())
+        if self.net.capture:
+            self.net.capture.close()
+            print(f"recorded {self.net.capture.records} packets ({self.net.capture.bytes / 1024 / 1024:.1f} MiB) to {self.net.capture.path}, {self.net.capture.dropped} dropped")
 
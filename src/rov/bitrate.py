@@ -0,0 +1,87 @@
+from src.common import rovmath
+
+
+class BitrateController():
+    """
+    Picks the JPEG quality and downscale for each camera frame, aiming for a target bandwidth at a target frame rate.
+
+    It watches the size of the frames it sends, and what the poolside says is actually arriving. When frames are too big, quality drops
+    first and resolution only once quality is at its lowest. When there's room again, quality climbs back to its highest before resolution does.
+    """
+
+    SMOOTHING: float = 0.2 # how quickly the average frame size follows new frames (0..1)
+    HIGH_WATER: float = 1.1 # frames this much bigger than the target step down
+    LOW_WATER: float = 0.7 # frames this much smaller than the target step up
+    COOLDOWN_FRAMES: int = 5 # frames to wait after a change, so the average catches up before changing again
+    LOSS_THRESHOLD: float = 0.05 # fraction of frames lost before the link is considered full
+    LINK_RECOVERY: float = 1.1 # how quickly the link estimate grows back after losses stop (per feedback)
+    MIN_LINK_FRACTION: float = 0.05 # the link estimate never drops below this fraction of the budget
+
+    def __init__(self, budget: int, target_fps: float, quality_min: int, quality_max: int, quality_step: int, scales: tuple[float, ...], quality: int) -> None:
+        self.budget = budget # most bytes per second to send
+        self.target_fps = target_fps
+        self.quality_min = quality_min
+        self.quality_max = quality_max
+        self.quality_step = quality_step
+        self.scales = scales # downscale factors, biggest first
+
+        self.quality = rovmath.clamp(quality_min, quality_max, quality)
+        self.scale_idx = 0
+
+        self.link_budget = float(budget) # bytes per second the link seems to manage
+        self.frame_size = 0.0 # smoothed bytes per frame
+        self._cooldown = 0
+
+    def get_scale(self) -> float:
+        return self.scales[self.scale_idx]
+
+    def target_frame_size(self) -> float:
+        return min(self.budget, self.link_budget) / self.target_fps
+
+    def frame_sent(self, size: float):
+        """
+        call with the size of every frame sent (or, for part of a frame, what the whole frame would have been).
+        """
+        if self.frame_size <= 0:
+            self.frame_size = size
+        else:
+            self.frame_size += (size - self.frame_size) * BitrateController.SMOOTHING
+
+        if self._cooldown > 0:
+            self._cooldown -= 1
+            return
+
+        target = self.target_frame_size()
+        if self.frame_size > target * BitrateController.HIGH_WATER:
+            self._step_down()
+        elif self.frame_size < target * BitrateController.LOW_WATER:
+            self._step_up()
+
+    def feedback(self, received_bytes_per_second: float, loss: float):
+        """
+        call with what the poolside reports. losses mean the link is full, so the estimate drops to what actually got through.
+        """
+        if loss > BitrateController.LOSS_THRESHOLD:
+            self.link_budget = max(self.budget * BitrateController.MIN_LINK_FRACTION, received_bytes_per_second * (1.0 - loss))
+        else:
+            self.link_budget = min(float(self.budget), self.link_budget * BitrateController.LINK_RECOVERY)
+
+    def _step_down(self):
+        if self.quality - self.quality_step >= self.quality_min:
+            self.quality -= self.quality_step
+        elif self.scale_idx < len(self.scales) - 1:
+            self.scale_idx += 1
+        else:
+            return
+        self._cooldown = BitrateController.COOLDOWN_FRAMES
+
+    def _step_up(self):
+        if self.quality + self.quality_step <= self.quality_max:
+            self.quality += self.quality_step
+        elif self.scale_idx > 0:
+            # back up to a bigger picture, starting halfway up the quality range so it doesnt jump straight over the target
+            self.scale_idx -= 1
+            self.quality = self.quality_min + (self.quality_max - self.quality_min) // 2
+        else:
+            return
+        self._cooldown = BitrateController.COOLDOWN_FRAMES
@@ -13,18 +13,29 @@ class CameraFeed():
         self.camera = cv2.VideoCapture(self.cam_id) # get the opencv camera feed
 
 
-    def capture(self, cam_quality: int = consts.CAMERA_COMPRESSION_VALUE) -> bytes:
+    def capture(self, cam_quality: int = consts.CAMERA_COMPRESSION_VALUE, scale: float = 1.0) -> bytes:
         """
         gets and encodes a frame from the camera. returns the bytes of the encoded JPEG
+
+        `scale` shrinks the frame from CAMERA_IMAGE_WIDTH x CAMERA_IMAGE_HEIGHT before encoding.
+        """
+        frame = self.read(scale)
+        if frame is None:
+            return b''
+        return self.encode(frame, cam_quality)
+
+    def read(self, scale: float = 1.0) -> np.ndarray | None:
+        """
+        gets a frame from the camera, resized and rotated, but not encoded.
         """
         # fetch frame
         success, frame = self.camera.read()
         if not success:
             print("failed frame read")
-            return b''
+            return None
         
         # resize to the size we want
-        frame = cv2.resize(frame, (consts.CAMERA_IMAGE_WIDTH, consts.CAMERA_IMAGE_HEIGHT))
+        frame = cv2.resize(frame, (int(consts.CAMERA_IMAGE_WIDTH * scale), int(consts.CAMERA_IMAGE_HEIGHT * scale)), interpolation=cv2.INTER_AREA if scale < 1.0 else cv2.INTER_LINEAR)
         
         # rotate if we need to
         match consts.CAMERA_ROTATE:
@@ -33,11 +44,23 @@ class CameraFeed():
             case 3: frame = cv2.rotate(frame, cv2.ROTATE_180)
             case _: frame = frame
 
-        # encode into jpg format
-        success, frame = cv2.imencode('.jpg', frame, [int(cv2.IMWRITE_JPEG_QUALITY), cam_quality])
+        return frame
+
+    @staticmethod
+    def encode(frame: np.ndarray, cam_quality: int = consts.CAMERA_COMPRESSION_VALUE) -> bytes:
+        """
+        encodes a frame (or part of one) into JPEG bytes
+        """
+        success, encoded = cv2.imencode('.jpg', frame, [int(cv2.IMWRITE_JPEG_QUALITY), cam_quality])
         if not success:
             print("failed frame encode")
             return b''
         
-        return frame.tobytes() # convert to bytes and return. idk why this line hates me and returns an error cos it defo exists
+        return encoded.tobytes() # convert to bytes and return. idk why this line hates me and returns an error cos it defo exists
+
+    def skip(self):
+        """
+        takes a frame from the camera and throws it away, without decoding it. keeps the camera's own buffer from going stale
+        """
+        self.camera.grab()
     
\ No newline at end of file
@@ -0,0 +1,154 @@
+import threading
+import time
+from src.common.net import packets
+from src.common.net.worker import Networker
+from src.rov.camera import CameraFeed
+from src.rov.bitrate import BitrateController
+from src.rov.delta import DeltaEncoder
+
+
+class CameraScheduler():
+    """
+    Paces the camera. Frames are captured at a target rate, kept under a bandwidth budget, and not captured at all while disabled.
+
+    Runs on its own thread. Every second, it reports how it's doing to the poolside.
+    """
+
+    REPORT_INTERVAL: float = 1.0 # seconds between stats reports
+    BURST_SECONDS: float = 0.25 # how much of the budget can be spent at once (for a big frame after some small ones)
+
+    def __init__(self, cam: CameraFeed, net: Networker, target_fps: float, budget: int, bitrate: BitrateController, delta: DeltaEncoder | None = None) -> None:
+        self.cam = cam
+        self.net = net
+        self.target_fps = target_fps # frames per second to aim for
+        self.budget = budget # most bytes per second to send
+        self.bitrate = bitrate # picks quality and resolution per frame
+        self.delta = delta # if given, frames are sent as tiles that changed rather than whole (see src/common/tiles.py)
+
+        self._enabled = threading.Event() # set while the camera should be sending
+        self._enabled.set()
+        self.running = True
+
+        # budget (token bucket). sending a frame can overdraw it, in which case frames are skipped until it's paid back
+        self._tokens = float(budget) * CameraScheduler.BURST_SECONDS
+        self._last_refill = time.monotonic()
+
+        # counters
+        self.frames_sent = 0
+        self.frames_late = 0 # capture slots missed because capturing and sending took too long
+        self.frames_over_budget = 0 # frames skipped to stay under the budget
+        self.frames_unchanged = 0 # delta mode frames where nothing changed, so nothing was sent
+
+        # measurements, over the last report interval
+        self.fps = 0.0
+        self.encode_time = 0.0 # mean seconds to capture and encode a frame
+        self.bytes_per_second = 0.0
+
+        self.thread = threading.Thread(name="Camera Thread", target=self._thread_activity)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def set_enabled(self, enabled: bool):
+        if enabled:
+            if self.delta and not self._enabled.is_set():
+                self.delta.force_keyframe() # whatever the poolside was showing is long gone
+            self._enabled.set()
+        else:
+            self._enabled.clear()
+
+    def is_enabled(self) -> bool:
+        return self._enabled.is_set()
+
+    def stop(self):
+        self.running = False
+        self._enabled.set() # wake it up so it can see it should stop
+
+    def _thread_activity(self):
+        period = 1.0 / self.target_fps
+        deadline = time.monotonic()
+
+        report_start = time.monotonic()
+        report_frames = 0
+        report_bytes = 0
+        report_encode = 0.0
+        report_encoded = 0
+
+        while self.running: # loops until the rov shuts down!
+            if not self._enabled.is_set() or not self.net.is_open():
+                self._enabled.wait(0.5) # sleeps until the poolside turns it back on (or checks if the network opened)
+                deadline = time.monotonic()
+                report_start = time.monotonic() # time spent off doesnt count towards the stats
+                report_frames = 0
+                report_bytes = 0
+                report_encode = 0.0
+                report_encoded = 0
+                continue
+
+            # wait for the next slot
+            now = time.monotonic()
+            if now < deadline:
+                time.sleep(deadline - now)
+                now = time.monotonic()
+            deadline += period
+
+            # capturing and sending took too long; skip the slots we missed instead of trying to catch up
+            if now > deadline:
+                missed = int((now - deadline) / period) + 1
+                self.frames_late += missed
+                deadline += missed * period
+
+            # report every interval, even when nothing went out (all over budget), so the poolside sees 0 fps rather than old numbers
+            elapsed = now - report_start
+            if elapsed >= CameraScheduler.REPORT_INTERVAL:
+                self.fps = report_frames / elapsed
+                self.encode_time = report_encode / report_encoded if report_encoded > 0 else 0.0
+                self.bytes_per_second = report_bytes / elapsed
+                self.net.send(packets.CAMERA_STATS, self.fps, self.encode_time * 1000, self.bytes_per_second, self.bitrate.quality, self.bitrate.get_scale())
+
+                report_start = now
+                report_frames = 0
+                report_bytes = 0
+                report_encode = 0.0
+                report_encoded = 0
+
+            # over budget, so let this slot go. the frame is still grabbed, so the camera doesnt fall behind
+            self._refill(now)
+            if self._tokens < 0:
+                self.frames_over_budget += 1
+                self.cam.skip()
+                continue
+
+            encode_start = time.perf_counter()
+            if self.delta:
+                frame = self.cam.read(self.bitrate.get_scale()) # get frame from camera, and only encode the bits that changed
+                if frame is None:
+                    continue
+                payloads = self.delta.encode(frame, self.bitrate.quality)
+            else:
+                jpeg = self.cam.capture(self.bitrate.quality, self.bitrate.get_scale()) # get frame from camera
+                if len(jpeg) <= 0:
+                    continue
+                payloads = [jpeg]
+            report_encode += time.perf_counter() - encode_start
+            report_encoded += 1
+
+            size = sum(len(payload) for payload in payloads)
+            if size <= 0: # in delta mode, nothing changing means nothing to send, which doesnt count towards the frame rate either
+                self.frames_unchanged += 1
+                continue
+
+            # a few tiles are only a bit of the picture. the controller wants what a whole frame costs at this quality, or a still scene
+            # looks cheap and quality climbs until the next keyframe blows the budget
+            self.bitrate.frame_sent(size / self.delta.coverage if self.delta else size)
+            self._tokens -= size
+            for payload in payloads:
+                # send the camera frame (or tile) down socket, in as many bits as it needs
+                self.net.send_fragmented(packets.CAMERA_TILE if self.delta else packets.CAMERA, payload)
+            self.frames_sent += 1
+            report_frames += 1
+            report_bytes += size
+
+    def _refill(self, now: float):
+        capacity = self.budget * CameraScheduler.BURST_SECONDS
+        self._tokens = min(capacity, self._tokens + (now - self._last_refill) * self.budget)
+        self._last_refill = now
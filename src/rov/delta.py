@@ -0,0 +1,83 @@
+import cv2
+import numpy as np
+
+from src.common import tiles
+from src.rov.camera import CameraFeed
+
+
+class DeltaEncoder():
+    """
+    Encodes camera frames as tiles, only sending the parts of the picture that changed since they were last sent.
+
+    Each tile is compared against what was last sent for it (mean absolute difference per pixel, 0..255).
+    A keyframe (the whole picture) goes out every `keyframe_interval` frames, when the picture changes size,
+    or when so much has changed that one big JPEG is cheaper than lots of little ones.
+    """
+
+    KEYFRAME_FRACTION: float = 0.6 # if at least this much of the grid changed, send a keyframe instead
+
+    def __init__(self, cols: int, rows: int, threshold: float, keyframe_interval: int) -> None:
+        self.cols = cols
+        self.rows = rows
+        self.threshold = threshold # how different a tile has to be to get sent
+        self.keyframe_interval = keyframe_interval # most frames between keyframes
+
+        self.frame_id = 0
+        self._reference: np.ndarray | None = None # what the poolside should be showing right now
+        self._since_keyframe = 0
+        self._bounds: list[tuple[int, int, int, int]] = []
+        self.coverage = 1.0 # fraction of the picture the last encode sent (all of it for a keyframe)
+
+        # counters
+        self.keyframes = 0
+        self.tiles_sent = 0
+        self.tiles_skipped = 0
+
+    def force_keyframe(self):
+        self._reference = None
+
+    def encode(self, frame: np.ndarray, quality: int) -> list[bytes]:
+        """
+        returns the tiles to send for this frame (header and jpeg each). an empty list means nothing changed.
+        """
+        self.frame_id = (self.frame_id + 1) & 0xFFFFFFFF
+        height, width = frame.shape[:2]
+
+        if self._reference is None or self._reference.shape != frame.shape or self._since_keyframe >= self.keyframe_interval:
+            return self._keyframe(frame, quality)
+
+        # how different is each tile from what was last sent for it?
+        diff = cv2.absdiff(frame, self._reference)
+        changed = [bound for bound in self._bounds if diff[bound[1]:bound[3], bound[0]:bound[2]].mean() > self.threshold]
+
+        if len(changed) >= len(self._bounds) * DeltaEncoder.KEYFRAME_FRACTION:
+            return self._keyframe(frame, quality)
+
+        self._since_keyframe += 1
+        self.tiles_skipped += len(self._bounds) - len(changed)
+
+        encoded = []
+        area = 0
+        for (x0, y0, x1, y1) in changed:
+            jpeg = CameraFeed.encode(frame[y0:y1, x0:x1], quality)
+            if len(jpeg) <= 0:
+                continue
+            self._reference[y0:y1, x0:x1] = frame[y0:y1, x0:x1]
+            encoded.append(tiles.TILE_HEADER.pack(self.frame_id, 0, x0, y0, width, height) + jpeg)
+            self.tiles_sent += 1
+            area += (x1 - x0) * (y1 - y0)
+        self.coverage = area / (width * height)
+        return encoded
+
+    def _keyframe(self, frame: np.ndarray, quality: int) -> list[bytes]:
+        jpeg = CameraFeed.encode(frame, quality)
+        if len(jpeg) <= 0:
+            return []
+
+        height, width = frame.shape[:2]
+        self._reference = frame.copy()
+        self._bounds = tiles.tile_bounds(width, height, self.cols, self.rows)
+        self._since_keyframe = 0
+        self.keyframes += 1
+        self.coverage = 1.0
+        return [tiles.TILE_HEADER.pack(self.frame_id, tiles.FLAG_KEYFRAME, 0, 0, width, height) + jpeg]
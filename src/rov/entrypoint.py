@@ -4,18 +4,25 @@ from src.rov.hardware import HardwareManager
 from src.rov.rov import Rov
 from src.common.net.worker import Networker, _Addr
 from src.common.net import packets
+from src.common.net import dispatch
+from src.common.net import channel
+from src.common.net import capture
+from src.common.net.replay import Replay
 from src.common import consts
 import os, signal, time
 
-def rov_main(target_ip: str, target_port: int, simulated_hardware: bool, port: int):
+def rov_main(target_ip: str, target_port: int, simulated_hardware: bool, port: int, replay: str | None = None, replay_speed: float = 1.0):
     """
-    Main Entrypoint for the ROV.
+    Main Entrypoint for the ROV. if `replay` is a (poolside) capture, what the poolside sent in it is played back as well.
     """
 
     if simulated_hardware: # flag that is used in many places that basically says not to actually do anything with the hardware
         print("(simulating hardware)")
 
-    net = Networker(target_ip, target_port, port, consts.PACKET_SIZE) # create networking socket
+    net = Networker(target_ip, target_port, port, consts.PACKET_SIZE, consts.PACKET_FRAGMENT_SIZE, consts.PACKET_REASSEMBLY_TIMEOUT, consts.PACKET_REASSEMBLY_MAX_BYTES) # create networking socket
+    # controls and camera frames each get a socket of their own, so a burst of frames cant crowd out the controls (the poolside does the same)
+    net.add_channel("control", consts.CONTROL_CHANNEL_PORT_OFFSET, packets.CONTROL_CHANNEL, dispatch.PRIORITY_URGENT, consts.CONTROL_CHANNEL_BUFFER, consts.CONTROL_CHANNEL_BUFFER, channel.DSCP_EXPEDITED)
+    net.add_channel("camera", consts.CAMERA_CHANNEL_PORT_OFFSET, packets.CAMERA_CHANNEL, dispatch.PRIORITY_BULK, consts.CAMERA_CHANNEL_BUFFER, consts.CAMERA_CHANNEL_BUFFER, channel.DSCP_VIDEO)
     net.start() # start the networker
     cam = CameraFeed(cam_id=consts.CAMERA_ID) # create camera handler
     hardware = HardwareManager(simulated_hardware)
@@ -23,26 +30,34 @@ def rov_main(target_ip: str, target_port: int, simulated_hardware: bool, port: i
 
     # register kill packet
     net.register_listener(packets.KILL, lambda addr, args: net.close())
+    net.enable_ping(packets.PING, packets.PONG) # so the poolside can time the link
+    # controls and kill are handled before anything else that came in with them
+    net.set_policy(packets.CONTROL, 'inline', dispatch.PRIORITY_URGENT)
+    net.set_policy(packets.KILL, 'inline', dispatch.PRIORITY_URGENT)
 
     rov = Rov(cam, net, hardware)
 
+    if replay is not None:
+        if simulated_hardware:
+            print(f"replaying controls from {replay} ({f'{replay_speed}x' if replay_speed else 'flat out'})")
+            Replay(capture.CaptureReader(replay), net, capture.OUT, replay_speed).start()
+        else:
+            print("not replaying: replays drive the motors, so only run with --simulated")
+
     try:
 
         rov.arm()
         
         print("ready")
-        net.build_packet(packets.REQ_SYNC_CAMERA)
 
-        dt = 0.0
-        last_frame_time = 0.0
+        # the loop runs at a fixed rate, so the motors arent rewritten thousands of times a second and the PID always sees the same dt
         while net.is_open(): # loops until the networker is stopped
-            last_frame_time = time.time()
+            dt = rov.loop.wait() # sleeps until the next tick is due
             rov.tick(dt) # runs every process that the ROV continually does
-            dt = time.time() - last_frame_time # how long did that take
     except Exception as e:
         print("oopsies!", e) # something went wrong, so we print the error. its not a great error catching system, but it works, i guess. multithreading is a nightmare
 
-    rov.camera_running = False # STOP RECORDING ME!!!11!
+    rov.camera.stop() # STOP RECORDING ME!!!11!
     rov.hardware.cleanup() # cleanup hardware stuff
     net.close() # close the networker
 
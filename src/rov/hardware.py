@@ -9,6 +9,7 @@ except:
     NO_SERVOKIT = True
 from src.rov import imu
 from src.rov import motor
+from src.rov import pwm
 from src.common import consts
 from src.common import types
 from src.common import rovmath
@@ -33,12 +34,15 @@ class HardwareManager():
             self.i2c_bus = busio.I2C(board.SCL, board.SDA) # type: ignore
             self.motor_interface: PCA9685 = PCA9685(self.i2c_bus) # type: ignore # warning normally because ServoKit might not exist
             
-            self.imu = imu.Imu(consts.IMU_I2C_ADDRESS)
+            self.imu: imu.Imu | None = imu.Imu(consts.IMU_I2C_ADDRESS)
             self.stabiliser = rovmath.PIDController(0.0)
 
             self.motor_interface.frequency = consts.PWM_FREQUENCY
+            self.pwm = pwm.PwmOutputCache(self.motor_interface.i2c_device) # only writes channels that changed
         else:
             self.motor_interface = None # type: ignore # just so its declared...
+            self.imu = None # no imu to read either
+            self.pwm = pwm.PwmOutputCache(pwm.FakePca9685()) # no chip, but the cache still runs (and counts) the same
             
 
         self.motors: dict[types._MotorKey, motor.Motor] = {
@@ -52,7 +56,7 @@ class HardwareManager():
         self.servos: dict[types._ServoKey, int] = {}
 
     def get_gyroscope(self) -> rovmath.Vec:
-        if self.simulated:
+        if self.imu is None: # simulated, or the hardware libraries arent there
             return (0, 0, 0)
         #          (yaw, pitch, roll)
         
@@ -68,7 +72,8 @@ class HardwareManager():
 
 
     def set_motor(self, motor: types._MotorKey, throttle: float):
-        self.motors[motor].set_throttle(self.motor_interface, self.simulated, throttle)
+        mot = self.motors[motor]
+        self.pwm.set(mot.address, mot.update_throttle(throttle)) # written on the next flush()
 
 
     def set_servo(self, servo: types._ServoKey, byte: int, camera: bool = True):
@@ -81,11 +86,14 @@ class HardwareManager():
 
         address = HardwareManager.ADDRESSES[servo]
 
-        if self.simulated: # make sure we arent simulating
-            return
-        
         # since the range for this is 0..180 which is between 0..255 i can just encode the value directly
-        self.motor_interface.channels[address].duty_cycle = rovmath.calc_servo_dutycycle(byte, camera)
+        self.pwm.set(address, rovmath.calc_servo_dutycycle(byte, camera)) # written on the next flush()
+
+    def flush(self):
+        """
+        writes every motor and servo that changed since the last flush to the chip.
+        """
+        self.pwm.flush()
 
 
     def print_states(self):
@@ -96,6 +104,7 @@ class HardwareManager():
             "tr", rovmath.inv_calc_motor_dutycycle(self.motors['right_top']    .get_duty_cycle()),
             "bl", rovmath.inv_calc_motor_dutycycle(self.motors['left_back']    .get_duty_cycle()),
             "br", rovmath.inv_calc_motor_dutycycle(self.motors['right_back']   .get_duty_cycle()),
+            "i2c", f"{self.pwm.writes_per_second:.0f}/s ({self.pwm.avoided_per_second:.0f}/s avoided)",
             )  
         
     def cleanup(self):
@@ -107,6 +116,7 @@ class HardwareManager():
         self.set_motor('left_top', 0.0)
         self.set_motor('right_top', 0.0)
         self.set_motor('left_back', 0.0)
-        self.set_motor('left_back', 0.0)
+        self.set_motor('right_back', 0.0)
+        self.flush()
         
 
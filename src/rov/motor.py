@@ -30,7 +30,17 @@ class Motor():
         self._dc = 0
 
     def set_throttle(self, interface: PCA9685, simulated: bool, power: float):
-        
+        self.update_throttle(power)
+        if simulated: # make sure we arent simulating
+            return
+    
+        #
+        interface.channels[self.address].duty_cycle = self._dc
+
+    def update_throttle(self, power: float) -> int:
+        """
+        works out the duty cycle for a throttle without writing it anywhere. returns the duty cycle
+        """
         limiter = abs(rovmath.clamp(0.0, 1.0, consts.SPEED_LIMIT))
         if self.bidirectional:
             power = rovmath.clamp(-limiter, limiter, power)
@@ -43,11 +53,7 @@ class Motor():
         self._throttle = power
 
         self._dc = rovmath.calc_motor_dutycycle(self.reverse, self.neutral, self.forward, self.bidirectional, self._throttle)
-        if simulated: # make sure we arent simulating
-            return
-    
-        #
-        interface.channels[self.address].duty_cycle = self._dc
+        return self._dc
 
     def set_dc(self, interface: PCA9685, simulated: bool, dc: int):
         self._dc = dc
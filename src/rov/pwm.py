@@ -0,0 +1,167 @@
+import time
+import struct
+import typing
+
+# the PCA9685 keeps each channel's pulse in 4 registers, starting at LED0_ON_L:
+# <on low> <on high> <off low> <off high>
+# with auto-increment on (MODE1 bit 5, which the adafruit library turns on when it sets the frequency), one write can start at any
+# channel's first register and carry on through the next channels, so neighbouring channels can all be set in one bus transaction.
+
+CHANNELS: int = 16
+LED0_ON_L: int = 0x06 # first register of channel 0
+REGISTERS_PER_CHANNEL: int = 4
+FULL: int = 0x1000 # bit 4 of the on/off high register, meaning "always on" or "always off"
+
+CHANNEL_REGISTERS: struct.Struct = struct.Struct("<HH") # on, off (little endian; low register first)
+
+
+class _I2cDevice(typing.Protocol):
+    """
+    what the cache needs to talk to the chip. adafruit's I2CDevice (PCA9685.i2c_device) is one of these.
+    """
+    def __enter__(self) -> typing.Self: ...
+    def __exit__(self, *args) -> None: ...
+    def write(self, buf: bytes | bytearray, *, start: int = 0, end: int | None = None) -> None: ...
+
+
+def encode_duty_cycle(duty_cycle: int) -> tuple[int, int]:
+    """
+    16 bit duty cycle -> (on, off) register values. the same as adafruit's PWMChannel.duty_cycle does it
+    """
+    if duty_cycle >= 0xFFFF:
+        return (FULL, 0)
+    if duty_cycle < 0x0010:
+        return (0, FULL)
+    return (0, duty_cycle >> 4)
+
+
+class PwmOutputCache():
+    """
+    Remembers the last duty cycle written to each PCA9685 channel, so setting a channel to what it already is costs nothing.
+
+    Channels are staged with set() and written with flush(). Changed channels that are next to each other go out in one bus transaction.
+    """
+
+    RATE_INTERVAL: float = 1.0 # seconds the write rates are measured over
+
+    def __init__(self, device: _I2cDevice) -> None:
+        self.device = device
+
+        # compared as (on, off) register values rather than duty cycles, since the chip only has 12 bits and duty cycles a few apart come out the same
+        self._written: list[tuple[int, int] | None] = [None] * CHANNELS # what each channel was last set to. None means unknown, so it will be written
+        self._staged: list[tuple[int, int] | None] = [None] * CHANNELS # what each channel should be set to on the next flush
+
+        self._buffer = bytearray(1 + CHANNELS * REGISTERS_PER_CHANNEL) # register address and every channel, the biggest write there can be
+
+        # counters
+        self.transactions = 0 # bus writes
+        self.channels_written = 0
+        self.writes_avoided = 0 # channels set to what they already were
+
+        # measurements, over the last rate interval
+        self.writes_per_second = 0.0
+        self.avoided_per_second = 0.0
+        self._rate_start = time.monotonic()
+        self._rate_transactions = 0
+        self._rate_avoided = 0
+
+    def set(self, channel: int, duty_cycle: int):
+        """
+        stages a channel's duty cycle for the next flush.
+        """
+        self._staged[channel] = encode_duty_cycle(duty_cycle)
+
+    def invalidate(self, channel: int | None = None):
+        """
+        forgets what a channel (or every channel) was set to, so it is written on the next flush even if it hasnt changed.
+        call this after anything writes to the chip without going through the cache (like arming).
+        """
+        if channel is None:
+            self._written = [None] * CHANNELS
+        else:
+            self._written[channel] = None
+
+    def flush(self) -> int:
+        """
+        writes every staged channel that changed. returns how many bus transactions it took.
+        """
+        transactions = 0
+        channel = 0
+        while channel < CHANNELS:
+            value = self._staged[channel]
+            if value is None:
+                channel += 1
+                continue
+            if value == self._written[channel]:
+                self._staged[channel] = None
+                self.writes_avoided += 1
+                channel += 1
+                continue
+
+            # a run of changed channels, written in one go
+            first = channel
+            while channel < CHANNELS and self._staged[channel] is not None and self._staged[channel] != self._written[channel]:
+                CHANNEL_REGISTERS.pack_into(self._buffer, 1 + (channel - first) * REGISTERS_PER_CHANNEL, *self._staged[channel]) # type: ignore # checked above
+                channel += 1
+
+            self._buffer[0] = LED0_ON_L + first * REGISTERS_PER_CHANNEL
+            with self.device as i2c:
+                i2c.write(self._buffer, end=1 + (channel - first) * REGISTERS_PER_CHANNEL)
+
+            # only remembered once the write went through; if it raised, theyre tried again next flush
+            for written in range(first, channel):
+                self._written[written] = self._staged[written]
+                self._staged[written] = None
+            self.channels_written += channel - first
+            transactions += 1
+
+        self.transactions += transactions
+        self._measure()
+        return transactions
+
+    def _measure(self):
+        now = time.monotonic()
+        elapsed = now - self._rate_start
+        if elapsed < PwmOutputCache.RATE_INTERVAL:
+            return
+        self.writes_per_second = (self.transactions - self._rate_transactions) / elapsed
+        self.avoided_per_second = (self.writes_avoided - self._rate_avoided) / elapsed
+        self._rate_start = now
+        self._rate_transactions = self.transactions
+        self._rate_avoided = self.writes_avoided
+
+
+class FakePca9685():
+    """
+    Stands in for the chip's I2C device when there's no hardware (simulated, or testing the cache).
+    It keeps the registers like the real chip does, so what was written can be read back.
+    """
+
+    def __init__(self) -> None:
+        self.registers = bytearray(256)
+        self.transactions = 0
+        self.bytes_written = 0
+
+    def __enter__(self) -> typing.Self:
+        return self
+
+    def __exit__(self, *args) -> None:
+        pass
+
+    def write(self, buf: bytes | bytearray, *, start: int = 0, end: int | None = None) -> None:
+        data = memoryview(buf)[start:end]
+        register = data[0]
+        self.registers[register:register + len(data) - 1] = data[1:] # auto-increment
+        self.transactions += 1
+        self.bytes_written += len(data)
+
+    def duty_cycle(self, channel: int) -> int:
+        """
+        reads a channel back the same way adafruit's PWMChannel.duty_cycle does.
+        """
+        on, off = CHANNEL_REGISTERS.unpack_from(self.registers, LED0_ON_L + channel * REGISTERS_PER_CHANNEL)
+        if on == FULL:
+            return 0xFFFF
+        if off == FULL:
+            return 0
+        return off << 4
@@ -1,5 +1,4 @@
 import typing
-import threading
 import time
 import struct
 from src.common import consts
@@ -7,8 +6,13 @@ from src.common import types
 from src.common import rovmath
 from src.common.net import packets
 from src.common.net.worker import Networker, _Addr
+from src.common.timing import FixedRateLoop
+from src.common.telemetry import Telemetry
 from src.rov.hardware import HardwareManager
 from src.rov.camera import CameraFeed
+from src.rov.camscheduler import CameraScheduler
+from src.rov.bitrate import BitrateController
+from src.rov.delta import DeltaEncoder
 
 
 class Rov():
@@ -35,7 +39,14 @@ class Rov():
             "tool_hor": 0,
         }
         self.correction_enabled = False
-        self.camera_enabled = True
+        self.loop = FixedRateLoop(consts.ROV_TICK_RATE) # paces tick(). its stats say how well the rov is keeping up
+        self.pid_modulation = 0.0 # the stabiliser's last output
+
+        # telemetry, so the poolside sees what the rov is actually doing rather than what it was told to do
+        self.start_time = time.monotonic()
+        self.telemetry = Telemetry()
+        self.telemetry_timer = 0.0
+        self.link_stats_timer = 0.0
 
         # register control packet
         net.register_listener(packets.CONTROL, self.control_packet)
@@ -46,12 +57,16 @@ class Rov():
 
         # register arming packets
         net.register_listener(packets.SYNC_CAMERA,  self.sync_camera)
+        net.register_listener(packets.CAMERA_FEEDBACK, self.camera_feedback)
 
         # start camera thread
-        self.camera_running = True
-        self.camera_thread = threading.Thread(name="Camera Thread", target=self._camera_thread_activity)
-        self.camera_thread.daemon = True
-        self.camera_thread.start()
+        bitrate = BitrateController(
+            consts.CAMERA_BANDWIDTH_BUDGET, consts.CAMERA_TARGET_FPS,
+            consts.CAMERA_QUALITY_MIN, consts.CAMERA_QUALITY_MAX, consts.CAMERA_QUALITY_STEP,
+            consts.CAMERA_SCALES, consts.CAMERA_COMPRESSION_VALUE
+        )
+        delta = DeltaEncoder(consts.CAMERA_TILE_COLUMNS, consts.CAMERA_TILE_ROWS, consts.CAMERA_TILE_THRESHOLD, consts.CAMERA_KEYFRAME_INTERVAL) if consts.CAMERA_DELTA_MODE else None
+        self.camera = CameraScheduler(cam, net, consts.CAMERA_TARGET_FPS, consts.CAMERA_BANDWIDTH_BUDGET, bitrate, delta)
 
 
     def tick(self, dt: float):
@@ -68,7 +83,8 @@ class Rov():
         if self.correction_enabled and not self.hardware.simulated:
             
             # roll
-            correction = self.hardware.stabiliser.compute_modulation(self.hardware.imu.roll(), dt) * dt
+            self.pid_modulation = self.hardware.stabiliser.compute_modulation(self.hardware.imu.roll(), dt)
+            correction = self.pid_modulation * dt
             if   correction > 0: # roll is less than 0, (from back?) left needs up and right needs down
                 lt +=  abs(correction)
                 rt += -abs(correction)
@@ -90,23 +106,48 @@ class Rov():
         self.hardware.set_servo('camera_angle', int(self.net_motor_cache['camera_angle']))
         self.hardware.set_servo('tool_ver',   int(self.net_motor_cache['tool_ver'] / 2), camera = False) # the tool gripper only actually needs to go 0..90, so i divide the range by 2 (because its transmitted as a number 0..180)
         self.hardware.set_servo('tool_hor',    int(self.net_motor_cache['tool_hor'] / 2), camera = False)
+        self.hardware.flush() # only what changed actually goes down the i2c bus
+
+        # report back
+        self.telemetry_timer += dt
+        if self.telemetry_timer >= 1.0 / consts.TELEMETRY_RATE:
+            self.telemetry_timer = 0.0
+            self.send_telemetry()
+
+        self.link_stats_timer += dt
+        if self.link_stats_timer >= consts.LINK_STATS_LOG_INTERVAL:
+            self.link_stats_timer = 0.0
+            print("link:", self.net.stats.summary())
+            print(self.net.dispatcher.summary())
+            print(self.net.channel_summary())
 
         # print if simulated
         if self.hardware.simulated:
             self.hardware.print_states()
 
+    def send_telemetry(self):
+        t = self.telemetry
+        t.uptime = time.monotonic() - self.start_time
+        for mot in self.hardware.motors:
+            t.duty_cycles[mot] = self.hardware.motors[mot].get_duty_cycle()
+        for servo in self.hardware.servos:
+            t.servos[servo] = self.hardware.servos[servo]
+        yaw, pitch, roll = self.hardware.get_gyroscope() # zeros if theres no imu
+        t.gyro = (float(yaw), float(pitch), float(roll))
+        t.pid = self.pid_modulation if self.correction_enabled else 0.0
+        t.loop_busy = self.loop.busy
+        t.loop_jitter = self.loop.jitter
+        t.loop_overruns = self.loop.overruns
+        t.i2c_writes_per_second = self.hardware.pwm.writes_per_second
+        t.camera_fps = self.camera.fps
+        self.net.send(packets.TELEMETRY, *t.pack())
+
     def arm(self):
         for mot in self.hardware.motors:
             self.hardware.motors[mot].arm(self.hardware.motor_interface, self.hardware.simulated)
+        self.hardware.pwm.invalidate() # arming writes straight to the chip, so the cache doesnt know what the channels are any more
 
 
-    def _camera_thread_activity(self):
-        while self.camera_running: # loops until the poolside disconnects!
-            if self.net.is_open() and self.camera_enabled:
-                frame = self.cam.capture() # get frame from camera
-                self.net.send(packets.CAMERA, frame) # send the camera frame down socket
-                
-                
     def enable_correction(self, addr: _Addr, args: ...):
         print("enabled correction")
         self.correction_enabled = True
@@ -116,7 +157,10 @@ class Rov():
         self.correction_enabled = False
 
     def sync_camera(self, addr: _Addr, enabled: bool):
-        self.camera_enabled = enabled
+        self.camera.set_enabled(enabled)
+
+    def camera_feedback(self, addr: _Addr, fps: float, bytes_per_second: float, loss: float):
+        self.camera.bitrate.feedback(bytes_per_second, loss)
 
     def control_packet(self, addr: _Addr, left_front, right_front, left_top, right_top, left_back, right_back, camera_angle, tool_ver, tool_hor):
         """
@@ -0,0 +1,137 @@
+##
+import sys
+sys.path[0] = sys.path[0][:-5] # hack around the fact that this file isnt in the main path so i can access src
+##
+
+import os
+import time
+import shutil
+import socket
+import tempfile
+import tracemalloc
+from src.common import consts
+from src.common.net import packets
+from src.common.net import capture
+from src.common.net.capture import Capture, CaptureReader
+from src.common.net.worker import Networker
+
+# how much recording every packet costs, what that comes to over a whole run, and that everything written can be read back
+# (all of it, by type, from a time, and from a capture that was never closed) without loading the file
+
+RECORDS: int = 200_000
+RUN_SECONDS: float = consts.POOL_RUN_TIME_SECONDS
+CAMERA_BYTES_PER_SECOND: int = 3 * 1024 * 1024 # a generous camera stream, in 1400 byte fragments
+CONTROLS_PER_SECOND: int = 120 # controls out, plus pings, telemetry and the rest coming back
+SENDS: int = 100_000
+PORT: int = 50141
+SLOW_ALLOCATE: float = 0.5 # seconds
+SLOW_RECORDS: int = 100_000
+
+
+def write_cost(directory: str, size: int) -> float:
+    """
+    microseconds per record of `size` bytes.
+    """
+    cap = Capture(os.path.join(directory, f"write-{size}.cap"), preallocate=RECORDS * (capture.RECORD_HEADER.size + size) + 4096) # room for all of it
+    datagram = bytes(size)
+    addr = ('127.0.0.1', 8081)
+    start = time.perf_counter()
+    for _ in range(RECORDS):
+        cap.write(capture.OUT, 3, addr, datagram)
+    elapsed = time.perf_counter() - start
+    cap.close()
+    return elapsed / RECORDS * 1e6
+
+
+def send_rate(net: Networker) -> float:
+    start = time.perf_counter()
+    for i in range(SENDS):
+        net.send(packets.CONTROL, float(i), 0, 0, 0, 0, 0, 0, 0, 0)
+    return SENDS / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    directory = tempfile.mkdtemp()
+
+    control = write_cost(directory, 44)
+    fragment = write_cost(directory, consts.PACKET_FRAGMENT_SIZE)
+    print(f"write: {control:.2f} us per control, {fragment:.2f} us per camera fragment")
+    fragments_per_second = CAMERA_BYTES_PER_SECOND / consts.PACKET_FRAGMENT_SIZE
+    per_second = fragments_per_second * fragment + CONTROLS_PER_SECOND * control
+    print(f"a {RUN_SECONDS / 60:.0f} minute run: {fragments_per_second * RUN_SECONDS:.0f} fragments, {CAMERA_BYTES_PER_SECOND * RUN_SECONDS / 1024**3:.1f} GiB, "
+          f"{per_second / 1e6 * 100:.2f}% of one core recording")
+
+    # sending, with and without
+    sink = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sink.bind(('127.0.0.1', PORT))
+    net = Networker("127.0.0.1", PORT, 0, consts.PACKET_SIZE)
+    net.target_addr = ('127.0.0.1', PORT)
+    net.open = True
+    without = send_rate(net)
+    net.capture = Capture(os.path.join(directory, "send.cap"))
+    with_capture = send_rate(net)
+    net.capture.close()
+    print(f"send: {without:.0f} pkt/s without, {with_capture:.0f} pkt/s recording")
+    sink.close()
+
+    # reading it back
+    path = os.path.join(directory, "read.cap")
+    cap = Capture(path, preallocate=1024 * 1024 * 8) # small, so it has to grow
+    written = []
+    for i in range(RECORDS):
+        pkt_id = packets.CAMERA[0] if i % 4 else packets.CONTROL[0]
+        datagram = i.to_bytes(4, 'big') * (1 + i % 300)
+        direction = capture.IN if i % 3 else capture.OUT
+        records = cap.records
+        cap.write(direction, pkt_id, ('192.168.1.%d' % (i % 250), 8000 + i % 7), datagram)
+        if cap.records > records: # written flat out, so some may not fit while the next chunk is set aside
+            written.append((direction, pkt_id, ('192.168.1.%d' % (i % 250), 8000 + i % 7), datagram))
+        if i == RECORDS // 2:
+            time.sleep(1.1) # so there's a time to seek to
+    half = cap.times[-1]
+    cap.close()
+    print(f"wrote {cap.records} records ({cap.dropped} dropped), {os.path.getsize(path) / 1024 / 1024:.1f} MiB, grew {cap.grows} times (slowest {cap.grow_max * 1000:.1f}ms)")
+
+    tracemalloc.start()
+    with CaptureReader(path) as reader:
+        same = all(record[1:] == expected for record, expected in zip(reader.records(), written, strict=True))
+        controls = sum(1 for _ in reader.records(types=[packets.CONTROL[0]]))
+        controls_written = sum(1 for record in written if record[1] == packets.CONTROL[0])
+        after = next(reader.records(start=half))
+        duration = reader.duration()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"read back: same {same}, controls {controls}/{controls_written}, seek to {half:.2f}s found {after[0]:.2f}s "
+          f"(record {int.from_bytes(after[4][:4], 'big')}), duration {duration:.2f}s, peak memory {peak / 1024:.0f} KiB")
+
+    # a disk thats slow to set space aside. writing (sending) should never wait for it; records that dont fit in time are dropped
+    allocate = Capture._allocate
+    def slow_allocate(self, start, end):
+        if start > 0:
+            time.sleep(SLOW_ALLOCATE)
+        allocate(self, start, end)
+    Capture._allocate = slow_allocate # type: ignore
+    cap = Capture(os.path.join(directory, "slow.cap"), preallocate=1024 * 1024 * 16)
+    datagram = bytes(consts.PACKET_FRAGMENT_SIZE)
+    slowest = 0.0
+    for i in range(SLOW_RECORDS):
+        start = time.perf_counter()
+        cap.write(capture.IN, packets.CAMERA[0], ('127.0.0.1', 8080), datagram)
+        slowest = max(slowest, time.perf_counter() - start)
+        if i % 100 == 0:
+            time.sleep(0.001) # about 100 MiB/s
+    cap.close()
+    Capture._allocate = allocate # type: ignore
+    print(f"slow disk ({SLOW_ALLOCATE * 1000:.0f}ms to grow): slowest write {slowest * 1e6:.0f} us, {cap.records} written, {cap.dropped} dropped, grew {cap.grows} times")
+
+    # a capture that was never closed, like after a crash
+    path = os.path.join(directory, "crash.cap")
+    cap = Capture(path)
+    for i in range(1000):
+        cap.write(capture.IN, packets.CONTROL[0], ('127.0.0.1', 8080), i.to_bytes(4, 'big'))
+    with CaptureReader(path) as reader:
+        records = list(reader.records())
+        print(f"never closed: read {len(records)}/1000, last {int.from_bytes(records[-1][4], 'big')}, index worked out: {len(reader.offsets()[packets.CONTROL[0]])}")
+    cap.close()
+
+    shutil.rmtree(directory)
@@ -0,0 +1,88 @@
+##
+import sys
+sys.path[0] = sys.path[0][:-5] # hack around the fact that this file isnt in the main path so i can access src
+##
+
+import os
+import time
+import socket
+from src.common import consts
+from src.common.net import packets
+from src.common.net import dispatch
+from src.common.net import channel
+from src.common.net.worker import Networker
+
+# how many controls get through while camera frames are arriving faster than the receiving end reads them (a slow camera listener,
+# on the receive thread), once with everything through one socket and once with controls and camera on channels of their own
+
+FRAMES: int = 200
+FRAME_BYTES: int = 64 * 1024 # about 48 datagrams each
+CONTROLS_PER_FRAME: int = 5
+CAMERA_HANDLER: float = 0.0002 # seconds the camera listener takes, per fragment. slower than they arrive
+SMALL_BUFFER: int = 64 * 1024 # so the one socket fills up quickly
+PORT_A: int = 50131
+PORT_B: int = 50132
+
+
+def busy(seconds: float):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def run(name: str, channels: bool):
+    sender = Networker("127.0.0.1", PORT_B, PORT_A, consts.PACKET_SIZE, consts.PACKET_FRAGMENT_SIZE)
+    receiver = Networker("127.0.0.1", PORT_A, PORT_B, consts.PACKET_SIZE, consts.PACKET_FRAGMENT_SIZE)
+    receiver.default_channel._buffer(socket.SO_RCVBUF, SMALL_BUFFER)
+    if channels:
+        for net in (sender, receiver):
+            net.add_channel("control", consts.CONTROL_CHANNEL_PORT_OFFSET, packets.CONTROL_CHANNEL, dispatch.PRIORITY_URGENT, consts.CONTROL_CHANNEL_BUFFER, consts.CONTROL_CHANNEL_BUFFER, channel.DSCP_EXPEDITED)
+            net.add_channel("camera", consts.CAMERA_CHANNEL_PORT_OFFSET, packets.CAMERA_CHANNEL, dispatch.PRIORITY_BULK, SMALL_BUFFER, consts.CAMERA_CHANNEL_BUFFER, channel.DSCP_VIDEO)
+    sender.start()
+    receiver.start()
+
+    controls = []
+    frames = []
+    receiver.register_listener(packets.CONTROL, lambda addr, *values: controls.append(time.perf_counter() - values[0]))
+    receiver.register_listener(packets.CAMERA, lambda addr, data: frames.append(len(data)))
+    # the slow part is per datagram, before reassembly, so it wraps _handle rather than being a listener
+    original_handle = receiver._handle
+    def slow_handle(raw_pkt, addr, received):
+        if Networker._ID_STRUCT.unpack_from(raw_pkt, 2)[0] == packets.CAMERA[0]:
+            busy(CAMERA_HANDLER)
+        original_handle(raw_pkt, addr, received)
+    receiver._handle = slow_handle
+
+    frame = bytes(FRAME_BYTES)
+    for _ in range(FRAMES):
+        sender.send_fragmented(packets.CAMERA, frame)
+        for _ in range(CONTROLS_PER_FRAME):
+            sender.send(packets.CONTROL, time.perf_counter(), 0, 0, 0, 0, 0, 0, 0, 0)
+        time.sleep(0.001)
+    time.sleep(1.0) # let the receiver catch up
+
+    sent = FRAMES * CONTROLS_PER_FRAME
+    controls.sort()
+    latency = f"median {controls[len(controls) // 2] * 1000:.1f} ms, max {controls[-1] * 1000:.1f} ms" if controls else "-"
+    print(f"{name:<8} controls {len(controls)}/{sent} ({(1 - len(controls) / sent) * 100:.1f}% lost, {latency})   frames {len(frames)}/{FRAMES}")
+    print(receiver.channel_summary())
+
+    sender.close()
+    receiver.close()
+    receiver.recv_thread.join()
+    sender.recv_thread.join()
+
+
+if __name__ == "__main__":
+    run("one", False)
+    run("channels", True)
+
+    net = Networker("127.0.0.1", PORT_A, PORT_B, consts.PACKET_SIZE)
+    ch = net.add_channel("camera", consts.CAMERA_CHANNEL_PORT_OFFSET, packets.CAMERA_CHANNEL, rcvbuf=consts.CAMERA_CHANNEL_BUFFER, dscp=channel.DSCP_VIDEO)
+    print(f"asked for a {consts.CAMERA_CHANNEL_BUFFER} byte receive buffer, got {ch.rcvbuf}. dscp {ch.dscp}")
+    try:
+        net.add_channel("again", consts.CAMERA_CHANNEL_PORT_OFFSET, [])
+    except ValueError as e:
+        print("same port offset twice:", e)
+
+    os._exit(0)
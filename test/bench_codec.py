@@ -0,0 +1,79 @@
+##
+import sys
+sys.path[0] = sys.path[0][:-5] # hack around the fact that this file isnt in the main path so i can access src
+##
+
+import re
+import time
+import struct
+import typing
+from src.common.net import packets # registers every packet type
+from src.common.net import codec
+
+# encode/decode throughput for every registered packet type.
+# "before" is struct.pack/struct.unpack with the format string (and padding) like the networker used to do, copied into the packet buffer,
+# "after" is the compiled codec packing into and unpacking from a reused buffer.
+
+SECONDS: float = 0.5
+RAW_SIZE: int = 15000 # roughly the size of one of our jpeg frames
+
+
+def sample_data(format: str | None) -> tuple:
+    """
+    makes up some values that fit a struct format.
+    """
+    if format is None:
+        return bytes(RAW_SIZE),
+
+    data = []
+    for count, char in re.findall(r"(\d*)([a-zA-Z?])", format):
+        n = int(count) if count else 1
+        if char in "ps":
+            data.append(b"hello")
+        elif char in "efd":
+            data += [0.5] * n
+        elif char == "?":
+            data += [True] * n
+        elif char != "x":
+            data += [1] * n
+    return tuple(data)
+
+
+def rate(func: typing.Callable[[], typing.Any]) -> float:
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < SECONDS:
+        for _ in range(100):
+            func()
+        count += 100
+    return count / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    buffer = bytearray(1024 * 32)
+    print(f"{'packet':<8} {'format':<8} {'encode before':>14} {'encode after':>14} {'decode before':>14} {'decode after':>14}   (ops/s)")
+
+    for c in codec.registered():
+        data = sample_data(c.format)
+        size = c.size(*data)
+        c.pack_into(buffer, 0, *data)
+        packed = bytes(buffer[:size])
+        padded = packed + bytes(64) # the old receive path got padded packets and had to skip the padding
+
+        if c.format:
+            format = c.format
+            def encode() -> None:
+                pkt_bytes = struct.pack(format, *data)
+                buffer[0:len(pkt_bytes)] = pkt_bytes
+            encode_before = rate(encode)
+            decode_before = rate(lambda: struct.unpack(format + ("x" * (len(padded) - struct.calcsize(format))), padded))
+        else:
+            def encode() -> None:
+                buffer[0:len(data[0])] = data[0]
+            encode_before = rate(encode)
+            decode_before = rate(lambda: (padded[:size],))
+
+        encode_after = rate(lambda: c.pack_into(buffer, 0, *data))
+        decode_after = rate(lambda: c.unpack_from(packed))
+
+        print(f"{c.id:<8} {str(c.format):<8} {encode_before:>14.0f} {encode_after:>14.0f} {decode_before:>14.0f} {decode_after:>14.0f}")
@@ -0,0 +1,100 @@
+##
+import sys
+sys.path[0] = sys.path[0][:-5] # hack around the fact that this file isnt in the main path so i can access src
+##
+
+import os
+import time
+import socket
+import threading
+from src.common import consts
+from src.common.net import packets
+from src.common.net import dispatch
+from src.common.net.worker import Networker
+
+# how long controls take to reach their listener while camera frames are flooding in and their listener is slow (like decoding a jpeg),
+# with every listener on the receive thread (as before) and with the camera on a worker. then checks latest-wins drops all but the newest.
+
+CONTROLS: int = 1000
+CONTROL_INTERVAL: float = 0.002
+CAMERA_PER_CONTROL: int = 2 # camera datagrams sent alongside each control
+CAMERA_HANDLER: float = 0.004 # seconds the camera listener takes
+CAMERA_BYTES: int = 1000
+PORT_A: int = 50121
+PORT_B: int = 50122
+
+
+def busy(seconds: float):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def run(name: str, camera_policy: dispatch._Policy):
+    receiver = Networker("127.0.0.1", PORT_A, PORT_B, consts.PACKET_SIZE)
+    receiver.start()
+    receiver.set_policy(packets.CONTROL, 'inline', dispatch.PRIORITY_URGENT)
+    receiver.set_policy(packets.CAMERA, camera_policy, dispatch.PRIORITY_BULK)
+    sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    latencies = []
+    done = threading.Event()
+    def control(addr, *values):
+        latencies.append(time.perf_counter() - values[0])
+        if len(latencies) >= CONTROLS:
+            done.set()
+    receiver.register_listener(packets.CONTROL, control)
+    receiver.register_listener(packets.CAMERA, lambda addr, data: busy(CAMERA_HANDLER))
+
+    frame = receiver.build_packet(packets.CAMERA, bytes(CAMERA_BYTES))
+    for _ in range(CONTROLS):
+        for _ in range(CAMERA_PER_CONTROL):
+            sender.sendto(frame, ('127.0.0.1', PORT_B))
+        sender.sendto(receiver.build_packet(packets.CONTROL, time.perf_counter(), 0, 0, 0, 0, 0, 0, 0, 0), ('127.0.0.1', PORT_B))
+        time.sleep(CONTROL_INTERVAL)
+    done.wait(10)
+
+    camera = receiver.dispatcher.stats[packets.CAMERA[0]]
+    receiver.close()
+    receiver.recv_thread.join()
+    sender.close()
+
+    latencies.sort()
+    if len(latencies) <= 0:
+        print(f"{name:<8} no controls arrived")
+        return
+    print(f"{name:<8} controls {len(latencies)}/{CONTROLS}   latency median {latencies[len(latencies) // 2] * 1000:.2f} ms, "
+          f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:.2f} ms, max {latencies[-1] * 1000:.1f} ms   "
+          f"camera handled {camera.handled}, dropped {camera.dropped}, queue max {camera.queue_max}")
+
+
+if __name__ == "__main__":
+    run("inline", 'inline')
+    run("worker", 'worker')
+    run("latest", 'latest')
+
+    # latest-wins on its own: while the listener is stuck on the first, everything after it but the newest is dropped
+    d = dispatch.Dispatcher()
+    d.set_policy(1, 'latest')
+    handled = []
+    release = threading.Event()
+    d.dispatch(1, lambda: release.wait(), time.perf_counter())
+    time.sleep(0.05)
+    for i in range(10):
+        d.dispatch(1, lambda i=i: handled.append(i), time.perf_counter())
+    release.set()
+    time.sleep(0.05)
+    print("latest handled:", handled, "dropped:", d.stats[1].dropped, "ok" if handled == [9] and d.stats[1].dropped == 9 else "WRONG")
+
+    # a shared queue keeps two types in order
+    d.set_policy(2, 'worker', queue="shared")
+    d.set_policy(3, 'worker', queue="shared")
+    order = []
+    for i in range(100):
+        d.dispatch(2 + i % 2, lambda i=i: order.append(i), time.perf_counter())
+    time.sleep(0.05)
+    print("shared queue in order:", order == list(range(100)))
+    print(d.summary())
+    d.stop()
+
+    os._exit(0)
@@ -0,0 +1,127 @@
+##
+import sys
+sys.path[0] = sys.path[0][:-5] # hack around the fact that this file isnt in the main path so i can access src
+##
+
+import io
+import os
+import time
+import typing
+os.chdir(sys.path[0]) # the window loads its resources relative to the repo
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy") # no need for a real window (or a screen) to time drawing
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+pygame.init()
+
+from src.poolside.window import Window
+from src.poolside.render import Renderer
+from src.poolside.ui import UiCountdownClock
+
+# frame times of the whole of Window.draw, "before" and "after" each optimisation of the drawing code.
+# nothing is connected, so this is the ui on its own: the camera feed shows the no camera picture (or a made up feed) and the graph is empty.
+
+FRAMES: int = 300
+WARMUP: int = 20 # frames drawn before timing, so caches are full like they would be a few frames into running
+
+
+def frame_times(wnd: Window, busy: bool = False) -> list[float]:
+    """
+    if `busy`, the stopwatch is running and the camera feed is getting frames, like it would be during a run.
+    """
+    for clock in [e for e in wnd.container.elements if isinstance(e, UiCountdownClock)]:
+        clock.ticking = busy
+
+    for i in range(WARMUP + FRAMES):
+        if busy and i % 2 == 0: # the camera runs at about half the frame rate
+            wnd.camera_feed.decoder.submit(FEED[i % len(FEED)])
+            time.sleep(0.002) # give the decoder a chance
+        wnd.update(1 / 60)
+        start = time.perf_counter()
+        wnd.draw()
+        if i == WARMUP - 1:
+            times = []
+        elif i >= WARMUP:
+            times.append(time.perf_counter() - start)
+    return times
+
+
+def present_times(wnd: Window, present: typing.Callable[[], typing.Any]) -> list[float]:
+    """
+    times just putting the (whole) draw surface on the window.
+    """
+    times = []
+    for _ in range(FRAMES):
+        start = time.perf_counter()
+        present()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def present_everything(wnd: Window) -> typing.Callable[[], typing.Any]:
+    return lambda: wnd.presenter.present([wnd.draw_surface.get_rect()])
+
+
+def make_feed() -> list[bytes]:
+    frames = []
+    for i in range(4):
+        surface = pygame.Surface((340, 256))
+        surface.fill((40 * i, 80, 120))
+        pygame.draw.circle(surface, 'white', (40 + 60 * i, 128), 30)
+        data = io.BytesIO()
+        pygame.image.save(surface, data, "frame.jpg")
+        frames.append(data.getvalue())
+    return frames
+
+
+def report(name: str, times: list[float]):
+    times = sorted(times)
+    mean = sum(times) / len(times)
+    print(f"{name:<24} {mean * 1000:>8.2f} {times[len(times) // 2] * 1000:>8.2f} {times[int(len(times) * 0.95)] * 1000:>8.2f} {times[-1] * 1000:>8.2f} {1 / mean:>8.0f}")
+
+
+def compare(name: str, wnd: Window, toggle: typing.Callable[[bool], None], busy: bool = False):
+    toggle(False)
+    report(f"{name} (before)", frame_times(wnd, busy))
+    toggle(True)
+    report(f"{name} (after)", frame_times(wnd, busy))
+
+
+def text_cache(enabled: bool):
+    Renderer.cache_enabled = enabled
+    Renderer.clear_caches()
+
+
+def retained_mode(wnd: Window) -> typing.Callable[[bool], None]:
+    def toggle(enabled: bool):
+        wnd.container.retained = enabled
+        wnd.container.invalidate()
+    return toggle
+
+
+FEED = make_feed()
+
+
+if __name__ == "__main__":
+    wnd = Window("127.0.0.1", 50001, 50002)
+
+    print(f"{'':<24} {'mean':>8} {'median':>8} {'p95':>8} {'worst':>8} {'fps':>8}   (ms per Window.draw)")
+    retained_mode(wnd)(False) # each comparison only changes one thing
+    compare("text cache", wnd, text_cache)
+    compare("retained, idle", wnd, retained_mode(wnd))
+    compare("retained, busy", wnd, retained_mode(wnd), busy=True)
+
+    print()
+    print(f"{'':<24} {'mean':>8} {'median':>8} {'p95':>8} {'worst':>8} {'fps':>8}   (ms to put the whole ui on the window)")
+    for size in [(1280, 720), (1366, 768), (1920, 1080)]:
+        wnd.window.size = size
+        wnd.presenter.set_mode('nearest')
+        report(f"{size[0]}x{size[1]} allocating", present_times(wnd, lambda: wnd.wnd_surface.blit(pygame.transform.scale(wnd.draw_surface, wnd.window.size)))) # how it used to be done
+        for mode in ('integer', 'nearest', 'smooth'):
+            wnd.presenter.set_mode(mode)
+            report(f"{size[0]}x{size[1]} {mode}", present_times(wnd, present_everything(wnd)))
+    wnd.presenter.skip_same_size = False
+    report(f"1920x1080 no skip", present_times(wnd, present_everything(wnd)))
+
+    wnd.shutdown()
+    os._exit(0) # dont wait on the networker thread
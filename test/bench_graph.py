@@ -0,0 +1,117 @@
+##
+import sys
+sys.path[0] = sys.path[0][:-5] # hack around the fact that this file isnt in the main path so i can access src
+##
+
+import os
+import time
+import math
+import random
+import typing
+os.chdir(sys.path[0]) # fonts are loaded relative to the repo
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+pygame.init()
+
+from src.common import rovmath
+from src.poolside.ui import UiLineGraph
+
+# frame times (update and draw) of a line graph with lots of points: "before" (the old per point loops, copied below),
+# "every point" (NumPy, drawing all of them), and "after" (NumPy, decimated to what fits on the axis). the graph should keep up with 60 fps at 100k points.
+
+FRAMES: int = 30
+TARGET_FPS: float = 60.0
+COUNTS: list[int] = [1_000, 10_000, 100_000]
+LEGACY_FRAMES: int = 3 # the old way is slow enough that a few frames is plenty
+
+
+class LegacyLineGraph(UiLineGraph):
+    """
+    UiLineGraph's points and bounds the way they used to be done: a python loop over every point, one draw.line per segment.
+    """
+    def update(self, dt: float, surface: pygame.Surface):
+        self.points = self.data_fetcher() # type: ignore
+        self._points_to_draw = self.points if self.drawn_points <= 0 or len(self.points) < self.drawn_points else self.points[len(self.points)-self.drawn_points:] # type: ignore
+
+        self.x_range_low = self.x_range_high = self.points[0][0]
+        self.y_range_low = self.y_range_high = self.points[0][1]
+        for (x, y) in self.points:
+            if x < self.x_range_low: self.x_range_low = x
+            if x > self.x_range_high: self.x_range_high = x
+            if y < self.y_range_low: self.y_range_low = y
+            if y > self.y_range_high: self.y_range_high = y
+
+    def draw(self, surface: pygame.Surface):
+        origin = self.resolve_position()
+        def map_value(low, high, v):
+            return rovmath.map(low, high, v, 0.0, 1.0)
+
+        if self.draw_points:
+            for (x, y) in self._points_to_draw:
+                pygame.draw.circle(surface, self.point_color, (
+                    origin.x + (self.axis_line_length * map_value(self.x_range_low, self.x_range_high, x)),
+                    origin.y + (self.axis_line_length * map_value(self.y_range_low, self.y_range_high, y))
+                ), self.point_size)
+
+        last_point = self._points_to_draw[0]
+        for (x, y) in self._points_to_draw[1:]:
+            pygame.draw.line(surface, self.line_color, (
+                origin.x + (self.axis_line_length * map_value(self.x_range_low, self.x_range_high, last_point[0])),
+                origin.y + (self.axis_line_length * map_value(self.y_range_low, self.y_range_high, last_point[1]))
+            ), (
+                origin.x + (self.axis_line_length * map_value(self.x_range_low, self.x_range_high, x)),
+                origin.y + (self.axis_line_length * map_value(self.y_range_low, self.y_range_high, y))
+            ), self.line_width)
+            last_point = (x, y)
+
+
+def make_data(count: int) -> list[tuple[float, float]]:
+    """
+    a dive profile: down, along and back up, with some noise.
+    """
+    data = []
+    for i in range(count):
+        t = i / count
+        data.append((t * 600, 10 * math.sin(t * math.pi) + random.uniform(-0.3, 0.3)))
+    return data
+
+
+def frame_times(graph: UiLineGraph, surface: pygame.Surface, frames: int, grow: typing.Callable[[], None] | None = None) -> float:
+    start = time.perf_counter()
+    for _ in range(frames):
+        if grow:
+            grow()
+        graph.update(1 / 60, surface)
+        graph.draw(surface)
+    return (time.perf_counter() - start) / frames
+
+
+if __name__ == "__main__":
+    surface = pygame.Surface((1920, 1080))
+    print(f"{'points':>8} {'points drawn':>13} {'before':>10} {'every point':>12} {'after':>10} {'live':>10}   (ms per frame)")
+
+    for count in COUNTS:
+        data = make_data(count)
+        for draw_points in (False, True):
+            legacy = LegacyLineGraph(pygame.Vector2(100, 100), lambda: data)
+            legacy.draw_points = draw_points
+            before = frame_times(legacy, surface, LEGACY_FRAMES)
+
+            graph = UiLineGraph(pygame.Vector2(100, 100), lambda: data)
+            graph.draw_points = draw_points
+            graph.decimate = False
+            every_point = frame_times(graph, surface, FRAMES)
+
+            graph = UiLineGraph(pygame.Vector2(100, 100), lambda: data)
+            graph.draw_points = draw_points
+            after = frame_times(graph, surface, FRAMES)
+
+            # the same, but coming in live: the list grows a bit every frame
+            growing = data[:count - FRAMES * 10]
+            live_graph = UiLineGraph(pygame.Vector2(100, 100), lambda: growing)
+            live_graph.draw_points = draw_points
+            live = frame_times(live_graph, surface, FRAMES, lambda: growing.extend(data[len(growing):len(growing) + 10]))
+
+            ok = "ok" if max(after, live) < 1 / TARGET_FPS else "TOO SLOW"
+            print(f"{count:>8} {str(draw_points):>13} {before * 1000:>10.2f} {every_point * 1000:>12.2f} {after * 1000:>10.2f} {live * 1000:>10.2f}   {ok}")
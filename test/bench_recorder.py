@@ -0,0 +1,103 @@
+##
+import sys
+sys.path[0] = sys.path[0][:-5] # hack around the fact that this file isnt in the main path so i can access src
+##
+
+import os
+import cv2
+import glob
+import time
+import shutil
+import tempfile
+import numpy as np
+from src.common import consts
+from src.poolside import recorder
+from src.poolside.recorder import VideoRecorder, jpeg_size
+
+# records made up camera frames, checks the files play back (in opencv) with every frame and its timestamp,
+# then makes the disk stall and checks submitting never waits on it, and that the frames that didnt fit are counted
+
+FRAMES: int = 300
+FPS: float = 30.0
+STALL: float = 2.0 # seconds the disk gets stuck for. longer than the queue lasts
+
+
+def make_frames(count: int, width: int, height: int) -> list[bytes]:
+    frames = []
+    for i in range(count):
+        image = np.full((height, width, 3), i % 256, np.uint8)
+        cv2.putText(image, str(i), (10, height // 2), cv2.FONT_HERSHEY_SIMPLEX, 1.0, (255, 255, 255), 2)
+        frames.append(cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, consts.CAMERA_COMPRESSION_VALUE])[1].tobytes())
+    return frames
+
+
+def play_back(directory: str) -> list[tuple[str, int, int, tuple[int, int]]]:
+    """
+    every segment, with how many frames opencv read from it, how many its csv lists, and its size.
+    """
+    segments = []
+    for path in sorted(glob.glob(os.path.join(directory, "*.avi"))):
+        video = cv2.VideoCapture(path)
+        read = 0
+        size = (0, 0)
+        while True:
+            ok, frame = video.read()
+            if not ok:
+                break
+            size = (frame.shape[1], frame.shape[0])
+            read += 1
+        with open(path[:-4] + ".csv") as f:
+            listed = len(f.readlines()) - 1
+        segments.append((os.path.basename(path), read, listed, size))
+    return segments
+
+
+if __name__ == "__main__":
+    directory = tempfile.mkdtemp()
+    full = make_frames(FRAMES, consts.CAMERA_IMAGE_HEIGHT, consts.CAMERA_IMAGE_WIDTH) # rotated, like the rov sends them
+    small = make_frames(FRAMES // 2, consts.CAMERA_IMAGE_HEIGHT // 2, consts.CAMERA_IMAGE_WIDTH // 2)
+    print("jpeg size:", jpeg_size(full[0]), jpeg_size(small[0]), jpeg_size(b"not a jpeg"))
+
+    # a few seconds of frames, part of it shrunk, in 2 second segments
+    rec = VideoRecorder(directory, FPS, segment_seconds=2.0, queue_length=consts.VIDEO_QUEUE_LENGTH)
+    costs = []
+    for data in full[:FRAMES // 2] + small + full[FRAMES // 2:]:
+        start = time.perf_counter()
+        rec.submit(data)
+        costs.append(time.perf_counter() - start)
+        time.sleep(1 / FPS)
+    rec.stop()
+    costs.sort()
+    print(rec.summary(), f"   submit median {costs[len(costs) // 2] * 1e6:.1f} us, max {costs[-1] * 1e6:.0f} us, write max {rec.write_max * 1000:.1f} ms")
+    total = 0
+    for name, read, listed, size in play_back(directory):
+        print(f"  {name}: {read} frames read back, {listed} in its csv, {size[0]}x{size[1]}")
+        total += read
+    print(f"  {total}/{rec.written} frames read back   {'ok' if total == rec.written == len(full) + len(small) else 'WRONG'}")
+    shutil.rmtree(directory)
+
+    # a disk that gets stuck for a while
+    directory = tempfile.mkdtemp()
+    add = recorder.AviWriter.add
+    stalled = []
+    def stuck_add(self, frames):
+        if not stalled:
+            stalled.append(True)
+            time.sleep(STALL)
+        add(self, frames)
+    recorder.AviWriter.add = stuck_add
+
+    rec = VideoRecorder(directory, FPS, queue_length=consts.VIDEO_QUEUE_LENGTH)
+    costs = []
+    for data in full:
+        start = time.perf_counter()
+        rec.submit(data)
+        costs.append(time.perf_counter() - start)
+        time.sleep(1 / FPS / 4) # 4x faster than real, so the queue fills while the disk is stuck
+    rec.stop()
+    costs.sort()
+    print(f"stalled {STALL:.1f}s: {rec.summary()}, {rec.received} received, queue max {rec.queue_max}   "
+          f"submit max {costs[-1] * 1e6:.0f} us   {'ok' if rec.written + rec.dropped == rec.received and rec.dropped > 0 else 'WRONG'}")
+    total = sum(read for _, read, _, _ in play_back(directory))
+    print(f"  {total}/{rec.written} frames read back")
+    shutil.rmtree(directory)
@@ -0,0 +1,98 @@
+##
+import sys
+sys.path[0] = sys.path[0][:-5] # hack around the fact that this file isnt in the main path so i can access src
+##
+
+import time
+import socket
+import threading
+from src.common import consts
+from src.common.net import packets
+from src.common.net.worker import Networker
+
+# receive path: how long closing takes, how long a packet takes to reach its listener, and how bursts are read,
+# once with the old way (a thread blocking on recvfrom with a 1 second timeout, one packet per loop) and once with the networker as it is now.
+# then checks requests, a listener that raises, and that the program can exit without waiting on the networker.
+
+PACKETS: int = 2000
+BURST: int = 200 # small enough to fit in the default socket receive buffer
+PORT_A: int = 50111
+PORT_B: int = 50112
+
+
+def legacy_start(net: Networker):
+    """
+    the receive thread as it was before.
+    """
+    net.socket.bind(('', net.port))
+    net.target_addr = (net.target_ip, net.target_port)
+    net.open = True
+    net.socket.settimeout(1.0)
+
+    def loop():
+        while net.open:
+            try:
+                raw_pkt, addr = net.socket.recvfrom(net.packet_size)
+            except:
+                continue
+            net._handle(raw_pkt, addr, time.perf_counter())
+    net.recv_thread = threading.Thread(target=loop, daemon=True)
+    net.recv_thread.start()
+
+
+def run(name: str, start: ...):
+    receiver = Networker("127.0.0.1", PORT_A, PORT_B, consts.PACKET_SIZE)
+    sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    start(receiver)
+
+    latencies = []
+    done = threading.Event()
+    def listener(addr, *values):
+        latencies.append(time.perf_counter() - values[0])
+        if len(latencies) >= PACKETS + BURST:
+            done.set()
+    receiver.register_listener(packets.CONTROL, listener)
+
+    def send(count: int):
+        for _ in range(count):
+            packet = receiver.build_packet(packets.CONTROL, time.perf_counter(), 0, 0, 0, 0, 0, 0, 0, 0)
+            sender.sendto(packet, ('127.0.0.1', PORT_B))
+
+    for _ in range(PACKETS): # one at a time
+        send(1)
+        time.sleep(0.0005)
+    send(BURST) # all at once
+    done.wait(5)
+
+    start_close = time.perf_counter()
+    receiver.close()
+    receiver.recv_thread.join()
+    closing = time.perf_counter() - start_close
+    receiver.socket.close()
+    sender.close()
+
+    latencies.sort()
+    single = latencies[:PACKETS]
+    print(f"{name:<8} received {len(latencies)}/{PACKETS + BURST}   latency median {single[len(single) // 2] * 1e6:.0f} us, "
+          f"p99 {single[int(len(single) * 0.99)] * 1e6:.0f} us   close {closing * 1000:.1f} ms   wakeups {receiver.wakeups} (most in one: {receiver.batch_max})")
+
+
+if __name__ == "__main__":
+    run("before", legacy_start)
+    run("after", lambda net: net.start())
+
+    a = Networker("127.0.0.1", PORT_B, PORT_A, consts.PACKET_SIZE)
+    b = Networker("127.0.0.1", PORT_A, PORT_B, consts.PACKET_SIZE)
+    a.start()
+    b.start()
+    b.register_listener(packets.SYNC_CAMERA, lambda addr, enabled: 1 / 0) # a listener that always raises
+    b.register_listener(packets.REQ_SYNC_CAMERA, lambda addr, data: b.send(packets.SYNC_CAMERA, True))
+
+    data, addr = a.request(packets.REQ_SYNC_CAMERA, bytes(), response=packets.SYNC_CAMERA).result(1.0)
+    print("request answered:", data, addr)
+    a.send(packets.SYNC_CAMERA, True) # b's listener for this raises
+    answered = a.request(packets.REQ_SYNC_CAMERA, bytes(), response=packets.SYNC_CAMERA).result(1.0) is not None
+    print("still receiving after a listener raised:", answered, f"({b.listener_errors} listener errors)")
+    print("waiting for something that never comes:", a.wait_for_packet(packets.KILL, 0.1))
+
+    # no close and no os._exit: this only finishes if the networker threads dont keep it open
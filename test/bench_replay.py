@@ -0,0 +1,186 @@
+##
+import sys
+sys.path[0] = sys.path[0][:-5] # hack around the fact that this file isnt in the main path so i can access src
+##
+
+import os
+import cv2
+import time
+import threading
+import shutil
+import tempfile
+import numpy as np
+from src.common import consts
+from src.common.telemetry import Telemetry
+from src.common.net import packets
+from src.common.net import capture
+from src.common.net.capture import Capture, CaptureReader
+from src.common.net.replay import Replay
+from src.common.net.worker import Networker
+from src.rov.camera import CameraFeed
+from src.rov.hardware import HardwareManager
+from src.rov.rov import Rov
+
+# records a few seconds of made up traffic between a poolside and an rov, then replays it: what the poolside received into fresh listeners
+# (at real time, faster, and as fast as possible, decoding every camera frame), and what it sent into an actual Rov's control path
+
+SECONDS: float = 3.0
+CAMERA_FPS: int = 30
+CONTROL_RATE: int = 60
+PORT_POOLSIDE: int = 50151
+PORT_ROV: int = 50152
+PORT_LIVE: int = 50153
+PORT_SEEK: int = 50154
+
+
+class Counter():
+    """
+    listens for what the poolside listens for, and counts it.
+    """
+
+    def __init__(self, net: Networker, decode: bool = False) -> None:
+        self.frames = 0
+        self.telemetry = 0
+        self.messages = 0
+        self.decode = decode
+        self.threads: set[str] = set() # what the camera listener ran on
+        net.register_listener(packets.CAMERA, self.camera)
+        net.register_listener(packets.TELEMETRY, lambda addr, *values: setattr(self, 'telemetry', self.telemetry + 1))
+        net.register_listener(packets.MSG_ROV2POOLSIDE, lambda addr, msg: setattr(self, 'messages', self.messages + 1))
+
+    def camera(self, addr, data: bytes):
+        if self.decode:
+            assert cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR) is not None
+        self.frames += 1
+        self.threads.add(threading.current_thread().name)
+
+    def counts(self) -> tuple[int, int, int]:
+        return self.frames, self.telemetry, self.messages
+
+
+def record(path: str) -> tuple[tuple[int, int, int], tuple]:
+    """
+    returns what the poolside received, and the last control it sent.
+    """
+    poolside = Networker("127.0.0.1", PORT_ROV, PORT_POOLSIDE, consts.PACKET_SIZE, consts.PACKET_FRAGMENT_SIZE)
+    rov = Networker("127.0.0.1", PORT_POOLSIDE, PORT_ROV, consts.PACKET_SIZE, consts.PACKET_FRAGMENT_SIZE)
+    poolside.capture = Capture(path)
+    poolside.start()
+    rov.start()
+    live = Counter(poolside)
+
+    image = np.zeros((480, 640, 3), np.uint8)
+    start = time.perf_counter()
+    control: tuple = ()
+    tick = 0
+    while time.perf_counter() - start < SECONDS:
+        if tick % (CONTROL_RATE // CAMERA_FPS) == 0:
+            image[:] = np.random.randint(0, 255, (48, 64, 3), np.uint8).repeat(10, 0).repeat(10, 1)
+            rov.send_fragmented(packets.CAMERA, cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, 60])[1].tobytes())
+        if tick % (CONTROL_RATE // 10) == 0:
+            rov.send(packets.TELEMETRY, *Telemetry().pack())
+        if tick % CONTROL_RATE == 0:
+            rov.send(packets.MSG_ROV2POOLSIDE, f"tick {tick}".encode())
+        control = (tick / 100, -tick / 100, 0.5, -0.5, 0.25, -0.25, tick % 180, tick % 2, 0)
+        poolside.send(packets.CONTROL, *control)
+        tick += 1
+        time.sleep(1 / CONTROL_RATE)
+
+    time.sleep(0.2)
+    poolside.close()
+    rov.close()
+    poolside.capture.close()
+    return live.counts(), control
+
+
+def replay_into_counter(path: str, speed: float, decode: bool = False) -> tuple[tuple[int, int, int], float, Replay]:
+    net = Networker("127.0.0.1", 0, 0, consts.PACKET_SIZE, consts.PACKET_FRAGMENT_SIZE) # never started. the replay is all it gets
+    counter = Counter(net, decode)
+    with CaptureReader(path) as reader:
+        replay = Replay(reader, net, capture.IN, speed)
+        start = time.perf_counter()
+        replay.run()
+        elapsed = time.perf_counter() - start
+    return counter.counts(), elapsed, replay
+
+
+if __name__ == "__main__":
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, "session.cap")
+    live, last_control = record(path)
+    with CaptureReader(path) as reader:
+        duration = reader.duration()
+        records = sum(len(offsets) for offsets in reader.offsets().values())
+    print(f"recorded {duration:.2f}s, {records} records. poolside received {live[0]} frames, {live[1]} telemetry, {live[2]} messages")
+
+    for speed in (1.0, 4.0):
+        counts, elapsed, replay = replay_into_counter(path, speed)
+        print(f"{speed:.0f}x:     {counts} {'same' if counts == live else 'DIFFERENT'}, took {elapsed:.2f}s, "
+              f"{replay.late} late (at most {replay.lag_max * 1000:.1f}ms)")
+
+    counts, elapsed, replay = replay_into_counter(path, 0, decode=True)
+    print(f"fastest: {counts} {'same' if counts == live else 'DIFFERENT'}, took {elapsed:.3f}s: "
+          f"{replay.played / elapsed:.0f} packets/s, {counts[0] / elapsed:.0f} frames/s decoded")
+
+    # seeking, through the time index
+    net = Networker("127.0.0.1", 0, 0, consts.PACKET_SIZE, consts.PACKET_FRAGMENT_SIZE)
+    counter = Counter(net)
+    with CaptureReader(path) as reader:
+        replay = Replay(reader, net, capture.IN, 0)
+        replay.run(start=2.0)
+        first = next(reader.records(2.0))[0]
+    print(f"from 2.0s: first record at {first:.3f}s, {counter.frames} frames")
+
+    # into a networker thats running, with live traffic coming in at the same time. it should all be handled on the receive thread
+    net = Networker("127.0.0.1", PORT_LIVE, PORT_LIVE, consts.PACKET_SIZE, consts.PACKET_FRAGMENT_SIZE) # sends to itself
+    counter = Counter(net)
+    live_controls = []
+    net.register_listener(packets.CONTROL, lambda addr, *values: live_controls.append(threading.current_thread().name))
+    net.start()
+    with CaptureReader(path) as reader:
+        replay = Replay(reader, net, capture.IN, 0)
+        thread = replay.start()
+        while thread.is_alive():
+            net.send(packets.CONTROL, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0, 0, 0)
+            time.sleep(0.001)
+        time.sleep(0.2)
+    threads = counter.threads | set(live_controls)
+    print(f"running: {counter.counts()} {'same' if counter.counts() == live else 'DIFFERENT'}, alongside {len(live_controls)} live controls, "
+          f"handled on {threads} {'ok' if threads == {'NetworkerRecvThread'} else 'WRONG'}")
+    net.close()
+
+    # seeking back part way through. what plays again shouldnt be thrown away as old, or counted as lost
+    net = Networker("127.0.0.1", PORT_SEEK, PORT_SEEK, consts.PACKET_SIZE, consts.PACKET_FRAGMENT_SIZE)
+    counter = Counter(net)
+    net.start()
+    with CaptureReader(path) as reader:
+        replay = Replay(reader, net, capture.IN, 4.0)
+        thread = replay.start()
+        time.sleep(SECONDS / 4 / 2) # half way through
+        seeked_from = replay.position
+        replay.seek(0.0)
+        thread.join()
+    time.sleep(0.2)
+    stale = sum(reassembler.dropped_stale for reassembler in net.reassemblers.values())
+    print(f"seeking back from {seeked_from:.2f}s: {counter.frames} frames ({live[0]} in the whole capture) {'ok' if counter.frames > live[0] and stale == 0 else 'WRONG'}, "
+          f"{stale} dropped as old, loss {net.stats.loss() * 100:.1f}%")
+    net.close()
+
+    # what the poolside sent, into an rov
+    net = Networker("127.0.0.1", 0, 0, consts.PACKET_SIZE, consts.PACKET_FRAGMENT_SIZE)
+    cam = CameraFeed(cam_id=0) # theres no camera here, which is fine, its never read
+    rov = Rov(cam, net, HardwareManager(simulated=True))
+    controls = []
+    net.register_listener(packets.CONTROL, lambda addr, *values: controls.append(time.perf_counter()))
+    with CaptureReader(path) as reader:
+        replay = Replay(reader, net, capture.OUT, 0)
+        start = time.perf_counter()
+        replay.run()
+        elapsed = time.perf_counter() - start
+    cached = tuple(rov.net_motor_cache.values())
+    same = all(abs(a - b) < 1e-4 for a, b in zip(cached, last_control))
+    print(f"rov: {len(controls)} controls in {elapsed * 1000:.1f}ms ({len(controls) / elapsed:.0f}/s), ends on the last one sent: {same}")
+    rov.camera.stop()
+
+    shutil.rmtree(directory)
+    os._exit(0)
@@ -0,0 +1,82 @@
+##
+import sys
+sys.path[0] = sys.path[0][:-5] # hack around the fact that this file isnt in the main path so i can access src
+##
+
+import typing
+import time
+import socket
+import struct
+from src.common import consts
+from src.common.net import packets
+from src.common.net.worker import Networker, _Packet
+
+# send path microbenchmark. builds and sends packets down a loopback socket as fast as it can,
+# once with the old list based encoder and once with the networker as it is now.
+
+SECONDS: float = 2.0
+CONTROL_DATA: tuple = (0.1, -0.2, 0.3, -0.4, 0.5, -0.6, 90, 45, 45)
+CAMERA_DATA: bytes = bytes(range(256)) * 60 # roughly the size of one of our jpeg frames
+LEGACY_HEADER: str = ">H16s" # id and format string, which is what the header used to be
+
+
+def legacy_build_packet(pkt_type: _Packet, *data) -> bytes:
+    """
+    the encoder as it was before; a list of PACKET_SIZE ints, padded out and converted to bytes.
+    """
+    pkt_id, format = pkt_type
+    if format:
+        pkt_bytes = struct.pack(format, *data)
+    else:
+        pkt_bytes = data[0]
+
+    packet = [0x0 for i in range(consts.PACKET_SIZE)]
+    header = struct.pack(LEGACY_HEADER, pkt_id, format.encode() if format else bytes())
+    packet[0:len(header)] = header
+    packet[len(header):consts.PACKET_SIZE] = pkt_bytes
+    while len(packet) < consts.PACKET_SIZE:
+        packet += [0x0]
+    return bytes(packet)
+
+
+def run(name: str, send: typing.Callable[[], int]) -> None:
+    count = 0
+    wire_bytes = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < SECONDS:
+        wire_bytes += send()
+        count += 1
+    elapsed = time.perf_counter() - start
+
+    print(f"{name:<24} {count / elapsed:>12.0f} pkt/s {wire_bytes / count:>10.0f} B/pkt {wire_bytes / elapsed / 1e6:>10.1f} MB/s")
+
+
+if __name__ == "__main__":
+    # something to send to. nobody reads from it, the kernel just drops what doesnt fit
+    sink = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sink.bind(('127.0.0.1', 0))
+    sink_addr = sink.getsockname()
+
+    net = Networker(*sink_addr, 0, consts.PACKET_SIZE)
+    net.socket.bind(('127.0.0.1', 0))
+    net.target_addr = sink_addr
+    net.open = True # skip start(); we dont want the receive thread for this
+
+    for pkt_type, data in ((packets.CONTROL, CONTROL_DATA), (packets.CAMERA, (CAMERA_DATA,))):
+        name = "CONTROL" if pkt_type == packets.CONTROL else "CAMERA"
+
+        def legacy() -> int:
+            pkt = legacy_build_packet(pkt_type, *data)
+            return net.socket.sendto(pkt, sink_addr)
+
+        def current() -> int:
+            with net._send_lock:
+                size = net._pack_packet(net._send_buffer, pkt_type, *data)
+                return net.socket.sendto(net._send_view[:size], sink_addr)
+
+        run(f"{name} (before)", legacy)
+        run(f"{name} (after)", current)
+
+    net.open = False
+    net.socket.close()
+    sink.close()
@@ -0,0 +1,70 @@
+##
+import sys
+sys.path[0] = sys.path[0][:-5] # hack around the fact that this file isnt in the main path so i can access src
+##
+
+import os
+import time
+import random
+from src.common import consts
+from src.common.net import packets
+from src.common.net.worker import Networker
+from src.common.net.linkstats import SequenceTracker
+
+# puts sequence numbers through a made up bad link (dropping, reordering and duplicating some) and checks the tracker counts
+# what actually happened, then pings between two networkers over loopback.
+
+PACKETS: int = 200_000 # a few times round the 16 bit sequence numbers
+
+
+def bad_link(count: int, loss: float, reorder: float, duplicate: float) -> tuple[list[int], int, int, int]:
+    """
+    sequence numbers as they'd arrive, and how many were really lost, reordered and duplicated.
+    """
+    arrived = []
+    lost = reordered = duplicated = 0
+    held: int | None = None # one held back, to arrive after the next
+    for i in range(count):
+        sequence = (i + 1) & 0xFFFF
+        # the first and last always arrive, in order. nothing can tell what was lost before the first, or spot losses after the last
+        edge = i == 0 or i == count - 1
+        if not edge and random.random() < loss:
+            lost += 1
+            continue
+        if not edge and held is None and random.random() < reorder:
+            held = sequence
+            continue
+        arrived.append(sequence)
+        if held is not None:
+            arrived.append(held)
+            reordered += 1
+            held = None
+        if random.random() < duplicate:
+            arrived.append(sequence)
+            duplicated += 1
+    return arrived, lost, reordered, duplicated
+
+
+if __name__ == "__main__":
+    for loss, reorder, duplicate in [(0.0, 0.0, 0.0), (0.01, 0.0, 0.0), (0.01, 0.01, 0.01), (0.2, 0.05, 0.05)]:
+        arrived, lost, reordered, duplicated = bad_link(PACKETS, loss, reorder, duplicate)
+        tracker = SequenceTracker()
+        for sequence in arrived:
+            tracker.add(sequence)
+        ok = (tracker.lost, tracker.reordered, tracker.duplicates) == (lost, reordered, duplicated) and tracker.restarts == 0
+        print(f"loss {loss:.2f} reorder {reorder:.2f} duplicate {duplicate:.2f}: "
+              f"lost {tracker.lost}/{lost}, reordered {tracker.reordered}/{reordered}, duplicates {tracker.duplicates}/{duplicated}   {'ok' if ok else 'WRONG'}")
+
+    a = Networker("127.0.0.1", 50102, 50101, consts.PACKET_SIZE)
+    b = Networker("127.0.0.1", 50101, 50102, consts.PACKET_SIZE)
+    for net in (a, b):
+        net.start()
+        net.enable_ping(packets.PING, packets.PONG)
+    for _ in range(50):
+        a.ping()
+        time.sleep(0.01)
+    time.sleep(0.1)
+    print(f"pings: {a.stats.pongs_received}/{a.stats.pings_sent} came back")
+    print(a.stats.summary())
+
+    os._exit(0) # dont wait on the networker threads
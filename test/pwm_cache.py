@@ -0,0 +1,46 @@
+##
+import sys
+sys.path[0] = sys.path[0][:-5] # hack around the fact that this file isnt in the main path so i can access src
+##
+
+import math
+from src.common import rovmath
+from src.rov import pwm
+from src.rov.hardware import HardwareManager
+
+# runs the hardware manager against the fake PCA9685 like rov.tick does, and checks the chip ends up with the right duty cycles
+# while counting how many i2c writes it took compared to writing every channel every tick.
+
+TICKS: int = 1000
+MOTORS = ['left_front', 'right_front', 'left_top', 'right_top', 'left_back', 'right_back']
+
+
+def run(name: str, throttle_at: ..., servo_at: ...):
+    hardware = HardwareManager(simulated=True)
+    chip: pwm.FakePca9685 = hardware.pwm.device # type: ignore # its always the fake one when simulated
+
+    for tick in range(TICKS):
+        for i, mot in enumerate(MOTORS):
+            hardware.set_motor(mot, throttle_at(tick, i)) # type: ignore
+        hardware.set_servo('camera_angle', servo_at(tick))
+        hardware.set_servo('tool_ver', servo_at(tick) // 2, camera=False)
+        hardware.set_servo('tool_hor', servo_at(tick) // 2, camera=False)
+        hardware.flush()
+
+        # what the chip has should always be what the motors and servos were last set to (give or take the chip's 12 bit resolution)
+        for mot in MOTORS:
+            m = hardware.motors[mot] # type: ignore
+            assert abs(chip.duty_cycle(m.address) - m.get_duty_cycle()) < 16, mot
+        for servo, address in HardwareManager.ADDRESSES.items():
+            expected = rovmath.calc_servo_dutycycle(hardware.servos[servo], servo == 'camera_angle')
+            assert abs(chip.duty_cycle(address) - expected) < 16, servo
+
+    naive = TICKS * (len(MOTORS) + len(HardwareManager.ADDRESSES))
+    print(f"{name:<12} {hardware.pwm.transactions:>6} writes ({chip.bytes_written:>6} bytes), {hardware.pwm.writes_avoided:>6} avoided, writing every channel every tick would be {naive} writes")
+
+
+if __name__ == "__main__":
+    run("idle", lambda tick, i: 0.0, lambda tick: 90)
+    run("holding", lambda tick, i: 0.5 if i < 2 else 0.0, lambda tick: 45)
+    run("slow", lambda tick, i: math.sin(tick / 200), lambda tick: 90 + int(math.sin(tick / 300) * 30))
+    run("every tick", lambda tick, i: math.sin(tick / 5 + i), lambda tick: tick % 180)
@@ -0,0 +1,50 @@
+##
+import sys
+sys.path[0] = sys.path[0][:-5] # hack around the fact that this file isnt in the main path so i can access src
+##
+
+import time
+import random
+import collections
+import numpy as np
+from src.common import consts
+from src.common.ringbuffer import RingBuffer
+
+# checks the ring buffer always holds the same as a deque of the same length would, through appends and extends of all sizes,
+# then times filling one with a whole run's worth of control history.
+
+STEPS: int = 2000
+
+
+def check(capacity: int):
+    buffer = RingBuffer(capacity, 2)
+    expected = collections.deque(maxlen=capacity)
+
+    for step in range(STEPS):
+        if random.random() < 0.5:
+            sample = (random.random(), random.random())
+            buffer.append(*sample)
+            expected.append(sample)
+        else:
+            samples = np.random.random((random.randrange(capacity * 3), 2))
+            buffer.extend(samples)
+            expected.extend(map(tuple, samples))
+
+        count = random.randrange(capacity + 2)
+        assert np.array_equal(buffer.view(), np.array(expected).reshape(-1, 2)), f"capacity {capacity}, step {step}: contents differ"
+        assert np.array_equal(buffer.view(count), np.array(list(expected)[len(expected) - min(count, len(expected)):]).reshape(-1, 2)), f"capacity {capacity}, step {step}: window differs"
+        assert np.shares_memory(buffer.view(), buffer._data), "view was copied"
+    print(f"capacity {capacity}: ok")
+
+
+if __name__ == "__main__":
+    for capacity in (1, 2, 7, 100):
+        check(capacity)
+
+    samples = int(consts.HISTORY_SECONDS * consts.HISTORY_RATE)
+    buffer = RingBuffer(samples, 2)
+    start = time.perf_counter()
+    for i in range(samples * 2): # twice round
+        buffer.append(i / consts.HISTORY_RATE, random.random())
+    elapsed = time.perf_counter() - start
+    print(f"{samples * 2} appends: {elapsed / (samples * 2) * 1e6:.2f} us each, {buffer._data.nbytes / 1024:.0f} KiB the whole time")